@@ -134,9 +134,9 @@ class UserProfileAdmin(ModelAdmin):
 
 @register(Address)
 class AddressAdmin(ModelAdmin):
-    list_display = ['user', 'type', 'city', 'address', 'postal_code', 'is_default', 'created_at']
+    list_display = ['user', 'type', 'city', 'street', 'postal_code', 'is_default', 'created_at']
     list_filter = ['type', 'city', 'is_default', 'created_at']
-    search_fields = ['user__email', 'user__username', 'city', 'address']
+    search_fields = ['user__email', 'user__username', 'city', 'street']
     ordering = ['-created_at']
     
     fieldsets = (
@@ -144,10 +144,10 @@ class AddressAdmin(ModelAdmin):
             'fields': ('user',)
         }),
         (_('Address Information'), {
-            'fields': ('type', 'city', 'address', 'postal_code', 'apartment', 'entrance', 'floor', 'intercom')
+            'fields': ('type', 'title', 'country', 'region', 'city', 'street', 'house', 'apartment', 'postal_code')
         }),
         (_('Additional'), {
-            'fields': ('is_default', 'notes')
+            'fields': ('is_default', 'latitude', 'longitude')
         })
     )
     
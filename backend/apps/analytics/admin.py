@@ -0,0 +1,11 @@
+from django.contrib import admin
+from apps.core.admin_base import ModelAdmin, register
+from .models import Event
+
+@register(Event)
+class EventAdmin(ModelAdmin):
+    list_display = ['event_type', 'content_type', 'object_id', 'query', 'session_key', 'user', 'created_at']
+    list_filter = ['event_type', 'content_type', 'created_at']
+    search_fields = ['query', 'session_key']
+    ordering = ['-created_at']
+    readonly_fields = ['event_type', 'content_type', 'object_id', 'query', 'data', 'session_key', 'user', 'created_at']
@@ -0,0 +1,119 @@
+"""
+Буфер событий аналитики в памяти процесса.
+
+Запрос только добавляет событие в кольцевой буфер (deque с maxlen) под
+коротким замком, без обращения к БД. Фоновый поток сбрасывает буфер в таблицу
+Event пачками bulk_create: раз в FLUSH_INTERVAL секунд или сразу, когда
+накопилось FLUSH_BATCH_SIZE событий. При переполнении (БД недоступна или не
+успевает) вытесняются самые старые события - аналитика не должна влиять на
+обработку запросов.
+"""
+import atexit
+import logging
+import os
+import threading
+from abc import ABC, abstractmethod
+from collections import deque
+
+from django.db import close_old_connections
+
+
+logger = logging.getLogger(__name__)
+
+BUFFER_SIZE = 10000
+FLUSH_BATCH_SIZE = 500
+FLUSH_INTERVAL = 5
+
+
+class BackgroundFlusher(ABC):
+    """
+    Фоновый поток, вызывающий flush() раз в interval секунд или по
+    wakeup(); при завершении процесса накопленное тоже сбрасывается
+    """
+    
+    def __init__(self, interval, name):
+        self.interval = interval
+        self.name = name
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._worker = None
+        self._worker_pid = None
+        atexit.register(self._flush_on_exit)
+    
+    @abstractmethod
+    def flush(self):
+        """Записывает накопленное в БД"""
+    
+    def wakeup(self):
+        self._wakeup.set()
+    
+    def _ensure_worker(self):
+        # После fork (воркеры gunicorn) поток родителя в дочернем процессе не работает
+        if self._worker_pid == os.getpid() and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker_pid == os.getpid() and self._worker.is_alive():
+                return
+            self._worker = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._worker_pid = os.getpid()
+            self._worker.start()
+    
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception('Ошибка фоновой записи %s', self.name)
+            finally:
+                close_old_connections()
+    
+    def _flush_on_exit(self):
+        try:
+            self.flush()
+        except Exception:
+            logger.exception('Ошибка записи %s при завершении', self.name)
+
+
+class EventBuffer(BackgroundFlusher):
+    """Кольцевой буфер событий с фоновым сбросом в БД"""
+    
+    def __init__(self, size=BUFFER_SIZE, batch_size=FLUSH_BATCH_SIZE, interval=FLUSH_INTERVAL):
+        super().__init__(interval, name='analytics-flush')
+        self.batch_size = batch_size
+        self.dropped = 0
+        self._events = deque(maxlen=size)
+    
+    def __len__(self):
+        return len(self._events)
+    
+    def append(self, event):
+        """Добавляет событие (словарь полей Event)"""
+        with self._lock:
+            if len(self._events) == self._events.maxlen:
+                self.dropped += 1
+            self._events.append(event)
+            size = len(self._events)
+        self._ensure_worker()
+        if size >= self.batch_size:
+            self.wakeup()
+    
+    def drain(self):
+        """Забирает все накопленные события"""
+        with self._lock:
+            events = list(self._events)
+            self._events.clear()
+        return events
+    
+    def flush(self):
+        """Записывает накопленные события в БД, возвращает их количество"""
+        from .models import Event
+        
+        events = self.drain()
+        if events:
+            Event.objects.bulk_create([Event(**event) for event in events], batch_size=self.batch_size)
+        return len(events)
+
+
+event_buffer = EventBuffer()
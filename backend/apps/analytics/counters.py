@@ -0,0 +1,112 @@
+"""
+Счётчики товаров (просмотры и т.п.).
+
+Приращения одного поля для многих товаров одной модели применяются одним
+UPDATE ... SET field = CASE id WHEN ... THEN field + n END WHERE id IN (...):
+значение увеличивается в БД через F(), без чтения строк и гонок с другими
+обновлениями.
+
+Просмотры пишутся с отложенной записью (CounterBuffer): запрос только
+увеличивает счётчик в памяти процесса по (модель, поле, id), фоновый поток
+раз в COUNTER_FLUSH_INTERVAL секунд записывает накопленное - один UPDATE на
+таблицу вместо записи строки товара на каждый просмотр.
+"""
+from collections import Counter, defaultdict
+
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import Case, F, Value, When
+
+from .buffer import BackgroundFlusher
+
+
+COUNTER_FLUSH_INTERVAL = 10
+
+
+def increment_counters(model, field, deltas):
+    """
+    Увеличивает field у товаров модели: deltas - {id: приращение}.
+    Отрицательное приращение не опускает счётчик ниже нуля.
+    """
+    deltas = {pk: delta for pk, delta in deltas.items() if delta}
+    if not deltas:
+        return 0
+    
+    return model.objects.filter(pk__in=deltas).update(**{
+        field: Case(
+            *[When(pk=pk, then=counter_increment(model, field, delta)) for pk, delta in deltas.items()],
+            default=F(field),
+            output_field=model._meta.get_field(field),
+        )
+    })
+
+
+def counter_increment(model, field, delta):
+    """Выражение field + delta, не опускающее счётчик ниже нуля"""
+    if delta >= 0:
+        return F(field) + delta
+    # Беззнаковый столбец MySQL не допускает промежуточного отрицательного значения
+    return Case(
+        When(**{f'{field}__gte': -delta}, then=F(field) + delta),
+        default=Value(0),
+        output_field=model._meta.get_field(field),
+    )
+
+
+def increment_product_counters(field, deltas):
+    """
+    Увеличивает field у товаров разных моделей, один UPDATE на модель:
+    deltas - {(content_type_id, object_id): приращение}
+    """
+    by_content_type = defaultdict(dict)
+    for (content_type_id, object_id), delta in deltas.items():
+        by_content_type[content_type_id][object_id] = delta
+    
+    updated = 0
+    for content_type_id in sorted(by_content_type):
+        model = ContentType.objects.get_for_id(content_type_id).model_class()
+        if model is not None:
+            updated += increment_counters(model, field, by_content_type[content_type_id])
+    return updated
+
+
+class CounterBuffer(BackgroundFlusher):
+    """Приращения счётчиков в памяти процесса с фоновой записью в БД"""
+    
+    def __init__(self, interval=COUNTER_FLUSH_INTERVAL):
+        super().__init__(interval, name='counters-flush')
+        self._deltas = defaultdict(Counter)
+    
+    def add(self, product, field, delta=1):
+        with self._lock:
+            self._deltas[(type(product), field)][product.pk] += delta
+        self._ensure_worker()
+    
+    def drain(self):
+        with self._lock:
+            deltas, self._deltas = self._deltas, defaultdict(Counter)
+        return deltas
+    
+    def flush(self):
+        """Записывает накопленные приращения, возвращает число обновлённых строк"""
+        deltas = self.drain()
+        # Таблицы обновляются в одном порядке, чтобы процессы не блокировали друг друга
+        keys = sorted(deltas, key=lambda key: (key[0]._meta.label, key[1]))
+        updated = 0
+        for position, (model, field) in enumerate(keys):
+            try:
+                updated += increment_counters(model, field, deltas[(model, field)])
+            except Exception:
+                # Не записанные приращения (эта таблица и все следующие)
+                # возвращаются в буфер до следующей попытки
+                self.restore({key: deltas[key] for key in keys[position:]})
+                raise
+        return updated
+    
+    def restore(self, deltas):
+        """Возвращает в буфер приращения, которые не удалось записать"""
+        with self._lock:
+            for key, counts in deltas.items():
+                self._deltas[key].update(counts)
+
+
+counter_buffer = CounterBuffer()
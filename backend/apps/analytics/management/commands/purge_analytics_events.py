@@ -0,0 +1,15 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from apps.analytics.retention import EVENT_RETENTION, purge_events
+
+
+class Command(BaseCommand):
+    help = 'Delete old analytics events'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=EVENT_RETENTION.days, help='Keep events for this many days')
+
+    def handle(self, *args, **options):
+        deleted_count = purge_events(timedelta(days=options['days']))
+        self.stdout.write(f'Удалено старых событий: {deleted_count}')
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.3 on 2026-10-18 14:26
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Event',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event_type', models.CharField(choices=[('product_view', 'Product view'), ('search', 'Search'), ('filter', 'Filter'), ('add_to_cart', 'Add to cart')], max_length=20, verbose_name='event type')),
+                ('object_id', models.PositiveIntegerField(blank=True, null=True)),
+                ('query', models.CharField(blank=True, max_length=255, verbose_name='query')),
+                ('data', models.JSONField(blank=True, default=dict, verbose_name='data')),
+                ('session_key', models.CharField(blank=True, max_length=40, verbose_name='session key')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='created at')),
+                ('content_type', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='contenttypes.contenttype')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='analytics_events', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Event',
+                'verbose_name_plural': 'Events',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['event_type', 'created_at'], name='analytics_e_event_t_ef40a5_idx'), models.Index(fields=['content_type', 'object_id'], name='analytics_e_content_8181c2_idx'), models.Index(fields=['created_at'], name='analytics_e_created_7b5fb3_idx')],
+            },
+        ),
+    ]
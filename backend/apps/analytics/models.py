@@ -1,3 +1,55 @@
 from django.db import models
+from django.conf import settings
+from django.contrib.contenttypes.fields import GenericForeignKey
+from django.contrib.contenttypes.models import ContentType
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+
+class Event(models.Model):
+    """Событие аналитики: просмотр товара, поиск, фильтры, добавление в корзину"""
+    
+    PRODUCT_VIEW = 'product_view'
+    SEARCH = 'search'
+    FILTER = 'filter'
+    ADD_TO_CART = 'add_to_cart'
+    
+    EVENT_TYPES = [
+        (PRODUCT_VIEW, _('Product view')),
+        (SEARCH, _('Search')),
+        (FILTER, _('Filter')),
+        (ADD_TO_CART, _('Add to cart')),
+    ]
+    
+    event_type = models.CharField(_('event type'), max_length=20, choices=EVENT_TYPES)
+    
+    # Товар события (просмотр, добавление в корзину)
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE, blank=True, null=True)
+    object_id = models.PositiveIntegerField(blank=True, null=True)
+    product = GenericForeignKey('content_type', 'object_id')
+    
+    query = models.CharField(_('query'), max_length=255, blank=True)
+    data = models.JSONField(_('data'), default=dict, blank=True)
+    
+    session_key = models.CharField(_('session key'), max_length=40, blank=True)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL,
+        blank=True, null=True, related_name='analytics_events'
+    )
+    
+    # Время события, а не записи в БД: события пишутся пачками с задержкой
+    created_at = models.DateTimeField(_('created at'), default=timezone.now)
+    
+    class Meta:
+        verbose_name = _('Event')
+        verbose_name_plural = _('Events')
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['event_type', 'created_at']),
+            models.Index(fields=['content_type', 'object_id']),
+            models.Index(fields=['created_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.get_event_type_display()} {self.created_at:%d.%m.%Y %H:%M}"
 
-# Analytics models will be added here 
\ No newline at end of file
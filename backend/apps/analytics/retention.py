@@ -0,0 +1,21 @@
+"""
+Срок хранения событий аналитики.
+
+Счётчики товаров из событий не пересчитываются: просмотры пишутся сразу
+счётчиками с отложенной записью (counters.py), продажи - журналом заказов
+(apps.orders.sales). События хранятся EVENT_RETENTION для отчётов, более
+старые удаляет команда purge_analytics_events.
+"""
+from datetime import timedelta
+
+from django.utils import timezone
+
+from .models import Event
+
+
+EVENT_RETENTION = timedelta(days=90)
+
+
+def purge_events(retention=EVENT_RETENTION):
+    """Удаляет события старше retention, возвращает их количество"""
+    return Event.objects.filter(created_at__lt=timezone.now() - retention).delete()[0]
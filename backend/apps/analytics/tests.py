@@ -0,0 +1,72 @@
+from unittest import mock
+
+from django.test import TestCase
+
+from apps.core.testing import make_tire, make_wheel
+from apps.products.models import TireProduct, WheelProduct
+from . import counters
+from .counters import CounterBuffer
+
+
+class CounterBufferTests(TestCase):
+    """Отложенная запись счётчиков и сохранение приращений при ошибке записи"""
+    
+    def setUp(self):
+        # Фоновый поток не должен успеть записать буфер во время теста
+        self.buffer = CounterBuffer(interval=3600)
+        self.tire = make_tire()
+        self.wheel = make_wheel()
+    
+    def tearDown(self):
+        self.buffer.drain()
+    
+    def views(self, product):
+        return type(product).objects.values_list('views_count', flat=True).get(pk=product.pk)
+    
+    def test_flush_groups_increments(self):
+        for _ in range(3):
+            self.buffer.add(self.tire, 'views_count')
+        self.buffer.add(self.wheel, 'views_count', 2)
+        
+        self.assertEqual(self.buffer.flush(), 2)
+        
+        self.assertEqual(self.views(self.tire), 3)
+        self.assertEqual(self.views(self.wheel), 2)
+        self.assertEqual(self.buffer.drain(), {})
+    
+    def test_failed_flush_keeps_unwritten_deltas(self):
+        self.buffer.add(self.tire, 'sales_count', 1)
+        self.buffer.add(self.tire, 'views_count', 2)
+        self.buffer.add(self.wheel, 'views_count', 3)
+        
+        # Таблицы пишутся по порядку: TireProduct.sales_count, TireProduct.views_count,
+        # WheelProduct.views_count; вторая запись падает
+        write = counters.increment_counters
+        calls = []
+        
+        def failing_write(model, field, deltas):
+            calls.append((model, field))
+            if len(calls) == 2:
+                raise RuntimeError('database is unavailable')
+            return write(model, field, deltas)
+        
+        with mock.patch.object(counters, 'increment_counters', failing_write):
+            with self.assertRaises(RuntimeError):
+                self.buffer.flush()
+        
+        self.assertEqual(calls, [(TireProduct, 'sales_count'), (TireProduct, 'views_count')])
+        self.buffer.add(self.wheel, 'views_count', 1)
+        self.buffer.flush()
+        
+        self.tire.refresh_from_db()
+        self.assertEqual(self.tire.sales_count, 1)
+        self.assertEqual(self.views(self.tire), 2)
+        self.assertEqual(self.views(self.wheel), 4)
+    
+    def test_negative_delta_stops_at_zero(self):
+        WheelProduct.objects.filter(pk=self.wheel.pk).update(views_count=2)
+        self.buffer.add(self.wheel, 'views_count', -5)
+        
+        self.buffer.flush()
+        
+        self.assertEqual(self.views(self.wheel), 0)
@@ -0,0 +1,66 @@
+"""
+Запись событий аналитики из представлений.
+
+Функции только собирают поля события и кладут их в буфер процесса (см.
+buffer.py, counters.py); ошибки аналитики не должны ломать запрос и только
+логируются.
+"""
+import logging
+
+from django.contrib.contenttypes.models import ContentType
+from django.utils import timezone
+
+from .buffer import event_buffer
+from .counters import counter_buffer
+from .models import Event
+
+
+logger = logging.getLogger(__name__)
+
+MAX_QUERY_LENGTH = 255
+
+
+def track(event_type, request=None, product=None, query='', data=None):
+    """Добавляет событие в буфер"""
+    try:
+        event = {
+            'event_type': event_type,
+            'query': query[:MAX_QUERY_LENGTH],
+            'data': data or {},
+            'created_at': timezone.now(),
+        }
+        if product is not None:
+            event['content_type_id'] = ContentType.objects.get_for_model(product).id
+            event['object_id'] = product.pk
+        if request is not None:
+            session = getattr(request, 'session', None)
+            event['session_key'] = (session.session_key if session is not None else None) or ''
+            user = getattr(request, 'user', None)
+            if user is not None and user.is_authenticated:
+                event['user_id'] = user.pk
+        event_buffer.append(event)
+    except Exception:
+        logger.exception('Не удалось записать событие аналитики %s', event_type)
+
+
+def track_product_view(request, product):
+    """Просмотр товара: событие и счётчик views_count с отложенной записью"""
+    track(Event.PRODUCT_VIEW, request, product=product)
+    try:
+        counter_buffer.add(product, 'views_count')
+    except Exception:
+        logger.exception('Не удалось учесть просмотр товара %s', product.pk)
+
+
+def track_search(request, query, results_count=None):
+    data = {'results': results_count} if results_count is not None else None
+    track(Event.SEARCH, request, query=query, data=data)
+
+
+def track_filters(request, product_type, filters):
+    """Использование фильтров каталога: filters - пары (параметр, значение)"""
+    track(Event.FILTER, request, data={'product_type': product_type, 'filters': dict(filters)})
+
+
+def track_add_to_cart(request, product, quantity):
+    track(Event.ADD_TO_CART, request, product=product, data={'quantity': quantity})
@@ -10,7 +10,7 @@ class CartAdmin(ModelAdmin):
 
 @register(CartItem)
 class CartItemAdmin(ModelAdmin):
-    list_display = ['cart', 'product_name', 'quantity', 'added_at']
-    list_filter = ['added_at']
-    search_fields = ['cart__user__username', 'product_name']
-    ordering = ['-added_at']
+    list_display = ['cart', 'product', 'quantity', 'created_at']
+    list_filter = ['content_type', 'created_at']
+    search_fields = ['cart__user__email', 'cart__session_key']
+    ordering = ['-created_at']
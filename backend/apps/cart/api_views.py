@@ -0,0 +1,222 @@
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import AllowAny
+from django.contrib.contenttypes.models import ContentType
+
+from apps.analytics.tracking import track_add_to_cart
+from apps.orders.stock import OutOfStock, available_quantities, available_quantity, extend_holds, hold_stock, release_stock
+from apps.products.models import TireProduct, WheelProduct
+from apps.products.serializers import TireProductCardSerializer, WheelProductCardSerializer
+from .models import CartItem
+from .pricing import price_cart, price_lines
+from .serializers import CartItemInputSerializer, CartQuantitySerializer, PriceItemsSerializer
+from .session import get_request_cart
+
+
+PRODUCT_MODELS = {
+    'tire': TireProduct,
+    'wheel': WheelProduct,
+}
+
+PRODUCT_SERIALIZERS = {
+    'tire': TireProductCardSerializer,
+    'wheel': WheelProductCardSerializer,
+}
+
+
+def prices_payload(prices, holder=None):
+    """Ответ API: позиции с товарами, ценами и доступным остатком, итоги"""
+    products = [line['product'] for line in prices['lines']]
+    available = available_quantities(products, exclude_holder=holder)
+
+    # Товары сериализуются карточками пачкой по типу
+    serialized = {}
+    for product_type, serializer_class in PRODUCT_SERIALIZERS.items():
+        typed = [product for product in products if product.PRODUCT_TYPE == product_type]
+        if typed:
+            for product, data in zip(typed, serializer_class(typed, many=True).data):
+                serialized[(product_type, product.pk)] = dict(data, product_type=product_type)
+
+    items = []
+    for line in prices['lines']:
+        product = line['product']
+        content_type = ContentType.objects.get_for_model(product)
+        items.append({
+            'product_type': product.PRODUCT_TYPE,
+            'product_id': product.pk,
+            'quantity': line['quantity'],
+            'price': str(line['price']),
+            'unit_price': str(line['unit_price']),
+            'total_price': str(line['total_price']),
+            'available': available[(content_type.id, product.pk)],
+            'product': serialized[(product.PRODUCT_TYPE, product.pk)],
+        })
+
+    return {
+        'items': items,
+        'unavailable': [
+            {'product_type': ContentType.objects.get_for_id(content_type_id).model_class().PRODUCT_TYPE, 'product_id': object_id}
+            for content_type_id, object_id in prices['unavailable']
+        ],
+        'total_items': prices['total_items'],
+        'subtotal': str(prices['subtotal']),
+        'discount': str(prices['discount']),
+        'total_price': str(prices['total_price']),
+    }
+
+
+def cart_response(cart, status_code=status.HTTP_200_OK):
+    """Ответ с содержимым корзины; резервы активной корзины продлеваются"""
+    if cart is None:
+        return Response(prices_payload(price_lines([])), status=status_code)
+    extend_holds(cart.reservation_key)
+    return Response(prices_payload(price_cart(cart), holder=cart.reservation_key), status=status_code)
+
+
+def get_product(product_type, product_id):
+    return PRODUCT_MODELS[product_type].objects.filter(is_active=True, pk=product_id).first()
+
+
+def set_item_quantity(cart, product, quantity):
+    """Меняет количество позиции и резерв товара; при нехватке - OutOfStock"""
+    content_type = ContentType.objects.get_for_model(product)
+    if quantity <= 0:
+        CartItem.objects.filter(cart=cart, content_type=content_type, object_id=product.pk).delete()
+        release_stock(cart.reservation_key, [product])
+        return
+
+    hold_stock(cart.reservation_key, product, quantity)
+    CartItem.objects.update_or_create(
+        cart=cart, content_type=content_type, object_id=product.pk,
+        defaults={'quantity': quantity},
+    )
+
+
+def out_of_stock_response(error, cart=None):
+    holder = cart.reservation_key if cart is not None else None
+    return Response(
+        {'error': str(error), 'available': available_quantity(error.product, exclude_holder=holder)},
+        status=status.HTTP_400_BAD_REQUEST
+    )
+
+
+@api_view(['GET', 'DELETE'])
+@permission_classes([AllowAny])
+def cart_detail(request):
+    """Корзина текущего покупателя (сессии или пользователя)"""
+    cart = get_request_cart(request)
+    if request.method == 'DELETE' and cart is not None:
+        release_stock(cart.reservation_key)
+        cart.items.all().delete()
+    return cart_response(cart)
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def cart_summary(request):
+    """Сводка корзины для значка и мини-корзины: количество и суммы из кэша"""
+    cart = get_request_cart(request)
+    summary = cart.summary if cart is not None else price_lines([])
+    return Response({
+        'total_items': summary['total_items'],
+        'subtotal': str(summary['subtotal']),
+        'discount': str(summary['discount']),
+        'total_price': str(summary['total_price']),
+    })
+
+
+@api_view(['POST'])
+@permission_classes([AllowAny])
+def cart_items(request):
+    """Добавление товара в корзину (количество прибавляется к имеющемуся)"""
+    serializer = CartItemInputSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(
+            {'error': 'Некорректные данные', 'details': serializer.errors},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    data = serializer.validated_data
+
+    product = get_product(data['product_type'], data['product_id'])
+    if product is None:
+        return Response(
+            {'error': f"Товар с ID {data['product_id']} не найден"},
+            status=status.HTTP_404_NOT_FOUND
+        )
+
+    cart = get_request_cart(request, create=True)
+    item = CartItem.objects.filter(
+        cart=cart, content_type=ContentType.objects.get_for_model(product), object_id=product.pk
+    ).first()
+    quantity = data['quantity'] + (item.quantity if item else 0)
+    try:
+        set_item_quantity(cart, product, quantity)
+    except OutOfStock as e:
+        return out_of_stock_response(e, cart)
+    track_add_to_cart(request, product, data['quantity'])
+    return cart_response(cart, status.HTTP_201_CREATED)
+
+
+@api_view(['PATCH', 'DELETE'])
+@permission_classes([AllowAny])
+def cart_item(request, product_type, product_id):
+    """Изменение количества или удаление позиции корзины"""
+    if product_type not in PRODUCT_MODELS:
+        return Response({'error': f'Неизвестный тип товара: {product_type}'}, status=status.HTTP_404_NOT_FOUND)
+
+    if request.method == 'DELETE':
+        quantity = 0
+    else:
+        serializer = CartQuantitySerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(
+                {'error': 'Некорректные данные', 'details': serializer.errors},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        quantity = serializer.validated_data['quantity']
+
+    cart = get_request_cart(request)
+    if cart is None:
+        return Response({'error': 'Позиция корзины не найдена'}, status=status.HTTP_404_NOT_FOUND)
+
+    # Снятый с продажи товар можно только удалить из корзины, но не зарезервировать
+    products = PRODUCT_MODELS[product_type].objects.all()
+    if quantity > 0:
+        products = products.filter(is_active=True)
+    product = products.filter(pk=product_id).first()
+    if product is None:
+        return Response(
+            {'error': f'Товар с ID {product_id} не найден'},
+            status=status.HTTP_404_NOT_FOUND
+        )
+
+    try:
+        set_item_quantity(cart, product, quantity)
+    except OutOfStock as e:
+        return out_of_stock_response(e, cart)
+    return cart_response(cart)
+
+
+@api_view(['POST'])
+@permission_classes([AllowAny])
+def price_items(request):
+    """Текущие цены и остатки для списка товаров одним запросом (корзина в localStorage)"""
+    serializer = PriceItemsSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(
+            {'error': 'Некорректные данные', 'details': serializer.errors},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    lines = [
+        (
+            ContentType.objects.get_for_model(PRODUCT_MODELS[item['product_type']]).id,
+            item['product_id'],
+            item['quantity'],
+        )
+        for item in serializer.validated_data['items']
+    ]
+    cart = get_request_cart(request)
+    holder = cart.reservation_key if cart is not None else None
+    return Response(prices_payload(price_lines(lines), holder=holder))
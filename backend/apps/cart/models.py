@@ -8,7 +8,9 @@ from apps.accounts.models import User
 class Cart(models.Model):
     """Модель корзины"""
     
-    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='cart')
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='cart', null=True, blank=True)
+    # Ключ сессии анонимной корзины (у корзин пользователей пустой)
+    session_key = models.CharField(_('session key'), max_length=40, blank=True, db_index=True)
     created_at = models.DateTimeField(_('created at'), auto_now_add=True)
     updated_at = models.DateTimeField(_('updated at'), auto_now=True)
     
@@ -17,17 +19,30 @@ class Cart(models.Model):
         verbose_name_plural = _('Carts')
     
     def __str__(self):
-        return f"Корзина {self.user.username}"
+        if self.user_id:
+            return f"Корзина {self.user.username}"
+        return f"Корзина сессии {self.session_key}"
+    
+    @property
+    def reservation_key(self):
+        """Держатель резервов товаров этой корзины (apps.orders.stock)"""
+        return f"cart:{self.pk}"
+    
+    @property
+    def summary(self):
+        """Количество товаров и суммы корзины (кэшируется, см. pricing.py)"""
+        from .pricing import get_cart_summary
+        return get_cart_summary(self)
     
     @property
     def total_price(self):
         """Общая стоимость корзины"""
-        return sum(item.total_price for item in self.items.all())
+        return self.summary['total_price']
     
     @property
     def total_items(self):
         """Общее количество товаров"""
-        return sum(item.quantity for item in self.items.all())
+        return self.summary['total_items']
 
 
 class CartItem(models.Model):
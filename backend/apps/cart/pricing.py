@@ -0,0 +1,115 @@
+"""
+Расчёт стоимости корзины.
+
+Позиции корзины ссылаются на товары через GenericForeignKey, поэтому товары
+загружаются пачкой: один запрос in_bulk на тип товара. Итоги и скидки
+считаются за один проход. Сводка корзины (количество и суммы для значка и
+мини-корзины) кэшируется; кэш сбрасывается при изменении позиций корзины, а
+изменение цен товаров увеличивает общую версию цен.
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+
+
+SUMMARY_CACHE_KEY = 'cart:summary:{cart_id}:{version}'
+SUMMARY_CACHE_TIMEOUT = 60 * 60
+PRICES_VERSION_KEY = 'cart:prices:version'
+
+
+def load_products(keys):
+    """
+    Товары по ключам (content_type_id, object_id), один запрос на тип:
+    {(content_type_id, object_id): product}. Неактивные товары не загружаются.
+    """
+    ids_by_content_type = defaultdict(set)
+    for content_type_id, object_id in keys:
+        ids_by_content_type[content_type_id].add(object_id)
+
+    products = {}
+    for content_type_id, object_ids in ids_by_content_type.items():
+        model = ContentType.objects.get_for_id(content_type_id).model_class()
+        if model is None:
+            continue
+        queryset = model.objects.filter(is_active=True).select_related('brand', 'category', 'main_image')
+        for product in queryset.in_bulk(object_ids).values():
+            products[(content_type_id, product.pk)] = product
+    return products
+
+
+def price_lines(lines):
+    """
+    Цены позиций [(content_type_id, object_id, quantity), ...].
+
+    Возвращает словарь с позициями (товар, цены, сумма) и итогами:
+    subtotal - без скидок, discount - сумма скидок, total_price - к оплате.
+    Позиции с отсутствующими или неактивными товарами попадают в unavailable.
+    """
+    products = load_products((content_type_id, object_id) for content_type_id, object_id, _ in lines)
+
+    result = {
+        'lines': [],
+        'unavailable': [],
+        'total_items': 0,
+        'subtotal': Decimal('0'),
+        'discount': Decimal('0'),
+        'total_price': Decimal('0'),
+    }
+    for content_type_id, object_id, quantity in lines:
+        product = products.get((content_type_id, object_id))
+        if product is None:
+            result['unavailable'].append((content_type_id, object_id))
+            continue
+
+        unit_price = product.final_price
+        total_price = unit_price * quantity
+        result['lines'].append({
+            'product': product,
+            'quantity': quantity,
+            'price': product.price,
+            'unit_price': unit_price,
+            'total_price': total_price,
+        })
+        result['total_items'] += quantity
+        result['subtotal'] += product.price * quantity
+        result['total_price'] += total_price
+
+    result['discount'] = result['subtotal'] - result['total_price']
+    return result
+
+
+def price_cart(cart):
+    """Цены позиций корзины: одна выборка позиций и по запросу на тип товара"""
+    lines = list(cart.items.values_list('content_type_id', 'object_id', 'quantity'))
+    return price_lines(lines)
+
+
+def get_cart_summary(cart):
+    """Сводка корзины из кэша: количество товаров и суммы"""
+    cache_key = SUMMARY_CACHE_KEY.format(cart_id=cart.pk, version=cache.get(PRICES_VERSION_KEY, 0))
+    summary = cache.get(cache_key)
+    if summary is None:
+        prices = price_cart(cart)
+        summary = {
+            'total_items': prices['total_items'],
+            'subtotal': prices['subtotal'],
+            'discount': prices['discount'],
+            'total_price': prices['total_price'],
+        }
+        cache.set(cache_key, summary, SUMMARY_CACHE_TIMEOUT)
+    return summary
+
+
+def invalidate_cart_summary(cart_id):
+    cache.delete(SUMMARY_CACHE_KEY.format(cart_id=cart_id, version=cache.get(PRICES_VERSION_KEY, 0)))
+
+
+def invalidate_prices():
+    """Цены товаров изменились: все сводки корзин устаревают"""
+    cache.add(PRICES_VERSION_KEY, 0, None)
+    try:
+        cache.incr(PRICES_VERSION_KEY)
+    except ValueError:
+        cache.set(PRICES_VERSION_KEY, 1, None)
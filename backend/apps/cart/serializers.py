@@ -0,0 +1,23 @@
+from rest_framework import serializers
+
+
+class CartItemInputSerializer(serializers.Serializer):
+    """Товар и количество в запросах к корзине"""
+    product_id = serializers.IntegerField()
+    product_type = serializers.ChoiceField(choices=['tire', 'wheel'])
+    quantity = serializers.IntegerField(min_value=1, default=1)
+
+
+class CartQuantitySerializer(serializers.Serializer):
+    """Новое количество позиции (0 - удалить)"""
+    quantity = serializers.IntegerField(min_value=0)
+
+
+class PriceItemsSerializer(serializers.Serializer):
+    """Список товаров для расчёта цен одним запросом"""
+    items = CartItemInputSerializer(many=True)
+    
+    def validate_items(self, value):
+        if len(value) > 100:
+            raise serializers.ValidationError("Не больше 100 товаров за один запрос")
+        return value
@@ -0,0 +1,85 @@
+"""
+Корзина текущего запроса.
+
+У анонимного покупателя корзина привязана к сессии (id корзины хранится в
+данных сессии и переживает смену ключа при входе), у пользователя - к
+учётной записи. Когда в запросе есть и пользователь, и корзина сессии,
+корзина сессии сливается в корзину пользователя.
+"""
+from django.db import transaction
+
+from apps.orders.stock import OutOfStock, hold_stock, release_stock
+from .models import Cart, CartItem
+from .pricing import load_products
+
+
+CART_SESSION_KEY = 'cart_id'
+
+
+def get_session_cart(request):
+    cart_id = request.session.get(CART_SESSION_KEY)
+    if not cart_id:
+        return None
+    return Cart.objects.filter(pk=cart_id, user__isnull=True).first()
+
+
+def get_request_cart(request, create=False, user=None):
+    """Корзина пользователя или сессии; при create=True создаётся при отсутствии"""
+    user = user or request.user
+    if user.is_authenticated:
+        cart = Cart.objects.filter(user=user).first()
+        session_cart = get_session_cart(request)
+        if session_cart is not None:
+            if cart is None:
+                # Корзина сессии становится корзиной пользователя
+                session_cart.user = user
+                session_cart.session_key = ''
+                session_cart.save(update_fields=['user', 'session_key', 'updated_at'])
+                cart = session_cart
+            else:
+                merge_carts(session_cart, cart)
+            del request.session[CART_SESSION_KEY]
+        if cart is None and create:
+            cart = Cart.objects.create(user=user)
+        return cart
+
+    cart = get_session_cart(request)
+    if cart is None and create:
+        if not request.session.session_key:
+            request.session.save()
+        cart = Cart.objects.create(session_key=request.session.session_key)
+        request.session[CART_SESSION_KEY] = cart.pk
+    return cart
+
+
+def merge_carts(source, target):
+    """Переносит позиции корзины source в target (количества складываются)"""
+    with transaction.atomic():
+        existing = {
+            (item.content_type_id, item.object_id): item
+            for item in target.items.all()
+        }
+        for item in source.items.all():
+            key = (item.content_type_id, item.object_id)
+            if key in existing:
+                existing[key].quantity += item.quantity
+                existing[key].save(update_fields=['quantity', 'updated_at'])
+            else:
+                existing[key] = CartItem.objects.create(
+                    cart=target,
+                    content_type_id=item.content_type_id,
+                    object_id=item.object_id,
+                    quantity=item.quantity,
+                )
+        release_stock(source.reservation_key)
+        source.delete()
+
+    # Резервы переносятся по возможности: нехватка не мешает слиянию
+    products = load_products(existing)
+    for key, item in existing.items():
+        if key not in products:
+            continue
+        try:
+            hold_stock(target.reservation_key, products[key], item.quantity)
+        except OutOfStock:
+            pass
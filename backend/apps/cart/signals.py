@@ -0,0 +1,28 @@
+from django.db.models.signals import post_save, post_delete
+from django.contrib.auth.signals import user_logged_in
+from django.dispatch import receiver
+
+from apps.products.models import TireProduct, WheelProduct
+from .models import CartItem
+from .pricing import invalidate_cart_summary, invalidate_prices
+from .session import get_request_cart
+
+
+@receiver([post_save, post_delete], sender=CartItem)
+def reset_cart_summary(sender, instance, **kwargs):
+    """Сброс сводки корзины при изменении её позиций"""
+    invalidate_cart_summary(instance.cart_id)
+
+
+@receiver([post_save, post_delete], sender=TireProduct)
+@receiver([post_save, post_delete], sender=WheelProduct)
+def reset_cart_prices(sender, instance, **kwargs):
+    """Изменение товара (цена, скидка, активность) обновляет сводки всех корзин"""
+    invalidate_prices()
+
+
+@receiver(user_logged_in)
+def merge_session_cart(sender, request, user, **kwargs):
+    """При входе корзина сессии сливается с корзиной пользователя"""
+    if request is not None and hasattr(request, 'session'):
+        get_request_cart(request, user=user)
@@ -0,0 +1,98 @@
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from apps.core.testing import DiscardAnalyticsMixin, make_tire
+from apps.orders.models import StockReservation
+from .models import CartItem
+
+
+class CartSummaryTests(DiscardAnalyticsMixin, TestCase):
+    """Сводка корзины из кэша и её сброс"""
+    
+    def setUp(self):
+        cache.clear()
+        self.tire = make_tire(price=Decimal('1000.00'))
+    
+    def add(self, quantity):
+        return self.client.post(
+            '/api/cart/items/',
+            {'product_type': 'tire', 'product_id': self.tire.pk, 'quantity': quantity},
+            content_type='application/json',
+        )
+    
+    def test_empty_cart(self):
+        response = self.client.get('/api/cart/summary/')
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['total_items'], 0)
+        self.assertEqual(response.data['total_price'], '0')
+    
+    def test_summary_is_cached(self):
+        self.add(2)
+        self.assertEqual(self.client.get('/api/cart/summary/').data['total_items'], 2)
+        
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/cart/summary/')
+        
+        self.assertEqual(response.data['total_price'], '2000.00')
+        self.assertFalse([query for query in queries.captured_queries if 'products_tireproduct' in query['sql']])
+    
+    def test_item_change_resets_summary(self):
+        self.add(2)
+        self.client.get('/api/cart/summary/')
+        
+        self.add(1)
+        
+        self.assertEqual(self.client.get('/api/cart/summary/').data['total_items'], 3)
+    
+    def test_price_change_resets_summary(self):
+        self.add(2)
+        self.client.get('/api/cart/summary/')
+        
+        self.tire.price = Decimal('1500.00')
+        self.tire.save()
+        
+        self.assertEqual(self.client.get('/api/cart/summary/').data['total_price'], '3000.00')
+
+
+class CartItemUpdateTests(DiscardAnalyticsMixin, TestCase):
+    """Изменение позиции корзины"""
+    
+    def setUp(self):
+        self.tire = make_tire()
+        self.client.post(
+            '/api/cart/items/',
+            {'product_type': 'tire', 'product_id': self.tire.pk, 'quantity': 1},
+            content_type='application/json',
+        )
+        self.url = f'/api/cart/items/tire/{self.tire.pk}/'
+    
+    def deactivate(self):
+        self.tire.is_active = False
+        self.tire.save()
+    
+    def test_update_quantity(self):
+        response = self.client.patch(self.url, {'quantity': 3}, content_type='application/json')
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['total_items'], 3)
+        self.assertEqual(StockReservation.objects.get().quantity, 3)
+    
+    def test_inactive_product_cannot_be_updated(self):
+        self.deactivate()
+        
+        response = self.client.patch(self.url, {'quantity': 3}, content_type='application/json')
+        
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(StockReservation.objects.get().quantity, 1)
+    
+    def test_inactive_product_can_be_removed(self):
+        self.deactivate()
+        
+        self.assertEqual(self.client.delete(self.url).status_code, 200)
+        self.assertFalse(CartItem.objects.exists())
+        self.assertFalse(StockReservation.objects.exists())
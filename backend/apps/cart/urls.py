@@ -0,0 +1,12 @@
+from django.urls import path
+from . import api_views
+
+app_name = 'cart'
+
+urlpatterns = [
+    path('', api_views.cart_detail, name='cart_detail'),
+    path('summary/', api_views.cart_summary, name='cart_summary'),
+    path('items/', api_views.cart_items, name='cart_items'),
+    path('items/<str:product_type>/<int:product_id>/', api_views.cart_item, name='cart_item'),
+    path('price/', api_views.price_items, name='price_items'),
+]
@@ -0,0 +1,105 @@
+"""
+Keyset-пагинация: следующая страница выбирается условием по значению
+сортировки и id последнего объекта ("price > x OR (price = x AND id > y)"),
+поэтому не нужны ни OFFSET, ни COUNT(*), и время выборки не зависит от
+глубины страницы.
+"""
+import base64
+import json
+from collections import OrderedDict
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Курсорная пагинация по одной из разрешённых сортировок с добором по id.
+    Курсор - base64 от JSON {"v": значение поля сортировки, "id": id}.
+    """
+    cursor_query_param = 'cursor'
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    invalid_cursor_message = 'Некорректный курсор.'
+
+    # Сортировки, для которых есть индекс (неявно дополненный id)
+    orderings = ('-created_at',)
+    default_ordering = '-created_at'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+
+        self.ordering = request.query_params.get('ordering', self.default_ordering)
+        if self.ordering not in self.orderings:
+            self.ordering = self.default_ordering
+        self.descending = self.ordering.startswith('-')
+        self.field = queryset.model._meta.get_field(self.ordering.lstrip('-'))
+
+        tiebreak = '-id' if self.descending else 'id'
+        queryset = queryset.order_by(self.ordering, tiebreak)
+
+        position = self.decode_cursor(request)
+        if position is not None:
+            queryset = queryset.filter(self.get_position_filter(*position))
+
+        # Лишняя запись показывает, есть ли следующая страница
+        results = list(queryset[:self.page_size + 1])
+        self.has_next = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        return self.page
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def get_position_filter(self, value, last_id):
+        lookup = 'lt' if self.descending else 'gt'
+        name = self.field.name
+        return Q(**{f'{name}__{lookup}': value}) | Q(**{name: value, f'id__{lookup}': last_id})
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            data = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')).decode('utf-8'))
+            return self.field.to_python(data['v']), int(data['id'])
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, instance):
+        data = {'v': self.field.value_to_string(instance), 'id': instance.pk}
+        return base64.urlsafe_b64encode(json.dumps(data).encode('utf-8')).decode('ascii')
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = remove_query_param(self.base_url, 'page')
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.page[-1]))
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
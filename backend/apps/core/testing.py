@@ -0,0 +1,62 @@
+"""Фабрики товаров для тестов приложений"""
+from decimal import Decimal
+
+from apps.analytics.buffer import event_buffer
+from apps.analytics.counters import counter_buffer
+from apps.products.models import Brand, Category, TireProduct, WheelProduct
+
+
+class DiscardAnalyticsMixin:
+    """
+    Сбрасывает буферы аналитики после теста: иначе их допишет в БД фоновый
+    поток или выход из процесса, когда тестовой базы уже нет
+    """
+    
+    def tearDown(self):
+        event_buffer.drain()
+        counter_buffer.drain()
+        super().tearDown()
+
+
+def make_brand(name='Test Brand'):
+    brand, _ = Brand.objects.get_or_create(name=name, defaults={'slug': name.lower().replace(' ', '-')})
+    return brand
+
+
+def make_category(name='Test Category'):
+    category, _ = Category.objects.get_or_create(name=name, defaults={'slug': name.lower().replace(' ', '-')})
+    return category
+
+
+def make_tire(name='Tire', **fields):
+    fields = {
+        'category': make_category(),
+        'brand': make_brand(),
+        'season': 'summer',
+        'width': 205,
+        'profile': 55,
+        'diameter': 16,
+        'load_index': '91',
+        'speed_index': 'V',
+        'price': Decimal('5000.00'),
+        'stock_quantity': 10,
+        **fields,
+    }
+    return TireProduct.objects.create(name=name, **fields)
+
+
+def make_wheel(name='Wheel', **fields):
+    fields = {
+        'category': make_category(),
+        'brand': make_brand(),
+        'diameter': Decimal('16.0'),
+        'width': Decimal('6.5'),
+        'bolt_pattern': '5x114.3',
+        'center_bore': Decimal('67.1'),
+        'offset': 45,
+        'wheel_type': 'alloy',
+        'price': Decimal('8000.00'),
+        'stock_quantity': 10,
+        **fields,
+    }
+    return WheelProduct.objects.create(name=name, **fields)
@@ -1,6 +1,6 @@
 from django.contrib import admin
 from apps.core.admin_base import ModelAdmin, register
-from .models import Order, OrderItem
+from .models import Order, OrderItem, StockReservation, SalesDelta
 
 @register(Order)
 class OrderAdmin(ModelAdmin):
@@ -34,3 +34,27 @@ class OrderItemAdmin(ModelAdmin):
     list_filter = ['order__status', 'order__created_at']
     search_fields = ['order__order_number', 'product_name']
     ordering = ['-order__created_at']
+
+@register(StockReservation)
+class StockReservationAdmin(ModelAdmin):
+    list_display = ['holder', 'content_type', 'object_id', 'quantity', 'expires_at', 'created_at']
+    list_filter = ['content_type', 'expires_at']
+    search_fields = ['holder']
+    ordering = ['-created_at']
+
+@register(SalesDelta)
+class SalesDeltaAdmin(ModelAdmin):
+    list_display = ['content_type', 'object_id', 'quantity', 'ordered_at', 'applied', 'created_at']
+    list_filter = ['applied', 'content_type']
+    ordering = ['-created_at']
+    readonly_fields = ['content_type', 'object_id', 'quantity', 'ordered_at', 'applied', 'created_at']
+    
+    # Журнал пишут заказы и применяет update_sales_counts, правка вручную рассинхронизирует счётчики
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+    
+    def has_delete_permission(self, request, obj=None):
+        return False
@@ -1,7 +1,7 @@
 from rest_framework import generics, status
 from rest_framework.response import Response
 from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import AllowAny
+from rest_framework.permissions import AllowAny, IsAdminUser
 from django.contrib.contenttypes.models import ContentType
 from django.db import transaction
 from decimal import Decimal
@@ -10,11 +10,24 @@ from datetime import datetime
 
 from .models import Order, OrderItem
 from .serializers import OrderSerializer, CreateOrderSerializer
+from .stock import reserve_stock, OutOfStock
+from .sales import record_sales
+from .idempotency import idempotent
+from .caching import cache_order, etag_matches, get_cached_order
+from apps.cart.session import get_request_cart
+from apps.core.pagination import KeysetPagination
 from apps.products.models import TireProduct, WheelProduct
 
 
+PRODUCT_MODELS = {
+    'tire': TireProduct,
+    'wheel': WheelProduct,
+}
+
+
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@idempotent
 def create_order(request):
     """Создание нового заказа"""
     try:
@@ -40,6 +53,17 @@ def create_order(request):
             subtotal = Decimal('0')
             items_data = validated_data['items']
             
+            # Загружаем товары одним запросом на тип (вместе с брендом)
+            ids_by_type = {}
+            for item_data in items_data:
+                ids_by_type.setdefault(item_data['product_type'], set()).add(item_data['product_id'])
+            products_by_type = {
+                product_type: PRODUCT_MODELS[product_type].objects.filter(
+                    is_active=True
+                ).select_related('brand').in_bulk(ids)
+                for product_type, ids in ids_by_type.items()
+            }
+            
             # Проверяем товары и считаем сумму
             order_items = []
             for item_data in items_data:
@@ -47,35 +71,10 @@ def create_order(request):
                 product_type = item_data['product_type']
                 quantity = item_data['quantity']
                 
-                # Получаем товар
-                if product_type == 'tire':
-                    try:
-                        product = TireProduct.objects.get(id=product_id, is_active=True)
-                        content_type = ContentType.objects.get_for_model(TireProduct)
-                    except TireProduct.DoesNotExist:
-                        return Response(
-                            {'error': f'Товар с ID {product_id} не найден'},
-                            status=status.HTTP_400_BAD_REQUEST
-                        )
-                elif product_type == 'wheel':
-                    try:
-                        product = WheelProduct.objects.get(id=product_id, is_active=True)
-                        content_type = ContentType.objects.get_for_model(WheelProduct)
-                    except WheelProduct.DoesNotExist:
-                        return Response(
-                            {'error': f'Товар с ID {product_id} не найден'},
-                            status=status.HTTP_400_BAD_REQUEST
-                        )
-                else:
+                product = products_by_type[product_type].get(product_id)
+                if product is None:
                     return Response(
-                        {'error': f'Неизвестный тип товара: {product_type}'},
-                        status=status.HTTP_400_BAD_REQUEST
-                    )
-                
-                # Проверяем наличие
-                if product.stock_quantity < quantity:
-                    return Response(
-                        {'error': f'Недостаточно товара "{product.name}" на складе'},
+                        {'error': f'Товар с ID {product_id} не найден'},
                         status=status.HTTP_400_BAD_REQUEST
                     )
                 
@@ -84,13 +83,28 @@ def create_order(request):
                 subtotal += total_price
                 
                 order_items.append({
-                    'content_type': content_type,
+                    'content_type': ContentType.objects.get_for_model(product),
                     'product': product,
                     'quantity': quantity,
                     'unit_price': unit_price,
                     'total_price': total_price
                 })
             
+            # Списываем остатки: проверка наличия и уменьшение атомарны,
+            # резервы других покупателей не продаются. Держатель резервов -
+            # корзина текущего покупателя, определяется только на сервере
+            cart = get_request_cart(request)
+            try:
+                reserve_stock(
+                    [(item['product'], item['quantity']) for item in order_items],
+                    holder=cart.reservation_key if cart is not None else None,
+                )
+            except OutOfStock as e:
+                return Response(
+                    {'error': str(e)},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            
             # Расчет доставки
             shipping_cost = Decimal('500') if validated_data['delivery_method'] == 'delivery' else Decimal('0')
             total_amount = subtotal + shipping_cost
@@ -118,8 +132,8 @@ def create_order(request):
             )
             
             # Создаем элементы заказа
-            for item_data in order_items:
-                OrderItem.objects.create(
+            items = OrderItem.objects.bulk_create([
+                OrderItem(
                     order=order,
                     content_type=item_data['content_type'],
                     object_id=item_data['product'].id,
@@ -129,10 +143,9 @@ def create_order(request):
                     unit_price=item_data['unit_price'],
                     total_price=item_data['total_price']
                 )
-                
-                # Уменьшаем количество на складе
-                item_data['product'].stock_quantity -= item_data['quantity']
-                item_data['product'].save()
+                for item_data in order_items
+            ])
+            record_sales(order, items)
             
             # Возвращаем созданный заказ
             response_serializer = OrderSerializer(order)
@@ -149,16 +162,57 @@ def create_order(request):
         )
 
 
+class OrderCursorPagination(KeysetPagination):
+    """Курсорная пагинация заказов: от новых к старым"""
+    orderings = ('-created_at',)
+    default_ordering = '-created_at'
+
+
 class OrderListView(generics.ListAPIView):
-    """Список заказов"""
+    """Список заказов для сотрудников: фильтры по телефону, email и статусу"""
     serializer_class = OrderSerializer
+    pagination_class = OrderCursorPagination
+    permission_classes = [IsAdminUser]
     
     def get_queryset(self):
-        return Order.objects.all().order_by('-created_at')
+        queryset = Order.objects.prefetch_related('items')
+        params = self.request.query_params
+        
+        # Фильтры покрываются составными индексами (поле, -created_at)
+        phone = params.get('phone', '').strip()
+        if phone:
+            queryset = queryset.filter(customer_phone=phone)
+        
+        email = params.get('email', '').strip()
+        if email:
+            queryset = queryset.filter(customer_email__iexact=email)
+        
+        order_status = params.get('status')
+        if order_status:
+            queryset = queryset.filter(status=order_status)
+        
+        return queryset
 
 
 class OrderDetailView(generics.RetrieveAPIView):
-    """Детали заказа"""
-    queryset = Order.objects.all()
+    """Детали заказа (ответ кэшируется, поддерживается If-None-Match)"""
+    queryset = Order.objects.prefetch_related('items')
     serializer_class = OrderSerializer
-    lookup_field = 'order_number' 
\ No newline at end of file
+    lookup_field = 'order_number'
+    
+    def retrieve(self, request, *args, **kwargs):
+        order_number = kwargs[self.lookup_field]
+        payload = get_cached_order(order_number)
+        if payload is None:
+            order = self.get_object()
+            payload = cache_order(order_number, self.get_serializer(order).data)
+        data, etag = payload
+        
+        if etag_matches(etag, request.headers.get('If-None-Match')):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = Response(data)
+        response['ETag'] = etag
+        # Браузер хранит ответ, но каждый раз сверяет его по ETag
+        response['Cache-Control'] = 'no-cache'
+        return response 
\ No newline at end of file
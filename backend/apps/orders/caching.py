@@ -0,0 +1,55 @@
+"""
+Кэш ответов API деталей заказа (страница подтверждения опрашивает его).
+
+В кэше хранится сериализованный заказ вместе с ETag; повторный запрос с
+If-None-Match получает 304 без обращения к БД. Кэш сбрасывается сигналами
+при изменении заказа или его позиций, а TTL страхует от queryset.update().
+"""
+import hashlib
+import json
+
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.http import parse_etags
+
+
+ORDER_CACHE_KEY = 'orders:detail:{order_number}'
+ORDER_CACHE_TIMEOUT = 5 * 60
+
+
+def make_etag(data):
+    body = json.dumps(data, sort_keys=True, cls=DjangoJSONEncoder)
+    return '"%s"' % hashlib.md5(body.encode('utf-8')).hexdigest()
+
+
+def etag_matches(etag, if_none_match):
+    """
+    Совпадает ли etag с заголовком If-None-Match: список тегов через запятую
+    или *; сравнение слабое (префикс W/ не учитывается), как требует RFC 9110
+    """
+    if not if_none_match:
+        return False
+    tags = parse_etags(if_none_match)
+    if tags == ['*']:
+        return True
+    return weak_etag(etag) in {weak_etag(tag) for tag in tags}
+
+
+def weak_etag(etag):
+    return etag[2:] if etag.startswith('W/') else etag
+
+
+def get_cached_order(order_number):
+    """(данные, etag) из кэша или None"""
+    return cache.get(ORDER_CACHE_KEY.format(order_number=order_number))
+
+
+def cache_order(order_number, data):
+    """Сохраняет сериализованный заказ, возвращает (данные, etag)"""
+    payload = (data, make_etag(data))
+    cache.set(ORDER_CACHE_KEY.format(order_number=order_number), payload, ORDER_CACHE_TIMEOUT)
+    return payload
+
+
+def invalidate_order(order_number):
+    cache.delete(ORDER_CACHE_KEY.format(order_number=order_number))
@@ -0,0 +1,96 @@
+"""
+Ключи идемпотентности для POST-запросов (заголовок Idempotency-Key).
+
+Первый запрос с ключом атомарно занимает его в кэше (cache.add) и выполняется;
+ответ сохраняется на IDEMPOTENCY_TIMEOUT. Повтор с тем же ключом и телом
+получает сохранённый ответ без повторного выполнения транзакции, повтор во
+время обработки - 409, тот же ключ с другим телом - 422. Ответы 5xx не
+сохраняются, чтобы запрос можно было повторить.
+"""
+import functools
+import hashlib
+import json
+
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.response import Response
+
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+IDEMPOTENCY_CACHE_KEY = 'orders:idempotency:{view}:{digest}'
+IDEMPOTENCY_TIMEOUT = 24 * 60 * 60
+# Сколько ключ считается занятым обрабатываемым запросом
+PENDING_TIMEOUT = 60
+MAX_KEY_LENGTH = 255
+
+PENDING = 'pending'
+DONE = 'done'
+
+
+def request_fingerprint(request):
+    """Хэш тела запроса: повтор должен совпадать с исходным запросом"""
+    body = json.dumps(request.data, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(body.encode('utf-8')).hexdigest()
+
+
+def idempotent(view):
+    """Декоратор API-представления (под @api_view): поддержка Idempotency-Key"""
+
+    @functools.wraps(view)
+    def wrapper(request, *args, **kwargs):
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        if not key:
+            return view(request, *args, **kwargs)
+        if len(key) > MAX_KEY_LENGTH:
+            return Response(
+                {'error': f'Ключ идемпотентности длиннее {MAX_KEY_LENGTH} символов'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        digest = hashlib.sha256(key.encode('utf-8')).hexdigest()
+        cache_key = IDEMPOTENCY_CACHE_KEY.format(view=view.__name__, digest=digest)
+        fingerprint = request_fingerprint(request)
+
+        if not cache.add(cache_key, {'state': PENDING, 'fingerprint': fingerprint}, PENDING_TIMEOUT):
+            stored = cache.get(cache_key)
+            if stored is not None:
+                return replay(stored, fingerprint)
+            # Запись истекла между add и get - занимаем ключ заново
+            if not cache.add(cache_key, {'state': PENDING, 'fingerprint': fingerprint}, PENDING_TIMEOUT):
+                return replay(cache.get(cache_key) or {'state': PENDING}, fingerprint)
+
+        try:
+            response = view(request, *args, **kwargs)
+        except Exception:
+            cache.delete(cache_key)
+            raise
+
+        if response.status_code >= 500:
+            cache.delete(cache_key)
+        else:
+            cache.set(cache_key, {
+                'state': DONE,
+                'fingerprint': fingerprint,
+                'status': response.status_code,
+                'data': response.data,
+            }, IDEMPOTENCY_TIMEOUT)
+        return response
+
+    return wrapper
+
+
+def replay(stored, fingerprint):
+    """Ответ на повторный запрос с уже использованным ключом"""
+    if stored.get('fingerprint', fingerprint) != fingerprint:
+        return Response(
+            {'error': 'Ключ идемпотентности уже использован с другими данными'},
+            status=status.HTTP_422_UNPROCESSABLE_ENTITY
+        )
+    if stored['state'] == PENDING:
+        return Response(
+            {'error': 'Запрос с этим ключом идемпотентности ещё обрабатывается'},
+            status=status.HTTP_409_CONFLICT
+        )
+    response = Response(stored['data'], status=stored['status'])
+    response['Idempotent-Replayed'] = 'true'
+    return response
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from apps.orders.stock import sweep_expired_reservations
+
+
+class Command(BaseCommand):
+    help = 'Delete expired stock reservations'
+
+    def handle(self, *args, **options):
+        deleted_count = sweep_expired_reservations()
+        self.stdout.write(f'Удалено просроченных резервов: {deleted_count}')
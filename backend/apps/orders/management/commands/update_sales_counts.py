@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from apps.orders.sales import SALES_BATCH_SIZE, rebuild_sales_counts, update_sales_counts
+
+
+class Command(BaseCommand):
+    help = 'Apply order sales deltas to product sales counters'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=SALES_BATCH_SIZE)
+        parser.add_argument('--rebuild', action='store_true', help='Recompute counters from all order items')
+
+    def handle(self, *args, **options):
+        if options['rebuild']:
+            rebuild_sales_counts()
+            self.stdout.write('Счётчики продаж пересчитаны')
+            return
+        applied, expired = update_sales_counts(options['batch_size'])
+        self.stdout.write(f'Применено изменений продаж: {applied}, вышло из окна: {expired}')
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.3 on 2026-10-18 14:29
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('orders', '0004_order_listing_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SalesDelta',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('object_id', models.PositiveIntegerField()),
+                ('quantity', models.IntegerField(verbose_name='quantity')),
+                ('ordered_at', models.DateTimeField(verbose_name='ordered at')),
+                ('applied', models.BooleanField(default=False, verbose_name='applied')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='created at')),
+                ('content_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='contenttypes.contenttype')),
+            ],
+            options={
+                'verbose_name': 'Sales Delta',
+                'verbose_name_plural': 'Sales Deltas',
+                'indexes': [models.Index(fields=['applied', 'ordered_at'], name='orders_sale_applied_c624c5_idx')],
+            },
+        ),
+    ]
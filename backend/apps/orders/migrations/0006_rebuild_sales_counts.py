@@ -0,0 +1,74 @@
+from datetime import timedelta
+
+from django.db import migrations
+from django.db.models import Case, Sum, When
+from django.utils import timezone
+
+
+# Значения на момент миграции (apps.orders.sales не импортируется: миграция
+# не должна меняться вместе с кодом приложения)
+SALES_WINDOW = timedelta(days=30)
+UNCOUNTED_STATUSES = ('cancelled', 'refunded')
+
+
+def rebuild_sales_counts(apps, schema_editor):
+    """
+    Однократное заполнение счётчиков продаж по уже существующим заказам и
+    журнала SalesDelta заказами из окна, до первого запуска update_sales_counts
+    """
+    ContentType = apps.get_model('contenttypes', 'ContentType')
+    OrderItem = apps.get_model('orders', 'OrderItem')
+    SalesDelta = apps.get_model('orders', 'SalesDelta')
+
+    window_from = timezone.now() - SALES_WINDOW
+    items = OrderItem.objects.exclude(order__status__in=UNCOUNTED_STATUSES)
+    SalesDelta.objects.all().delete()
+
+    for model_name in ('TireProduct', 'WheelProduct'):
+        model = apps.get_model('products', model_name)
+        content_type = ContentType.objects.filter(app_label='products', model=model_name.lower()).first()
+        if content_type is None:
+            continue
+
+        totals = {
+            row['object_id']: row
+            for row in items.filter(content_type=content_type).values('object_id').annotate(
+                total=Sum('quantity'),
+                recent=Sum(Case(When(order__created_at__gte=window_from, then='quantity'), default=0)),
+            )
+        }
+        model.objects.update(sales_count=0, recent_sales_count=0)
+        products = list(model.objects.filter(pk__in=totals).only('pk'))
+        for product in products:
+            product.sales_count = totals[product.pk]['total']
+            product.recent_sales_count = totals[product.pk]['recent']
+        model.objects.bulk_update(products, ['sales_count', 'recent_sales_count'], batch_size=1000)
+
+    SalesDelta.objects.bulk_create(
+        (
+            SalesDelta(
+                content_type_id=content_type_id,
+                object_id=object_id,
+                quantity=quantity,
+                ordered_at=ordered_at,
+                applied=True,
+            )
+            for content_type_id, object_id, quantity, ordered_at in items.filter(
+                order__created_at__gte=window_from
+            ).values_list('content_type_id', 'object_id', 'quantity', 'order__created_at').iterator()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('orders', '0005_salesdelta'),
+        ('products', '0007_recent_sales_count'),
+    ]
+
+    operations = [
+        migrations.RunPython(rebuild_sales_counts, migrations.RunPython.noop),
+    ]
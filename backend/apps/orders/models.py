@@ -68,6 +68,12 @@ class Order(models.Model):
         verbose_name = _('Order')
         verbose_name_plural = _('Orders')
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at']),
+            models.Index(fields=['customer_phone', '-created_at']),
+            models.Index(fields=['customer_email', '-created_at']),
+            models.Index(fields=['status', '-created_at']),
+        ]
     
     def __str__(self):
         return f"Заказ #{self.order_number}"
@@ -99,3 +105,60 @@ class OrderItem(models.Model):
     
     def __str__(self):
         return f"{self.product_name} x {self.quantity}"
+
+
+class StockReservation(models.Model):
+    """Временное резервирование товара (корзина, оформление заказа)"""
+    
+    # Держатель резерва: корзина, сессия или ключ оформления заказа
+    holder = models.CharField(_('holder'), max_length=64)
+    
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.PositiveIntegerField()
+    product = GenericForeignKey('content_type', 'object_id')
+    
+    quantity = models.PositiveIntegerField(_('quantity'))
+    expires_at = models.DateTimeField(_('expires at'))
+    
+    created_at = models.DateTimeField(_('created at'), auto_now_add=True)
+    
+    class Meta:
+        verbose_name = _('Stock Reservation')
+        verbose_name_plural = _('Stock Reservations')
+        unique_together = ['holder', 'content_type', 'object_id']
+        indexes = [
+            models.Index(fields=['content_type', 'object_id', 'expires_at']),
+            models.Index(fields=['expires_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.holder}: {self.product} x {self.quantity}"
+
+
+class SalesDelta(models.Model):
+    """
+    Изменение продаж товара для счётчиков sales_count и recent_sales_count:
+    +количество при создании заказа, -количество при отмене или возврате
+    """
+    
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.PositiveIntegerField()
+    product = GenericForeignKey('content_type', 'object_id')
+    
+    quantity = models.IntegerField(_('quantity'))
+    # Дата заказа: по ней изменение выходит из скользящего окна продаж
+    ordered_at = models.DateTimeField(_('ordered at'))
+    # Учтено в счётчиках товара
+    applied = models.BooleanField(_('applied'), default=False)
+    
+    created_at = models.DateTimeField(_('created at'), auto_now_add=True)
+    
+    class Meta:
+        verbose_name = _('Sales Delta')
+        verbose_name_plural = _('Sales Deltas')
+        indexes = [
+            models.Index(fields=['applied', 'ordered_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.product}: {self.quantity:+d}"
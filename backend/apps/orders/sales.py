@@ -0,0 +1,203 @@
+"""
+Счётчики продаж товаров: sales_count за всё время и recent_sales_count за
+последние SALES_WINDOW.
+
+Создание заказа, отмена и возврат, правка и удаление позиций и заказов пишут
+в журнал SalesDelta изменения продаж (+/- количество по позициям) в той же
+транзакции, что и сам заказ.
+Команда update_sales_counts применяет журнал пачками: изменения пачки
+суммируются по товару и применяются одним UPDATE на модель и счётчик. Применённые изменения остаются в
+журнале, пока заказ не выйдет из окна, и тогда вычитаются из
+recent_sales_count тем же способом, после чего удаляются - полный пересчёт
+по OrderItem нужен только для первоначального заполнения (rebuild).
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.db.models import Case, Sum, When
+from django.utils import timezone
+
+from apps.analytics.counters import increment_counters, increment_product_counters
+from apps.products.homepage import invalidate_collections
+from apps.products.models import TireProduct, WheelProduct
+from .models import Order, OrderItem, SalesDelta
+
+
+SALES_WINDOW = timedelta(days=30)
+SALES_BATCH_SIZE = 5000
+
+# Заказы в этих статусах не считаются продажами
+UNCOUNTED_STATUSES = ('cancelled', 'refunded')
+
+
+def is_counted(status):
+    return status not in UNCOUNTED_STATUSES
+
+
+def record_sales(order, items, sign=1):
+    """Записывает в журнал продажи позиций заказа (sign=-1 - отмена продаж)"""
+    SalesDelta.objects.bulk_create([
+        SalesDelta(
+            content_type_id=item.content_type_id,
+            object_id=item.object_id,
+            quantity=sign * item.quantity,
+            ordered_at=order.created_at,
+        )
+        for item in items
+    ])
+
+
+def record_status_change(order, previous_status):
+    """Отмена или возврат заказа вычитает его продажи, восстановление - добавляет"""
+    if previous_status is None or is_counted(previous_status) == is_counted(order.status):
+        return
+    record_sales(order, order.items.all(), sign=1 if is_counted(order.status) else -1)
+
+
+def sale_line(item):
+    """Позиция заказа для журнала: (order_id, content_type_id, object_id, quantity)"""
+    return item.order_id, item.content_type_id, item.object_id, item.quantity
+
+
+def record_item_change(previous, current):
+    """
+    Правка позиции вне create_order (админка): previous и current - sale_line
+    позиции до и после изменения, None для новой или удалённой позиции.
+    В журнал попадает разница по товарам учитываемых заказов.
+    """
+    changes = defaultdict(int)
+    for line, sign in ((previous, -1), (current, 1)):
+        if line is not None:
+            order_id, content_type_id, object_id, quantity = line
+            changes[(order_id, content_type_id, object_id)] += sign * quantity
+    changes = {key: quantity for key, quantity in changes.items() if quantity}
+    if not changes:
+        return
+
+    orders = {
+        pk: created_at
+        for pk, status, created_at in Order.objects.filter(pk__in={key[0] for key in changes})
+        .values_list('pk', 'status', 'created_at')
+        if is_counted(status)
+    }
+    SalesDelta.objects.bulk_create([
+        SalesDelta(
+            content_type_id=content_type_id,
+            object_id=object_id,
+            quantity=quantity,
+            ordered_at=orders[order_id],
+        )
+        for (order_id, content_type_id, object_id), quantity in changes.items()
+        if order_id in orders
+    ])
+
+
+def window_start():
+    return timezone.now() - SALES_WINDOW
+
+
+def sum_by_product(rows):
+    """Суммы количества по товару: {(content_type_id, object_id): количество}"""
+    totals = defaultdict(int)
+    for content_type_id, object_id, quantity in rows:
+        totals[(content_type_id, object_id)] += quantity
+    return totals
+
+
+def apply_sales_batch(batch_size=SALES_BATCH_SIZE):
+    """Применяет к счётчикам следующую пачку журнала, возвращает её размер"""
+    window_from = window_start()
+    with transaction.atomic():
+        # Строки пачки блокируются: параллельный запуск не применит их дважды
+        rows = list(
+            SalesDelta.objects.select_for_update().filter(applied=False).order_by('pk')
+            .values_list('pk', 'content_type_id', 'object_id', 'quantity', 'ordered_at')[:batch_size]
+        )
+        if not rows:
+            return 0
+        
+        increment_product_counters('sales_count', sum_by_product(
+            (content_type_id, object_id, quantity) for _, content_type_id, object_id, quantity, _ in rows
+        ))
+        increment_product_counters('recent_sales_count', sum_by_product(
+            (content_type_id, object_id, quantity)
+            for _, content_type_id, object_id, quantity, ordered_at in rows
+            if ordered_at >= window_from
+        ))
+        
+        # Изменения по заказам старше окна в recent_sales_count не входят и больше не нужны
+        in_window = [row[0] for row in rows if row[4] >= window_from]
+        SalesDelta.objects.filter(pk__in=[row[0] for row in rows if row[4] < window_from]).delete()
+        SalesDelta.objects.filter(pk__in=in_window).update(applied=True)
+    return len(rows)
+
+
+def expire_sales_batch(batch_size=SALES_BATCH_SIZE):
+    """Вычитает из recent_sales_count пачку заказов, вышедших из окна"""
+    with transaction.atomic():
+        rows = list(
+            SalesDelta.objects.select_for_update().filter(applied=True, ordered_at__lt=window_start())
+            .order_by('pk').values_list('pk', 'content_type_id', 'object_id', 'quantity')[:batch_size]
+        )
+        if not rows:
+            return 0
+        
+        totals = sum_by_product((content_type_id, object_id, quantity) for _, content_type_id, object_id, quantity in rows)
+        increment_product_counters('recent_sales_count', {key: -quantity for key, quantity in totals.items()})
+        SalesDelta.objects.filter(pk__in=[row[0] for row in rows]).delete()
+    return len(rows)
+
+
+def update_sales_counts(batch_size=SALES_BATCH_SIZE):
+    """
+    Применяет весь журнал и сдвигает окно продаж.
+    Возвращает количество (применённых, вышедших из окна) изменений.
+    """
+    applied = expired = 0
+    while processed := apply_sales_batch(batch_size):
+        applied += processed
+    while processed := expire_sales_batch(batch_size):
+        expired += processed
+    if applied or expired:
+        # Подборка хитов продаж на главной строится по счётчикам продаж
+        invalidate_collections()
+    return applied, expired
+
+
+def rebuild_sales_counts():
+    """
+    Полный пересчёт счётчиков по позициям заказов и заполнение журнала
+    заказами из окна - для первоначального заполнения
+    """
+    window_from = window_start()
+    items = OrderItem.objects.exclude(order__status__in=UNCOUNTED_STATUSES)
+    with transaction.atomic():
+        SalesDelta.objects.all().delete()
+        for model in (TireProduct, WheelProduct):
+            content_type = ContentType.objects.get_for_model(model)
+            rows = items.filter(content_type=content_type).values('object_id').annotate(
+                total=Sum('quantity'),
+                recent=Sum(Case(When(order__created_at__gte=window_from, then='quantity'), default=0)),
+            )
+            model.objects.update(sales_count=0, recent_sales_count=0)
+            increment_counters(model, 'sales_count', {row['object_id']: row['total'] for row in rows})
+            increment_counters(model, 'recent_sales_count', {row['object_id']: row['recent'] for row in rows})
+        
+        SalesDelta.objects.bulk_create(
+            (
+                SalesDelta(
+                    content_type_id=content_type_id,
+                    object_id=object_id,
+                    quantity=quantity,
+                    ordered_at=ordered_at,
+                    applied=True,
+                )
+                for content_type_id, object_id, quantity, ordered_at in items.filter(
+                    order__created_at__gte=window_from
+                ).values_list('content_type_id', 'object_id', 'quantity', 'order__created_at').iterator()
+            ),
+            batch_size=1000,
+        )
+    invalidate_collections()
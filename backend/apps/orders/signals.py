@@ -0,0 +1,62 @@
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from .models import Order, OrderItem
+from .caching import invalidate_order
+from .sales import record_item_change, record_status_change, sale_line
+
+
+@receiver([post_save, post_delete], sender=Order)
+def reset_order_cache(sender, instance, **kwargs):
+    """Сброс кэша деталей заказа при изменении заказа"""
+    invalidate_order(instance.order_number)
+
+
+@receiver([post_save, post_delete], sender=OrderItem)
+def reset_order_item_cache(sender, instance, **kwargs):
+    """Сброс кэша деталей заказа при изменении его позиций"""
+    order_number = Order.objects.filter(pk=instance.order_id).values_list('order_number', flat=True).first()
+    if order_number:
+        invalidate_order(order_number)
+
+
+@receiver(pre_save, sender=Order)
+def remember_order_status(sender, instance, **kwargs):
+    """Прежний статус заказа для учёта отмены в счётчиках продаж"""
+    instance._previous_status = (
+        Order.objects.filter(pk=instance.pk).values_list('status', flat=True).first()
+        if instance.pk else None
+    )
+
+
+@receiver(post_save, sender=Order)
+def update_sales_on_status_change(sender, instance, created, **kwargs):
+    """Отмена и возврат вычитают продажи заказа, восстановление - добавляет"""
+    if not created:
+        record_status_change(instance, getattr(instance, '_previous_status', None))
+
+
+@receiver(pre_save, sender=OrderItem)
+def remember_order_item(sender, instance, **kwargs):
+    """Позиция до изменения для учёта правки в счётчиках продаж"""
+    instance._previous_sale = (
+        OrderItem.objects.filter(pk=instance.pk)
+        .values_list('order_id', 'content_type_id', 'object_id', 'quantity').first()
+        if instance.pk else None
+    )
+
+
+@receiver(post_save, sender=OrderItem)
+def record_item_sales(sender, instance, created, **kwargs):
+    """Добавление и правка позиций не через create_order (админка): create_order пишет журнал сам"""
+    previous = None if created else getattr(instance, '_previous_sale', None)
+    record_item_change(previous, sale_line(instance))
+
+
+@receiver(post_delete, sender=OrderItem)
+def revert_item_sales(sender, instance, **kwargs):
+    """
+    Удаление позиции, в том числе вместе с заказом: позиции удаляются раньше
+    заказа, поэтому его статус ещё можно прочитать
+    """
+    record_item_change(sale_line(instance), None)
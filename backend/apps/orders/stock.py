@@ -0,0 +1,217 @@
+"""
+Остатки товаров: резервы корзин и списание при оформлении заказа.
+
+Остаток уменьшается условным UPDATE ... SET stock_quantity = stock_quantity - n
+WHERE stock_quantity >= n: проверка и списание выполняются одной командой под
+блокировкой строки, поэтому параллельные заказы не могут продать больше, чем
+есть на складе. Строки обновляются в одном и том же порядке (тип, id), чтобы
+заказы с общими товарами не блокировали друг друга взаимно; на каждую
+модель товара приходится один UPDATE со списком строк.
+
+Резерв (StockReservation) держит товар за корзиной или оформлением заказа до
+expires_at. Доступный остаток - stock_quantity минус активные резервы других
+держателей; свои резервы при оформлении заказа превращаются в списание без
+дополнительных проверок. Просроченные резервы не учитываются сразу, а из
+таблицы их удаляет команда sweep_stock_reservations.
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, OuterRef, Q, Subquery, Sum, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import StockReservation
+
+
+# Сколько держится резерв без продления
+RESERVATION_TTL = timedelta(minutes=15)
+
+
+class OutOfStock(Exception):
+    """Товара на складе меньше, чем заказано"""
+
+    def __init__(self, product):
+        super().__init__(f'Недостаточно товара "{product.name}" на складе')
+        self.product = product
+
+
+def product_key(product):
+    """Ключ товара: (content_type_id, object_id)"""
+    return ContentType.objects.get_for_model(product).id, product.pk
+
+
+def active_reservations():
+    return StockReservation.objects.filter(expires_at__gt=timezone.now())
+
+
+def reserved_quantities(products, exclude_holder=None):
+    """
+    Количество в активных резервах одним запросом:
+    {(content_type_id, object_id): quantity} для товаров из списка
+    """
+    ids_by_content_type = defaultdict(set)
+    for product in products:
+        content_type_id, object_id = product_key(product)
+        ids_by_content_type[content_type_id].add(object_id)
+    if not ids_by_content_type:
+        return {}
+
+    condition = Q()
+    for content_type_id, object_ids in ids_by_content_type.items():
+        condition |= Q(content_type_id=content_type_id, object_id__in=object_ids)
+
+    reservations = active_reservations().filter(condition)
+    if exclude_holder:
+        reservations = reservations.exclude(holder=exclude_holder)
+
+    rows = reservations.values('content_type_id', 'object_id').annotate(reserved=Sum('quantity'))
+    return {(row['content_type_id'], row['object_id']): row['reserved'] for row in rows}
+
+
+def available_quantities(products, exclude_holder=None):
+    """Доступный остаток товаров: {(content_type_id, object_id): количество}"""
+    reserved = reserved_quantities(products, exclude_holder)
+    result = {}
+    for product in products:
+        key = product_key(product)
+        result[key] = max(product.stock_quantity - reserved.get(key, 0), 0)
+    return result
+
+
+def available_quantity(product, exclude_holder=None):
+    return available_quantities([product], exclude_holder)[product_key(product)]
+
+
+def hold_stock(holder, product, quantity, ttl=RESERVATION_TTL):
+    """
+    Резервирует товар за держателем (или меняет количество в резерве).
+    Строка товара блокируется, поэтому параллельные резервы не превысят остаток.
+    """
+    if quantity <= 0:
+        release_stock(holder, [product])
+        return None
+
+    with transaction.atomic():
+        locked = type(product).objects.select_for_update().only('id', 'name', 'stock_quantity').get(pk=product.pk)
+        if available_quantity(locked, exclude_holder=holder) < quantity:
+            raise OutOfStock(locked)
+
+        content_type_id, object_id = product_key(product)
+        reservation, _ = StockReservation.objects.update_or_create(
+            holder=holder,
+            content_type_id=content_type_id,
+            object_id=object_id,
+            defaults={'quantity': quantity, 'expires_at': timezone.now() + ttl},
+        )
+    return reservation
+
+
+def extend_holds(holder, ttl=RESERVATION_TTL):
+    """
+    Продлевает активные резервы держателя. Просроченные не воскрешаются: товар
+    могли уже зарезервировать другие, такой резерв заново берёт hold_stock.
+    """
+    now = timezone.now()
+    return StockReservation.objects.filter(holder=holder, expires_at__gt=now).update(expires_at=now + ttl)
+
+
+def release_stock(holder, products=None):
+    """Снимает резервы держателя (все или только для указанных товаров)"""
+    reservations = StockReservation.objects.filter(holder=holder)
+    if products is not None:
+        condition = Q()
+        for product in products:
+            content_type_id, object_id = product_key(product)
+            condition |= Q(content_type_id=content_type_id, object_id=object_id)
+        if not condition:
+            return 0
+        reservations = reservations.filter(condition)
+    return reservations.delete()[0]
+
+
+def sweep_expired_reservations():
+    """Удаляет просроченные резервы, возвращает их количество"""
+    return StockReservation.objects.filter(expires_at__lte=timezone.now()).delete()[0]
+
+
+def collect_stock_lines(lines):
+    """
+    Суммирует количество по товару и группирует по модели:
+    [(product, quantity), ...] -> {model: {id: (product, quantity)}}
+    """
+    totals = {}
+    for product, quantity in lines:
+        products = totals.setdefault(type(product), {})
+        if product.pk in products:
+            quantity += products[product.pk][1]
+        products[product.pk] = (product, quantity)
+    return totals
+
+
+def find_short_product(model, products, holder=None):
+    """Товар, которого не хватает на складе (для сообщения об ошибке)"""
+    stock = dict(model.objects.filter(pk__in=products).values_list('pk', 'stock_quantity'))
+    reserved = reserved_quantities([product for product, _ in products.values()], exclude_holder=holder)
+    for product_id in sorted(products):
+        product, quantity = products[product_id]
+        if stock.get(product_id, 0) < quantity + reserved.get(product_key(product), 0):
+            return product
+    return products[min(products)][0]
+
+
+def reserved_by_others(model, holder=None):
+    """
+    Подзапрос: сумма активных резервов товара (строки внешнего UPDATE) без
+    резервов holder. Считается в самом UPDATE, под блокировкой строки товара.
+    """
+    reservations = active_reservations().filter(
+        content_type_id=ContentType.objects.get_for_model(model).id,
+        object_id=OuterRef('pk'),
+    )
+    if holder:
+        reservations = reservations.exclude(holder=holder)
+    total = reservations.values('object_id').annotate(total=Sum('quantity')).values('total')
+    return Coalesce(Subquery(total), 0, output_field=IntegerField())
+
+
+def reserve_stock(lines, holder=None):
+    """
+    Списывает остатки для строк заказа [(product, quantity), ...] одним
+    UPDATE на каждую модель товара. Резервы других держателей не продаются:
+    их сумма проверяется в условии того же UPDATE; резервы holder после
+    списания удаляются. При нехватке любого товара изменения откатываются и
+    выбрасывается OutOfStock.
+    """
+    totals = collect_stock_lines(lines)
+    shortage = None
+
+    with transaction.atomic():
+        for model in sorted(totals, key=lambda model: model.PRODUCT_TYPE):
+            products = totals[model]
+            reserved = reserved_by_others(model, holder)
+            enough = Q()
+            decrement = []
+            for product_id, (product, quantity) in products.items():
+                enough |= Q(pk=product_id, stock_quantity__gte=reserved + quantity)
+                decrement.append(When(pk=product_id, then=F('stock_quantity') - quantity))
+
+            updated = model.objects.filter(enough).update(
+                stock_quantity=Case(
+                    *decrement,
+                    default=F('stock_quantity'),
+                    output_field=model._meta.get_field('stock_quantity'),
+                )
+            )
+            if updated != len(products):
+                shortage = model, products
+                transaction.set_rollback(True)
+                break
+
+        if holder and not shortage:
+            release_stock(holder, [product for product, _ in lines])
+
+    if shortage:
+        raise OutOfStock(find_short_product(*shortage, holder=holder))
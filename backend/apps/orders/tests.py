@@ -0,0 +1,304 @@
+from datetime import timedelta
+from decimal import Decimal
+from itertools import count
+from threading import Barrier, Thread
+from unittest import mock, skipIf
+
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory
+
+from apps.core.testing import make_tire, make_wheel
+from apps.products.models import TireProduct, WheelProduct
+from .api_views import OrderDetailView, create_order
+from .caching import etag_matches
+from .models import Order, OrderItem, SalesDelta, StockReservation
+from .sales import rebuild_sales_counts, update_sales_counts
+from .stock import OutOfStock, hold_stock, reserve_stock
+
+
+order_numbers = count(1)
+
+
+def make_order(status='pending', created_at=None, **fields):
+    order = Order.objects.create(
+        order_number=f'TEST-{next(order_numbers)}',
+        status=status,
+        subtotal=Decimal('0'),
+        total_amount=Decimal('0'),
+        **fields,
+    )
+    if created_at is not None:
+        Order.objects.filter(pk=order.pk).update(created_at=created_at)
+        order.refresh_from_db()
+    return order
+
+
+def add_item(order, product, quantity):
+    return OrderItem.objects.create(
+        order=order, product=product, product_name=product.name, product_sku=product.sku,
+        quantity=quantity, unit_price=product.price, total_price=product.price * quantity,
+    )
+
+
+class SalesCountsTests(TestCase):
+    """Применение журнала SalesDelta и полный пересчёт дают одни и те же счётчики"""
+    
+    def setUp(self):
+        self.tire = make_tire()
+        self.other_tire = make_tire(name='Other tire')
+        self.wheel = make_wheel()
+    
+    def counters(self):
+        return {
+            (product.PRODUCT_TYPE, product.pk): (product.sales_count, product.recent_sales_count)
+            for model in (TireProduct, WheelProduct)
+            for product in model.objects.all()
+        }
+    
+    def assert_rebuild_agrees(self):
+        update_sales_counts()
+        incremental = self.counters()
+        rebuild_sales_counts()
+        self.assertEqual(incremental, self.counters())
+        return incremental
+    
+    def test_journal_matches_rebuild(self):
+        now = timezone.now()
+        recent = make_order()
+        add_item(recent, self.tire, 4)
+        add_item(recent, self.wheel, 2)
+        
+        old = make_order(created_at=now - timedelta(days=60))
+        add_item(old, self.tire, 3)
+        
+        cancelled = make_order()
+        add_item(cancelled, self.other_tire, 5)
+        cancelled.status = 'cancelled'
+        cancelled.save()
+        
+        edited = make_order()
+        item = add_item(edited, self.other_tire, 1)
+        item.quantity = 6
+        item.save()
+        
+        removed = make_order()
+        add_item(removed, self.wheel, 7)
+        removed.delete()
+        
+        counters = self.assert_rebuild_agrees()
+        
+        self.assertEqual(counters[('tire', self.tire.pk)], (7, 4))
+        self.assertEqual(counters[('tire', self.other_tire.pk)], (6, 6))
+        self.assertEqual(counters[('wheel', self.wheel.pk)], (2, 2))
+    
+    def test_window_expiry_matches_rebuild(self):
+        order = make_order(created_at=timezone.now() - timedelta(days=29))
+        add_item(order, self.tire, 2)
+        self.assert_rebuild_agrees()
+        
+        later = timezone.now() + timedelta(days=2)
+        with mock.patch('apps.orders.sales.timezone.now', return_value=later):
+            counters = self.assert_rebuild_agrees()
+        
+        self.assertEqual(counters[('tire', self.tire.pk)], (2, 0))
+        self.assertFalse(SalesDelta.objects.exists())
+    
+    def test_journal_applies_once(self):
+        add_item(make_order(), self.tire, 3)
+        
+        update_sales_counts()
+        update_sales_counts()
+        
+        self.tire.refresh_from_db()
+        self.assertEqual((self.tire.sales_count, self.tire.recent_sales_count), (3, 3))
+
+
+class OrderDetailETagTests(TestCase):
+    """Ответ 304 по If-None-Match для деталей заказа"""
+    
+    def setUp(self):
+        cache.clear()
+        self.order = make_order()
+        add_item(self.order, make_tire(), 1)
+        self.etag = self.get()['ETag']
+    
+    def get(self, if_none_match=None):
+        headers = {'HTTP_IF_NONE_MATCH': if_none_match} if if_none_match is not None else {}
+        request = APIRequestFactory().get(f'/api/orders/{self.order.order_number}/', **headers)
+        return OrderDetailView.as_view()(request, order_number=self.order.order_number)
+    
+    def test_matching_tag(self):
+        self.assertEqual(self.get(self.etag).status_code, 304)
+    
+    def test_tag_in_list(self):
+        self.assertEqual(self.get(f'"other", {self.etag} , "third"').status_code, 304)
+    
+    def test_weak_tag_matches(self):
+        self.assertEqual(self.get(f'W/{self.etag}').status_code, 304)
+    
+    def test_star_matches(self):
+        self.assertEqual(self.get('*').status_code, 304)
+    
+    def test_prefix_of_tag_does_not_match(self):
+        # Теги сравниваются целиком, а не вхождением подстроки в заголовок
+        self.assertEqual(self.get(f'{self.etag[:-1]}0"').status_code, 200)
+        self.assertEqual(self.get(self.etag[1:-5]).status_code, 200)
+        self.assertEqual(self.get(f'"x{self.etag[1:]}').status_code, 200)
+    
+    def test_changed_order_gets_new_body(self):
+        self.order.notes = 'changed'
+        self.order.save()
+        
+        response = self.get(self.etag)
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], self.etag)
+    
+    def test_etag_matches(self):
+        self.assertFalse(etag_matches('"a"', None))
+        self.assertFalse(etag_matches('"a"', '"ab"'))
+        self.assertTrue(etag_matches('"a"', 'W/"a"'))
+        self.assertTrue(etag_matches('W/"a"', '"a"'))
+
+
+class ReserveStockTests(TestCase):
+    """Условный UPDATE остатков: проверка и списание одной командой"""
+    
+    def test_stale_instances_cannot_oversell_last_unit(self):
+        tire = make_tire(stock_quantity=1)
+        # Оба заказа видели остаток 1 до списания
+        first, second = TireProduct.objects.get(pk=tire.pk), TireProduct.objects.get(pk=tire.pk)
+        
+        reserve_stock([(first, 1)])
+        with self.assertRaises(OutOfStock):
+            reserve_stock([(second, 1)])
+        
+        tire.refresh_from_db()
+        self.assertEqual(tire.stock_quantity, 0)
+    
+    def test_shortage_rolls_back_other_models(self):
+        tire = make_tire(stock_quantity=5)
+        wheel = make_wheel(stock_quantity=1)
+        
+        with self.assertRaises(OutOfStock) as raised:
+            reserve_stock([(tire, 2), (wheel, 2)])
+        
+        self.assertEqual(raised.exception.product, wheel)
+        tire.refresh_from_db()
+        self.assertEqual(tire.stock_quantity, 5)
+    
+    def test_repeated_product_lines_are_summed(self):
+        tire = make_tire(stock_quantity=3)
+        
+        with self.assertRaises(OutOfStock):
+            reserve_stock([(tire, 2), (tire, 2)])
+        
+        tire.refresh_from_db()
+        self.assertEqual(tire.stock_quantity, 3)
+    
+    def test_reservation_of_other_holder_is_not_sold(self):
+        tire = make_tire(stock_quantity=1)
+        hold_stock('cart:a', tire, 1)
+        
+        with self.assertRaises(OutOfStock):
+            reserve_stock([(tire, 1)], holder='cart:b')
+        
+        reserve_stock([(tire, 1)], holder='cart:a')
+        tire.refresh_from_db()
+        self.assertEqual(tire.stock_quantity, 0)
+        self.assertFalse(StockReservation.objects.exists())
+
+
+@skipIf(connection.vendor == 'sqlite', 'SQLite блокирует всю базу, параллельных UPDATE нет')
+class ReserveStockContentionTests(TransactionTestCase):
+    """Параллельные заказы последней единицы товара"""
+    
+    def test_only_one_of_concurrent_orders_succeeds(self):
+        tire = make_tire(stock_quantity=1)
+        workers = 4
+        barrier = Barrier(workers)
+        results = []
+        
+        def order():
+            try:
+                product = TireProduct.objects.get(pk=tire.pk)
+                barrier.wait()
+                reserve_stock([(product, 1)])
+                results.append(True)
+            except OutOfStock:
+                results.append(False)
+            finally:
+                connection.close()
+        
+        threads = [Thread(target=order) for _ in range(workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        self.assertEqual(sorted(results), [False] * (workers - 1) + [True])
+        tire.refresh_from_db()
+        self.assertEqual(tire.stock_quantity, 0)
+
+
+class CreateOrderIdempotencyTests(TestCase):
+    """Повтор создания заказа с тем же Idempotency-Key"""
+    
+    def setUp(self):
+        cache.clear()
+        self.tire = make_tire(stock_quantity=5)
+        self.data = {
+            'customer_name': 'Иван',
+            'customer_phone': '+79990000000',
+            'customer_email': 'ivan@example.com',
+            'delivery_method': 'pickup',
+            'payment_method': 'cash',
+            'items': [{'product_id': self.tire.pk, 'product_type': 'tire', 'quantity': 2}],
+        }
+    
+    def post(self, key, data=None):
+        request = APIRequestFactory().post(
+            '/api/orders/create/', data or self.data, format='json', HTTP_IDEMPOTENCY_KEY=key
+        )
+        SessionMiddleware(lambda request: None).process_request(request)
+        with mock.patch('builtins.print'):
+            return create_order(request)
+    
+    def test_replay_returns_same_order_without_second_decrement(self):
+        first = self.post('order-1')
+        replayed = self.post('order-1')
+        
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual(replayed.status_code, 201)
+        self.assertEqual(replayed['Idempotent-Replayed'], 'true')
+        self.assertEqual(replayed.data['order']['order_number'], first.data['order']['order_number'])
+        self.assertEqual(Order.objects.count(), 1)
+        self.tire.refresh_from_db()
+        self.assertEqual(self.tire.stock_quantity, 3)
+    
+    def test_new_key_creates_new_order(self):
+        self.post('order-1')
+        self.post('order-2')
+        
+        self.assertEqual(Order.objects.count(), 2)
+        self.tire.refresh_from_db()
+        self.assertEqual(self.tire.stock_quantity, 1)
+    
+    def test_same_key_with_other_body_is_rejected(self):
+        self.post('order-1')
+        response = self.post('order-1', {**self.data, 'customer_name': 'Пётр'})
+        
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(Order.objects.count(), 1)
+    
+    def test_key_in_progress_is_conflict(self):
+        with mock.patch('apps.orders.idempotency.cache.add', return_value=False), \
+                mock.patch('apps.orders.idempotency.cache.get', return_value={'state': 'pending'}):
+            response = self.post('order-1')
+        
+        self.assertEqual(response.status_code, 409)
+        self.assertFalse(Order.objects.exists())
@@ -40,6 +40,7 @@ class TireProductAdmin(ModelAdmin):
     search_fields = ['name', 'sku', 'brand__name']
     prepopulated_fields = {'slug': ('name',)}
     list_editable = ['price', 'is_active']
+    list_select_related = ['brand', 'main_image']
     ordering = ['-created_at']
     inlines = [ProductImageInline]
     
@@ -49,20 +50,7 @@ class TireProductAdmin(ModelAdmin):
     
     def image_preview(self, obj):
         """Отображение превью изображения товара"""
-        from django.contrib.contenttypes.models import ContentType
-        content_type = ContentType.objects.get_for_model(obj)
-        main_image = ProductImage.objects.filter(
-            content_type=content_type,
-            object_id=obj.id,
-            is_main=True
-        ).first()
-        
-        if not main_image:
-            main_image = ProductImage.objects.filter(
-                content_type=content_type,
-                object_id=obj.id
-            ).first()
-        
+        main_image = obj.main_image
         if main_image and main_image.image:
             return format_html(
                 '<img src="{}" width="50" height="50" style="object-fit: cover; border-radius: 4px;" />',
@@ -109,6 +97,7 @@ class WheelProductAdmin(ModelAdmin):
     search_fields = ['name', 'sku', 'brand__name']
     prepopulated_fields = {'slug': ('name',)}
     list_editable = ['price', 'is_active']
+    list_select_related = ['brand', 'main_image']
     ordering = ['-created_at']
     inlines = [ProductImageInline]
     
@@ -118,20 +107,7 @@ class WheelProductAdmin(ModelAdmin):
     
     def image_preview(self, obj):
         """Отображение превью изображения товара"""
-        from django.contrib.contenttypes.models import ContentType
-        content_type = ContentType.objects.get_for_model(obj)
-        main_image = ProductImage.objects.filter(
-            content_type=content_type,
-            object_id=obj.id,
-            is_main=True
-        ).first()
-        
-        if not main_image:
-            main_image = ProductImage.objects.filter(
-                content_type=content_type,
-                object_id=obj.id
-            ).first()
-        
+        main_image = obj.main_image
         if main_image and main_image.image:
             return format_html(
                 '<img src="{}" width="50" height="50" style="object-fit: cover; border-radius: 4px;" />',
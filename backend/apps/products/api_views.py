@@ -1,26 +1,39 @@
 from rest_framework import generics, status
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
-from rest_framework.pagination import PageNumberPagination
 from django.db.models import Q, F, Case, When, IntegerField
 from django.shortcuts import get_object_or_404
-from .models import Category, Brand, TireProduct, WheelProduct
+from django.http import Http404
+from apps.analytics.tracking import track_filters, track_product_view, track_search
+from .models import Category, Brand, TireProduct, WheelProduct, CatalogEntry
+from .counts import normalize_filters
+from .filters import filter_products
+from .facets import get_facets
+from .suggestions import suggestion_index
+from .homepage import collection_response
+from .pagination import ProductPagination, ProductCursorPagination
 from .serializers import (
     CategorySerializer, BrandSerializer, 
-    TireProductSerializer, WheelProductSerializer
+    TireProductSerializer, WheelProductSerializer,
+    TireProductCardSerializer, WheelProductCardSerializer
 )
 
 
-class ProductPagination(PageNumberPagination):
-    page_size = 20
-    page_size_query_param = 'page_size'
-    max_page_size = 100
-
-
 class ProductListAPIView(generics.ListAPIView):
     """Унифицированный API для получения списка товаров"""
     pagination_class = ProductPagination
     
+    @property
+    def paginator(self):
+        """Курсорная пагинация включается параметром pagination=cursor или cursor=..."""
+        if not hasattr(self, '_paginator'):
+            params = self.request.query_params
+            if params.get('pagination') == 'cursor' or 'cursor' in params:
+                self._paginator = ProductCursorPagination()
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
+    
     def list(self, request, *args, **kwargs):
         """Переопределяем list чтобы добавить product_type в каждый товар"""
         response = super().list(request, *args, **kwargs)
@@ -31,15 +44,28 @@ class ProductListAPIView(generics.ListAPIView):
             for item in response.data['results']:
                 item['product_type'] = product_type
         
+        self.track_listing(product_type, response.data.get('count'))
         return response
     
+    def track_listing(self, product_type, results_count):
+        """Поиск и фильтры учитываются в аналитике по первой странице выдачи"""
+        params = self.request.query_params
+        if 'cursor' in params or params.get('page', '1') != '1':
+            return
+        filters = dict(normalize_filters(params))
+        query = filters.pop('search', None)
+        if query:
+            track_search(self.request, query, results_count)
+        if filters:
+            track_filters(self.request, product_type, filters.items())
+    
     def get_queryset(self):
         product_type = self.request.query_params.get('product_type', 'tire')
         
         if product_type == 'wheel':
-            queryset = WheelProduct.objects.filter(is_active=True).select_related('brand', 'category')
+            queryset = WheelProduct.objects.filter(is_active=True).select_related('brand', 'category', 'main_image')
         else:
-            queryset = TireProduct.objects.filter(is_active=True).select_related('brand', 'category')
+            queryset = TireProduct.objects.filter(is_active=True).select_related('brand', 'category', 'main_image')
         
         # Применяем фильтры
         queryset = self.apply_filters(queryset, product_type)
@@ -54,115 +80,48 @@ class ProductListAPIView(generics.ListAPIView):
     def get_serializer_class(self):
         product_type = self.request.query_params.get('product_type', 'tire')
         if product_type == 'wheel':
-            return WheelProductSerializer
-        return TireProductSerializer
+            return WheelProductCardSerializer
+        return TireProductCardSerializer
     
     def apply_filters(self, queryset, product_type):
-        # Поиск по тексту
-        search = self.request.query_params.get('search')
-        if search:
-            queryset = queryset.filter(
-                Q(name__icontains=search) | 
-                Q(brand__name__icontains=search) |
-                Q(description__icontains=search)
-            )
-        
-        # Фильтр по бренду
-        brand = self.request.query_params.get('brand')
-        if brand:
-            if ',' in brand:
-                brand_slugs = brand.split(',')
-                queryset = queryset.filter(brand__slug__in=brand_slugs)
-            else:
-                queryset = queryset.filter(brand__slug=brand)
-        
-        # Фильтр по цене
-        min_price = self.request.query_params.get('min_price')
-        if min_price:
-            queryset = queryset.filter(price__gte=min_price)
-        
-        max_price = self.request.query_params.get('max_price')
-        if max_price:
-            queryset = queryset.filter(price__lte=max_price)
-        
-        # Фильтр по наличию
-        in_stock = self.request.query_params.get('in_stock')
-        if in_stock == 'true':
-            queryset = queryset.filter(stock_quantity__gt=0)
-        
-        # Специфичные фильтры для шин
-        if product_type == 'tire':
-            season = self.request.query_params.get('season')
-            if season:
-                queryset = queryset.filter(season=season)
-            
-            tire_width = self.request.query_params.get('tire_width')
-            if tire_width:
-                queryset = queryset.filter(width=tire_width)
-            
-            tire_profile = self.request.query_params.get('tire_profile')
-            if tire_profile:
-                queryset = queryset.filter(profile=tire_profile)
-            
-            tire_diameter = self.request.query_params.get('tire_diameter')
-            if tire_diameter:
-                queryset = queryset.filter(diameter=tire_diameter)
-        
-        # Специфичные фильтры для дисков
-        elif product_type == 'wheel':
-            wheel_width = self.request.query_params.get('wheel_width')
-            if wheel_width:
-                queryset = queryset.filter(width=wheel_width)
-            
-            wheel_diameter = self.request.query_params.get('wheel_diameter')
-            if wheel_diameter:
-                queryset = queryset.filter(diameter=wheel_diameter)
-            
-            pcd = self.request.query_params.get('pcd')
-            if pcd:
-                queryset = queryset.filter(bolt_pattern=pcd)
-            
-            wheel_type = self.request.query_params.get('wheel_type')
-            if wheel_type:
-                queryset = queryset.filter(wheel_type=wheel_type)
-            
-            et_from = self.request.query_params.get('et_from')
-            if et_from:
-                queryset = queryset.filter(offset__gte=et_from)
-            
-            et_to = self.request.query_params.get('et_to')
-            if et_to:
-                queryset = queryset.filter(offset__lte=et_to)
-        
-        return queryset
+        return filter_products(queryset, product_type, self.request.query_params)
 
 
-class ProductDetailAPIView(generics.RetrieveAPIView):
-    """API для получения детальной информации о товаре"""
-    lookup_field = 'slug'
+class CatalogObjectMixin:
+    """
+    Товар находится одним индексированным запросом к CatalogEntry по полю
+    lookup ('slug' или 'product_id', значение из URL-параметра
+    lookup_url_kwarg) и загружается одним запросом из модели найденного
+    типа; результат переиспользуется в пределах запроса. При совпадении
+    slug или id у разных типов выбирается тип по CatalogEntry.TYPE_PRIORITY.
+    """
+    lookup = None
+    lookup_url_kwarg = None
     
-    def get_queryset(self):
-        # Пытаемся найти товар в обеих моделях
-        return None
+    def get_product_queryset(self, model):
+        return model.objects.filter(is_active=True).select_related('brand', 'category', 'main_image')
+    
+    def get_product_key(self):
+        """(product_type, product_id) товара или None"""
+        return (
+            CatalogEntry.objects.filter(is_active=True, **{self.lookup: self.kwargs.get(self.lookup_url_kwarg)})
+            .order_by(CatalogEntry.type_priority())
+            .values_list('product_type', 'product_id')
+            .first()
+        )
     
     def get_object(self):
-        slug = self.kwargs.get('slug')
-        
-        # Сначала ищем в шинах
-        try:
-            return TireProduct.objects.select_related('brand', 'category').get(slug=slug, is_active=True)
-        except TireProduct.DoesNotExist:
-            pass
-        
-        # Затем в дисках
-        try:
-            return WheelProduct.objects.select_related('brand', 'category').get(slug=slug, is_active=True)
-        except WheelProduct.DoesNotExist:
-            pass
-        
-        # Если не найден нигде
-        from django.http import Http404
-        raise Http404("Product not found")
+        if not hasattr(self, '_product'):
+            key = self.get_product_key()
+            if key is None:
+                raise Http404("Product not found")
+            product_type, product_id = key
+            model = CatalogEntry.get_product_model(product_type)
+            try:
+                self._product = self.get_product_queryset(model).get(pk=product_id)
+            except model.DoesNotExist:
+                raise Http404("Product not found")
+        return self._product
     
     def get_serializer_class(self):
         obj = self.get_object()
@@ -171,155 +130,166 @@ class ProductDetailAPIView(generics.RetrieveAPIView):
         return TireProductSerializer
 
 
-class ProductByIdAPIView(generics.RetrieveAPIView):
+class ProductDetailAPIView(CatalogObjectMixin, generics.RetrieveAPIView):
+    """API для получения детальной информации о товаре"""
+    lookup = 'slug'
+    lookup_url_kwarg = 'slug'
+    
+    def retrieve(self, request, *args, **kwargs):
+        response = super().retrieve(request, *args, **kwargs)
+        track_product_view(request, self.get_object())
+        return response
+
+
+class ProductByIdAPIView(CatalogObjectMixin, generics.RetrieveAPIView):
     """API для получения товара по ID"""
+    lookup = 'product_id'
+    lookup_url_kwarg = 'pk'
     
-    def get_object(self):
-        product_id = self.kwargs.get('pk')
+    def get_product_key(self):
+        # Если указан тип товара, каталог не нужен - ищем сразу в его таблице;
+        # если не указан, приоритет у шин (для обратной совместимости)
         product_type = self.request.query_params.get('product_type')
-        
-        # Если указан тип товара, ищем только в соответствующей таблице
-        if product_type == 'wheel':
-            try:
-                return WheelProduct.objects.select_related('brand', 'category').get(id=product_id, is_active=True)
-            except WheelProduct.DoesNotExist:
-                from django.http import Http404
-                raise Http404("Wheel not found")
-        elif product_type == 'tire':
-            try:
-                return TireProduct.objects.select_related('brand', 'category').get(id=product_id, is_active=True)
-            except TireProduct.DoesNotExist:
-                from django.http import Http404
-                raise Http404("Tire not found")
-        
-        # Если тип не указан, ищем сначала в шинах, потом в дисках (для обратной совместимости)
-        try:
-            return TireProduct.objects.select_related('brand', 'category').get(id=product_id, is_active=True)
-        except TireProduct.DoesNotExist:
-            pass
-        
-        try:
-            return WheelProduct.objects.select_related('brand', 'category').get(id=product_id, is_active=True)
-        except WheelProduct.DoesNotExist:
-            pass
-        
-        # Если не найден нигде
-        from django.http import Http404
-        raise Http404("Product not found")
-    
-    def get_serializer_class(self):
-        obj = self.get_object()
-        if isinstance(obj, WheelProduct):
-            return WheelProductSerializer
-        return TireProductSerializer
+        if product_type in CatalogEntry.TYPE_PRIORITY:
+            return product_type, self.kwargs.get(self.lookup_url_kwarg)
+        return super().get_product_key()
     
     def retrieve(self, request, *args, **kwargs):
         """Переопределяем retrieve чтобы добавить product_type"""
         response = super().retrieve(request, *args, **kwargs)
-        obj = self.get_object()
-        
-        # Определяем тип товара
-        if isinstance(obj, WheelProduct):
-            response.data['product_type'] = 'wheel'
-        else:
-            response.data['product_type'] = 'tire'
-        
+        response.data['product_type'] = self.get_object().PRODUCT_TYPE
         return response
 
 
+# Сколько товаров можно запросить одним пакетом
+BATCH_MAX_ITEMS = 100
+
+PRODUCT_CARD_SERIALIZERS = {
+    TireProduct.PRODUCT_TYPE: TireProductCardSerializer,
+    WheelProduct.PRODUCT_TYPE: WheelProductCardSerializer,
+}
+
+
+def parse_batch_refs(params):
+    """
+    Ссылки на товары из параметров ids и slugs:
+    ids=tire:1,wheel:2,7 (без типа - как /products/by-id/), slugs=a,b
+    """
+    refs = []
+    for value in params.get('ids', '').split(','):
+        value = value.strip()
+        if not value:
+            continue
+        product_type, _, product_id = value.rpartition(':')
+        if product_type and product_type not in PRODUCT_CARD_SERIALIZERS:
+            raise ValueError(value)
+        refs.append(('id', product_type or None, int(product_id)))
+    for slug in params.get('slugs', '').split(','):
+        if slug.strip():
+            refs.append(('slug', None, slug.strip()))
+    return refs
+
+
 @api_view(['GET'])
-def featured_products(request):
-    """API для получения рекомендуемых товаров"""
-    tire_products = TireProduct.objects.filter(
-        is_active=True, 
-        is_featured=True
-    ).select_related('brand', 'category')[:10]
+def product_batch(request):
+    """
+    API пакетной загрузки товаров по id и slug (избранное, корзина, история заказов).
+    Один запрос к каталогу для ссылок без типа и по запросу на тип товара;
+    порядок ответа совпадает с порядком запроса.
+    """
+    try:
+        refs = parse_batch_refs(request.query_params)
+    except ValueError:
+        return Response({'error': 'Некорректный параметр ids'}, status=status.HTTP_400_BAD_REQUEST)
+    if len(refs) > BATCH_MAX_ITEMS:
+        return Response(
+            {'error': f'Не больше {BATCH_MAX_ITEMS} товаров за один запрос'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
     
-    wheel_products = WheelProduct.objects.filter(
-        is_active=True, 
-        is_featured=True
-    ).select_related('brand', 'category')[:10]
+    # Ссылки без типа и slug разрешаются через каталог (приоритет у шин)
+    untyped_ids = {value for kind, product_type, value in refs if kind == 'id' and product_type is None}
+    slugs = {value for kind, _, value in refs if kind == 'slug'}
+    by_id, by_slug = {}, {}
+    if untyped_ids or slugs:
+        entries = CatalogEntry.objects.filter(
+            Q(product_id__in=untyped_ids) | Q(slug__in=slugs),
+            is_active=True
+        ).order_by('-product_type').values_list('product_type', 'product_id', 'slug')
+        for product_type, product_id, slug in entries:
+            if product_id in untyped_ids:
+                by_id[product_id] = (product_type, product_id)
+            if slug in slugs:
+                by_slug[slug] = (product_type, product_id)
     
-    tire_data = TireProductSerializer(tire_products, many=True).data
-    wheel_data = WheelProductSerializer(wheel_products, many=True).data
+    keys = []
+    for kind, product_type, value in refs:
+        if kind == 'slug':
+            keys.append(by_slug.get(value))
+        elif product_type is None:
+            keys.append(by_id.get(value))
+        else:
+            keys.append((product_type, value))
     
-    # Добавляем product_type к каждому товару
-    for item in tire_data:
-        item['product_type'] = 'tire'
-    for item in wheel_data:
-        item['product_type'] = 'wheel'
+    # Один запрос на тип товара, основное изображение - в том же запросе
+    ids_by_type = {}
+    for key in keys:
+        if key is not None:
+            ids_by_type.setdefault(key[0], set()).add(key[1])
+    serialized = {}
+    for product_type, ids in ids_by_type.items():
+        model = CatalogEntry.get_product_model(product_type)
+        products = list(
+            model.objects.filter(is_active=True, pk__in=ids).select_related('brand', 'category', 'main_image')
+        )
+        serializer = PRODUCT_CARD_SERIALIZERS[product_type](products, many=True, context={'request': request})
+        for product, data in zip(products, serializer.data):
+            serialized[(product_type, product.pk)] = dict(data, product_type=product_type)
     
-    # Объединяем и перемешиваем результаты
-    import random
-    all_products = tire_data + wheel_data
-    random.shuffle(all_products)
+    results, missing = [], []
+    for (kind, product_type, value), key in zip(refs, keys):
+        if key in serialized:
+            results.append(serialized[key])
+        else:
+            missing.append(f'{product_type}:{value}' if product_type else str(value))
     
-    return Response({
-        'count': len(all_products),
-        'results': all_products[:20]
-    })
+    return Response({'results': results, 'missing': missing})
+
+
+@api_view(['GET'])
+def featured_products(request):
+    """API для получения рекомендуемых товаров"""
+    return Response(collection_response('featured', shuffle=True))
 
 
 @api_view(['GET'])
 def bestseller_products(request):
     """API для получения хитов продаж"""
-    tire_products = TireProduct.objects.filter(
-        is_active=True
-    ).select_related('brand', 'category').order_by('-sales_count')[:10]
-    
-    wheel_products = WheelProduct.objects.filter(
-        is_active=True
-    ).select_related('brand', 'category').order_by('-sales_count')[:10]
-    
-    tire_data = TireProductSerializer(tire_products, many=True).data
-    wheel_data = WheelProductSerializer(wheel_products, many=True).data
-    
-    # Добавляем product_type к каждому товару
-    for item in tire_data:
-        item['product_type'] = 'tire'
-    for item in wheel_data:
-        item['product_type'] = 'wheel'
-    
-    # Объединяем и сортируем по продажам
-    all_products = tire_data + wheel_data
-    all_products.sort(key=lambda x: x.get('sales_count', 0), reverse=True)
-    
-    return Response({
-        'count': len(all_products),
-        'results': all_products[:20]
-    })
+    return Response(collection_response('bestsellers'))
 
 
 @api_view(['GET'])
 def new_products(request):
     """API для получения новых товаров"""
-    tire_products = TireProduct.objects.filter(
-        is_active=True,
-        is_new=True
-    ).select_related('brand', 'category').order_by('-created_at')[:10]
-    
-    wheel_products = WheelProduct.objects.filter(
-        is_active=True,
-        is_new=True
-    ).select_related('brand', 'category').order_by('-created_at')[:10]
-    
-    tire_data = TireProductSerializer(tire_products, many=True).data
-    wheel_data = WheelProductSerializer(wheel_products, many=True).data
-    
-    # Добавляем product_type к каждому товару
-    for item in tire_data:
-        item['product_type'] = 'tire'
-    for item in wheel_data:
-        item['product_type'] = 'wheel'
-    
-    # Объединяем и сортируем по дате создания
-    all_products = tire_data + wheel_data
-    all_products.sort(key=lambda x: x.get('created_at', ''), reverse=True)
-    
-    return Response({
-        'count': len(all_products),
-        'results': all_products[:20]
-    })
+    return Response(collection_response('new'))
+
+
+@api_view(['GET'])
+def product_filters(request):
+    """API фасетов каталога: значения фильтров с количеством товаров"""
+    product_type = request.query_params.get('product_type', 'tire')
+    return Response(get_facets(product_type, request.query_params))
+
+
+@api_view(['GET'])
+def search_suggestions(request):
+    """API подсказок для строки поиска (из индекса в памяти, без запросов к БД)"""
+    query = request.query_params.get('q', '')
+    try:
+        limit = min(int(request.query_params.get('limit', 10)), 20)
+    except ValueError:
+        limit = 10
+    return Response({'suggestions': suggestion_index.search(query, limit)})
 
 
 @api_view(['POST'])
@@ -330,11 +300,11 @@ def smart_search(request):
     product_type = data.get('product_type', 'tire')
     
     if product_type == 'wheel':
-        queryset = WheelProduct.objects.filter(is_active=True).select_related('brand', 'category')
-        serializer_class = WheelProductSerializer
+        queryset = WheelProduct.objects.filter(is_active=True).select_related('brand', 'category', 'main_image')
+        serializer_class = WheelProductCardSerializer
     else:
-        queryset = TireProduct.objects.filter(is_active=True).select_related('brand', 'category')
-        serializer_class = TireProductSerializer
+        queryset = TireProduct.objects.filter(is_active=True).select_related('brand', 'category', 'main_image')
+        serializer_class = TireProductCardSerializer
     
     # Применяем фильтры на основе параметров поиска
     if search_type == 'params':
@@ -357,7 +327,7 @@ def smart_search(request):
     
     # Ограничиваем количество результатов
     results = queryset[:50]
-    serialized_data = serializer_class(results, many=True).data
+    serialized_data = serializer_class(results, many=True, context={'request': request}).data
     
     return Response({
         'count': len(serialized_data),
@@ -7,6 +7,7 @@ class ProductsConfig(AppConfig):
     verbose_name = 'Товары'
     
     def ready(self):
+        import apps.products.signals  # Подключаем обработчики сигналов
         try:
             import apps.products.admin
         except ImportError:
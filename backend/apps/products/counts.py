@@ -0,0 +1,85 @@
+"""
+Кэш количества товаров для постраничного списка каталога.
+
+Ключ строится по нормализованному набору фильтров, поэтому "brand=b,a" и
+"brand=a,b" попадают в одну запись. Изменение товаров и брендов увеличивает
+номер поколения: все записи старого поколения перестают считаться точными без
+перебора ключей. В режиме "estimated" для больших выборок допускается
+устаревшее значение - пересчёт COUNT(*) по миллиону строк ради точной цифры
+в пагинаторе не нужен.
+"""
+import hashlib
+import json
+import time
+
+from django.core.cache import cache
+
+from .filters import FILTER_PARAMS
+
+
+COUNT_CACHE_KEY = 'products:count:{product_type}:{digest}'
+GENERATION_KEY = 'products:count:generation'
+COUNT_CACHE_TIMEOUT = 60 * 60
+# Сколько значение считается точным (queryset.update обходит сигналы)
+EXACT_TIMEOUT = 5 * 60
+# С какого размера выборки устаревшее значение допустимо в режиме estimated
+ESTIMATE_THRESHOLD = 1000
+
+
+def normalize_filters(params):
+    """Нормализованный набор фильтров каталога: кортеж пар (параметр, значение)"""
+    items = []
+    for name in FILTER_PARAMS:
+        value = (params.get(name) or '').strip()
+        if not value:
+            continue
+        if name == 'brand':
+            value = ','.join(sorted({slug.strip() for slug in value.split(',') if slug.strip()}))
+        elif name == 'search':
+            value = ' '.join(value.lower().split())
+        elif name == 'in_stock' and value != 'true':
+            # filter_products учитывает только in_stock=true
+            continue
+        if value:
+            items.append((name, value))
+    return tuple(items)
+
+
+def get_count_key(product_type, params):
+    filters = normalize_filters(params)
+    digest = hashlib.md5(json.dumps(filters, ensure_ascii=False).encode('utf-8')).hexdigest()
+    return COUNT_CACHE_KEY.format(product_type=product_type, digest=digest)
+
+
+def get_generation():
+    return cache.get(GENERATION_KEY, 0)
+
+
+def get_product_count(queryset, product_type, params, estimated=False):
+    """
+    Количество товаров в отфильтрованном queryset.
+    Возвращает (количество, приблизительное ли значение).
+    """
+    cache_key = get_count_key(product_type, params)
+    generation = get_generation()
+
+    cached = cache.get(cache_key)
+    if cached is not None:
+        cached_generation, count, counted_at = cached
+        if cached_generation == generation and time.time() - counted_at < EXACT_TIMEOUT:
+            return count, False
+        if estimated and count >= ESTIMATE_THRESHOLD:
+            return count, True
+
+    count = queryset.count()
+    cache.set(cache_key, (generation, count, time.time()), COUNT_CACHE_TIMEOUT)
+    return count, False
+
+
+def invalidate_counts():
+    """Переводит все закэшированные количества в устаревшие"""
+    cache.add(GENERATION_KEY, 0, None)
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        cache.set(GENERATION_KEY, 1, None)
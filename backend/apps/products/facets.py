@@ -0,0 +1,124 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.translation import get_language
+from django.db.models import Count, Min, Max
+
+from .models import TireProduct, WheelProduct, CatalogEntry
+from .filters import filter_products, has_filters
+
+
+FACETS_CACHE_KEY = 'products:facets:{product_type}:{language}'
+FACETS_CACHE_TIMEOUT = 60 * 60
+
+# Фасеты по полю товара: (ключ ответа, поле, параметры фильтра самого фасета)
+TIRE_FACETS = [
+    ('seasons', 'season', ('season',)),
+    ('widths', 'width', ('tire_width',)),
+    ('profiles', 'profile', ('tire_profile',)),
+    ('diameters', 'diameter', ('tire_diameter',)),
+]
+
+WHEEL_FACETS = [
+    ('widths', 'width', ('wheel_width',)),
+    ('diameters', 'diameter', ('wheel_diameter',)),
+    ('pcds', 'bolt_pattern', ('pcd',)),
+    ('wheel_types', 'wheel_type', ('wheel_type',)),
+    ('offsets', 'offset', ('et_from', 'et_to')),
+]
+
+PRICE_PARAMS = ('min_price', 'max_price')
+
+
+def without_params(params, names):
+    """Копия параметров запроса без фильтров указанного фасета"""
+    return {key: value for key, value in params.items() if key not in names}
+
+
+def compute_facets(product_type, params):
+    """
+    Считает фасеты каталога для текущей выборки.
+
+    Каждый фасет считается одним GROUP BY с учётом всех фильтров, кроме
+    собственного, чтобы в фильтре были видны альтернативные значения.
+    """
+    if product_type == 'wheel':
+        model, facets, choices = WheelProduct, WHEEL_FACETS, dict(WheelProduct.WHEEL_TYPES)
+    else:
+        model, facets, choices = TireProduct, TIRE_FACETS, dict(TireProduct.SEASONS)
+
+    base_queryset = model.objects.filter(is_active=True)
+
+    def filtered(exclude=()):
+        return filter_products(base_queryset, product_type, without_params(params, exclude))
+
+    brands = (
+        filtered(exclude=('brand',))
+        .values('brand__id', 'brand__name', 'brand__slug')
+        .annotate(count=Count('id'))
+        .order_by('brand__name')
+    )
+    categories = (
+        filtered()
+        .values('category__id', 'category__name', 'category__slug')
+        .annotate(count=Count('id'))
+        .order_by('category__name')
+    )
+
+    result = {
+        'product_type': product_type,
+        'brands': [
+            {'id': row['brand__id'], 'name': row['brand__name'], 'slug': row['brand__slug'], 'count': row['count']}
+            for row in brands
+        ],
+        'categories': [
+            {'id': row['category__id'], 'name': row['category__name'], 'slug': row['category__slug'], 'count': row['count']}
+            for row in categories
+        ],
+    }
+
+    for key, field, own_params in facets:
+        rows = filtered(exclude=own_params).values(field).annotate(count=Count('id')).order_by(field)
+        values = []
+        for row in rows:
+            value = {'value': row[field], 'count': row['count']}
+            if row[field] in choices:
+                value['label'] = str(choices[row[field]])
+            values.append(value)
+        result[key] = values
+
+    price = filtered(exclude=PRICE_PARAMS).aggregate(min_price=Min('price'), max_price=Max('price'))
+    result['price_range'] = {'min_price': price['min_price'] or 0, 'max_price': price['max_price'] or 0}
+
+    if product_type == 'wheel':
+        offsets = [row['value'] for row in result['offsets']]
+        result['et_range'] = {'min': min(offsets, default=None), 'max': max(offsets, default=None)}
+
+    # Категория обязательна, поэтому сумма по категориям равна размеру выборки
+    result['total'] = sum(row['count'] for row in result['categories'])
+    result['product_types'] = [
+        {'value': value, 'label': str(label)} for value, label in CatalogEntry.PRODUCT_TYPES
+    ]
+    return result
+
+
+def get_facets(product_type, params):
+    """Фасеты каталога; выборка без фильтров берётся из кэша"""
+    if has_filters(params):
+        return compute_facets(product_type, params)
+
+    # Подписи сезонов и типов переводятся, поэтому кэш раздельный для каждого языка
+    cache_key = FACETS_CACHE_KEY.format(product_type=product_type, language=get_language())
+    facets = cache.get(cache_key)
+    if facets is None:
+        facets = compute_facets(product_type, {})
+        cache.set(cache_key, facets, FACETS_CACHE_TIMEOUT)
+    return facets
+
+
+def invalidate_facets():
+    """Сбрасывает кэш фасетов без фильтров"""
+    cache.delete_many([
+        FACETS_CACHE_KEY.format(product_type=product_type, language=language)
+        for product_type in (TireProduct.PRODUCT_TYPE, WheelProduct.PRODUCT_TYPE)
+        for language, _ in settings.LANGUAGES
+    ])
@@ -0,0 +1,91 @@
+from .search import apply_search
+
+
+# Параметры запроса, которые учитывает filter_products
+FILTER_PARAMS = (
+    'search', 'brand', 'min_price', 'max_price', 'in_stock',
+    'season', 'tire_width', 'tire_profile', 'tire_diameter',
+    'wheel_width', 'wheel_diameter', 'pcd', 'wheel_type', 'et_from', 'et_to',
+)
+
+
+def has_filters(params):
+    """Есть ли в параметрах запроса хотя бы один фильтр каталога"""
+    return any(params.get(name) for name in FILTER_PARAMS)
+
+
+def filter_products(queryset, product_type, params):
+    """Применяет фильтры каталога из параметров запроса к queryset товаров"""
+    # Поиск по тексту
+    search = params.get('search')
+    if search:
+        queryset = apply_search(queryset, product_type, search)
+    
+    # Фильтр по бренду
+    brand = params.get('brand')
+    if brand:
+        if ',' in brand:
+            brand_slugs = brand.split(',')
+            queryset = queryset.filter(brand__slug__in=brand_slugs)
+        else:
+            queryset = queryset.filter(brand__slug=brand)
+    
+    # Фильтр по цене
+    min_price = params.get('min_price')
+    if min_price:
+        queryset = queryset.filter(price__gte=min_price)
+    
+    max_price = params.get('max_price')
+    if max_price:
+        queryset = queryset.filter(price__lte=max_price)
+    
+    # Фильтр по наличию
+    in_stock = params.get('in_stock')
+    if in_stock == 'true':
+        queryset = queryset.filter(stock_quantity__gt=0)
+    
+    # Специфичные фильтры для шин
+    if product_type == 'tire':
+        season = params.get('season')
+        if season:
+            queryset = queryset.filter(season=season)
+        
+        tire_width = params.get('tire_width')
+        if tire_width:
+            queryset = queryset.filter(width=tire_width)
+        
+        tire_profile = params.get('tire_profile')
+        if tire_profile:
+            queryset = queryset.filter(profile=tire_profile)
+        
+        tire_diameter = params.get('tire_diameter')
+        if tire_diameter:
+            queryset = queryset.filter(diameter=tire_diameter)
+    
+    # Специфичные фильтры для дисков
+    elif product_type == 'wheel':
+        wheel_width = params.get('wheel_width')
+        if wheel_width:
+            queryset = queryset.filter(width=wheel_width)
+        
+        wheel_diameter = params.get('wheel_diameter')
+        if wheel_diameter:
+            queryset = queryset.filter(diameter=wheel_diameter)
+        
+        pcd = params.get('pcd')
+        if pcd:
+            queryset = queryset.filter(bolt_pattern=pcd)
+        
+        wheel_type = params.get('wheel_type')
+        if wheel_type:
+            queryset = queryset.filter(wheel_type=wheel_type)
+        
+        et_from = params.get('et_from')
+        if et_from:
+            queryset = queryset.filter(offset__gte=et_from)
+        
+        et_to = params.get('et_to')
+        if et_to:
+            queryset = queryset.filter(offset__lte=et_to)
+    
+    return queryset
@@ -0,0 +1,94 @@
+"""
+Подборки товаров для главной страницы: рекомендуемые, хиты продаж, новинки.
+
+Подборка хранится в кэше уже сериализованной, поэтому запрос к API главной -
+одно чтение из кэша. Кэш сбрасывается сигналами при изменении товаров,
+брендов, категорий и изображений.
+"""
+import random
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.translation import get_language
+
+from .models import TireProduct, WheelProduct
+from .serializers import TireProductCardSerializer, WheelProductCardSerializer
+
+
+COLLECTION_CACHE_KEY = 'products:homepage:{name}:{language}'
+COLLECTION_CACHE_TIMEOUT = 60 * 60
+
+# Сколько товаров каждого типа входит в подборку и сколько отдаётся в ответе
+POOL_SIZE = 10
+RESULTS_SIZE = 20
+
+PRODUCT_SERIALIZERS = (
+    (TireProduct, TireProductCardSerializer),
+    (WheelProduct, WheelProductCardSerializer),
+)
+
+# Подборка: (фильтр, сортировка в БД, сортировка объединённых шин и дисков).
+# Хиты продаж - по продажам за последние дни, при равенстве - за всё время
+COLLECTIONS = {
+    'featured': ({'is_featured': True}, (), None),
+    'bestsellers': (
+        {}, ('-recent_sales_count', '-sales_count'),
+        lambda product: (product.recent_sales_count, product.sales_count),
+    ),
+    'new': ({'is_new': True}, ('-created_at',), lambda product: product.created_at),
+}
+
+
+def build_collection(name):
+    """Сериализует подборку из БД: до POOL_SIZE товаров каждого типа"""
+    filters, ordering, sort_key = COLLECTIONS[name]
+    products = []
+
+    for model, _ in PRODUCT_SERIALIZERS:
+        queryset = model.objects.filter(is_active=True, **filters).select_related('brand', 'category', 'main_image')
+        if ordering:
+            queryset = queryset.order_by(*ordering)
+        products.extend(queryset[:POOL_SIZE])
+
+    # Шины и диски сортируются вместе до сериализации: поля сортировки не
+    # входят в карточку товара
+    if sort_key:
+        products.sort(key=sort_key, reverse=True)
+
+    serializers = dict(PRODUCT_SERIALIZERS)
+    result = []
+    for product in products:
+        item = dict(serializers[type(product)](product).data)
+        item['product_type'] = product.PRODUCT_TYPE
+        result.append(item)
+    return result
+
+
+def get_collection(name):
+    """Сериализованная подборка из кэша"""
+    cache_key = COLLECTION_CACHE_KEY.format(name=name, language=get_language())
+    products = cache.get(cache_key)
+    if products is None:
+        products = build_collection(name)
+        cache.set(cache_key, products, COLLECTION_CACHE_TIMEOUT)
+    return products
+
+
+def collection_response(name, shuffle=False):
+    """Данные ответа API: подборка целиком или перемешанная выборка из неё"""
+    products = get_collection(name)
+    if shuffle:
+        products = random.sample(products, len(products))
+    return {
+        'count': len(products),
+        'results': products[:RESULTS_SIZE],
+    }
+
+
+def invalidate_collections():
+    """Сбрасывает кэш всех подборок главной страницы"""
+    cache.delete_many([
+        COLLECTION_CACHE_KEY.format(name=name, language=language)
+        for name in COLLECTIONS
+        for language, _ in settings.LANGUAGES
+    ])
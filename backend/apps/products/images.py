@@ -0,0 +1,116 @@
+from collections import defaultdict
+
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import Q
+
+from .models import ProductImage
+
+
+def is_svg_image(image):
+    """Проверка, является ли изображение SVG-заглушкой"""
+    return image.image.name.lower().endswith('.svg')
+
+
+def prioritize_images(images):
+    """Сортирует изображения: сначала реальные (не SVG), потом SVG"""
+    real_images = [image for image in images if not is_svg_image(image)]
+    svg_images = [image for image in images if is_svg_image(image)]
+    return real_images + svg_images
+
+
+def select_main_image(images):
+    """
+    Выбор основного изображения из уже отсортированного списка
+    (sort_order, created_at): основное реальное, любое реальное,
+    основное SVG, первое SVG.
+    """
+    real_images = [image for image in images if not is_svg_image(image)]
+    svg_images = [image for image in images if is_svg_image(image)]
+
+    for candidates in (real_images, svg_images):
+        for image in candidates:
+            if image.is_main:
+                return image
+        if candidates:
+            return candidates[0]
+
+    return None
+
+
+def image_key(product):
+    """Ключ товара в словаре изображений: (content_type_id, object_id)"""
+    content_type = ContentType.objects.get_for_model(product)
+    return content_type.id, product.pk
+
+
+def load_product_images(products):
+    """
+    Загружает изображения для списка товаров одним запросом.
+
+    Возвращает словарь {(content_type_id, object_id): [ProductImage, ...]},
+    изображения в каждом списке упорядочены по (sort_order, created_at).
+    Товары без изображений получают пустой список.
+    """
+    ids_by_content_type = defaultdict(set)
+    for product in products:
+        content_type_id, object_id = image_key(product)
+        ids_by_content_type[content_type_id].add(object_id)
+
+    images_map = {
+        (content_type_id, object_id): []
+        for content_type_id, object_ids in ids_by_content_type.items()
+        for object_id in object_ids
+    }
+    if not images_map:
+        return images_map
+
+    condition = Q()
+    for content_type_id, object_ids in ids_by_content_type.items():
+        condition |= Q(content_type_id=content_type_id, object_id__in=object_ids)
+
+    images = ProductImage.objects.filter(condition).order_by('sort_order', 'created_at', 'id')
+    for image in images:
+        images_map[(image.content_type_id, image.object_id)].append(image)
+
+    return images_map
+
+
+def refresh_main_image(product):
+    """Пересчитывает денормализованное поле main_image у товара"""
+    images = load_product_images([product])[image_key(product)]
+    main_image = select_main_image(images)
+    type(product).objects.filter(pk=product.pk).update(main_image=main_image)
+    product.main_image = main_image
+    return main_image
+
+
+def refresh_main_images(queryset, batch_size=500):
+    """
+    Пакетный пересчёт main_image для набора товаров одной модели.
+    Возвращает количество товаров, у которых основное изображение изменилось.
+    """
+    model = queryset.model
+    updated_count = 0
+    batch = []
+
+    def flush(products):
+        images_map = load_product_images(products)
+        changed = []
+        for product in products:
+            main_image = select_main_image(images_map[image_key(product)])
+            main_image_id = main_image.id if main_image else None
+            if product.main_image_id != main_image_id:
+                product.main_image_id = main_image_id
+                changed.append(product)
+        model.objects.bulk_update(changed, ['main_image'], batch_size=batch_size)
+        return len(changed)
+
+    for product in queryset.only('id', 'main_image').iterator(chunk_size=batch_size):
+        batch.append(product)
+        if len(batch) >= batch_size:
+            updated_count += flush(batch)
+            batch = []
+    if batch:
+        updated_count += flush(batch)
+
+    return updated_count
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from apps.products.models import TireProduct, WheelProduct
+from apps.products.images import refresh_main_images
+
+
+class Command(BaseCommand):
+    help = 'Recompute the denormalized main_image of tires and wheels'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='Размер пакета обновления')
+
+    def handle(self, *args, **options):
+        self.stdout.write('Пересчёт основных изображений товаров...')
+        
+        for model in (TireProduct, WheelProduct):
+            updated_count = refresh_main_images(model.objects.all(), batch_size=options['batch_size'])
+            self.stdout.write(f'{model._meta.verbose_name_plural}: обновлено {updated_count}')
+        
+        self.stdout.write(self.style.SUCCESS('Готово!'))
@@ -1,6 +1,6 @@
 from django.core.management.base import BaseCommand
-from apps.products.models import TireProduct, WheelProduct, ProductImage
-from django.contrib.contenttypes.models import ContentType
+from apps.products.models import TireProduct, WheelProduct
+from apps.products.images import load_product_images, image_key, is_svg_image, refresh_main_images
 
 
 class Command(BaseCommand):
@@ -11,56 +11,46 @@ class Command(BaseCommand):
         
         fixed_count = 0
         
-        # Обрабатываем шины
-        tires = TireProduct.objects.filter(is_active=True)
-        for tire in tires:
-            if self.fix_main_image_for_product(tire):
-                fixed_count += 1
-        
-        # Обрабатываем диски
-        wheels = WheelProduct.objects.filter(is_active=True)
-        for wheel in wheels:
-            if self.fix_main_image_for_product(wheel):
-                fixed_count += 1
+        # Обрабатываем шины и диски
+        for model in (TireProduct, WheelProduct):
+            products = list(model.objects.filter(is_active=True).only('id', 'name'))
+            images_map = load_product_images(products)
+            for product in products:
+                if self.fix_main_image_for_product(product, images_map[image_key(product)]):
+                    fixed_count += 1
         
         self.stdout.write(f'Исправлено товаров: {fixed_count}')
+        
+        # Пересчитываем денормализованное основное изображение
+        refreshed_count = sum(
+            refresh_main_images(model.objects.filter(is_active=True))
+            for model in (TireProduct, WheelProduct)
+        )
+        self.stdout.write(f'Обновлено основных изображений: {refreshed_count}')
         self.stdout.write(self.style.SUCCESS('Готово!'))
 
-    def fix_main_image_for_product(self, product):
+    def fix_main_image_for_product(self, product, images):
         """Исправляет основное изображение для конкретного товара"""
-        content_type = ContentType.objects.get_for_model(product)
-        
-        # Получаем все изображения товара
-        images = ProductImage.objects.filter(
-            content_type=content_type,
-            object_id=product.id
-        )
-        
-        if not images.exists():
+        if not images:
             return False
         
         # Ищем реальные изображения (не SVG)
-        real_images = images.exclude(image__iendswith='.svg')
-        svg_images = images.filter(image__iendswith='.svg')
+        real_images = [image for image in images if not is_svg_image(image)]
         
-        if not real_images.exists():
+        if not real_images:
             # Если реальных изображений нет, оставляем как есть
             return False
         
         # Проверяем, есть ли уже основное реальное изображение
-        main_real_image = real_images.filter(is_main=True).first()
-        
-        if main_real_image:
+        if any(image.is_main for image in real_images):
             # Уже есть основное реальное изображение, ничего не делаем
             return False
         
-        # Убираем флаг is_main у всех изображений
-        images.update(is_main=False)
-        
         # Устанавливаем первое реальное изображение как основное
-        first_real_image = real_images.order_by('sort_order', 'created_at').first()
+        # (ProductImage.save снимает флаг is_main с остальных изображений товара)
+        first_real_image = real_images[0]
         first_real_image.is_main = True
         first_real_image.save()
         
         self.stdout.write(f'✅ {product.name}: установлено основное изображение {first_real_image.image.name}')
-        return True 
\ No newline at end of file
+        return True
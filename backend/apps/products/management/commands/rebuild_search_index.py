@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+from apps.products.models import TireProduct, WheelProduct, CatalogEntry
+from apps.products.search import ensure_search_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the catalog full-text search index'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='Размер пакета обновления')
+
+    def handle(self, *args, **options):
+        self.stdout.write('Перестроение поискового индекса...')
+        
+        ensure_search_index()
+        
+        for model in (TireProduct, WheelProduct):
+            updated_count, created_count = CatalogEntry.sync_products(
+                model.objects.all(), batch_size=options['batch_size']
+            )
+            self.stdout.write(
+                f'{model._meta.verbose_name_plural}: обновлено {updated_count}, добавлено {created_count}'
+            )
+        
+        self.stdout.write(self.style.SUCCESS('Готово!'))
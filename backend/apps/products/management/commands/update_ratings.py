@@ -1,25 +1,29 @@
 from django.core.management.base import BaseCommand
-from django.db.models import Avg, Count
-from apps.products.models import Product
+from apps.products.homepage import invalidate_collections
+from apps.reviews.ratings import RATING_BATCH_SIZE, update_changed_ratings, update_ratings
+
 
 class Command(BaseCommand):
     help = 'Update product ratings based on reviews'
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--incremental', action='store_true',
+            help='Пересчитать только товары, отзывы которых менялись с прошлого запуска'
+        )
+        parser.add_argument('--batch-size', type=int, default=RATING_BATCH_SIZE, help='Размер пакета обновления')
+
     def handle(self, *args, **options):
         self.stdout.write('Обновление рейтингов товаров...')
         
-        products = Product.objects.annotate(
-            avg_rating=Avg('reviews__rating'),
-            review_count=Count('reviews')
-        )
-        
-        updated_count = 0
-        for product in products:
-            if product.avg_rating is not None:
-                product.rating = round(product.avg_rating, 2)
-                product.reviews_count = product.review_count
-                product.save(update_fields=['rating', 'reviews_count'])
-                updated_count += 1
-                self.stdout.write(f'Обновлен рейтинг для {product.name}: {product.rating} ({product.reviews_count} отзывов)')
+        if options['incremental']:
+            result = update_changed_ratings(batch_size=options['batch_size'])
+        else:
+            result = update_ratings(batch_size=options['batch_size'])
+        for model, updated_count in result.items():
+            self.stdout.write(f'{model._meta.verbose_name_plural}: обновлено {updated_count}')
         
-        self.stdout.write(self.style.SUCCESS(f'Обновлено рейтингов: {updated_count}')) 
\ No newline at end of file
+        if any(result.values()):
+            # Рейтинг входит в карточки подборок главной страницы
+            invalidate_collections()
+        self.stdout.write(self.style.SUCCESS(f'Обновлено рейтингов: {sum(result.values())}'))
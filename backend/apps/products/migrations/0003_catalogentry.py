@@ -0,0 +1,41 @@
+# Generated by Django 5.2.3 on 2026-10-18 14:02
+
+from django.db import migrations, models
+
+
+def populate_catalog_entries(apps, schema_editor):
+    CatalogEntry = apps.get_model('products', 'CatalogEntry')
+    for product_type, model_name in (('tire', 'TireProduct'), ('wheel', 'WheelProduct')):
+        model = apps.get_model('products', model_name)
+        CatalogEntry.objects.bulk_create([
+            CatalogEntry(product_type=product_type, product_id=product_id, slug=slug, is_active=is_active)
+            for product_id, slug, is_active in model.objects.values_list('id', 'slug', 'is_active')
+        ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0002_tireproduct_wheelproduct_main_image'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CatalogEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('product_type', models.CharField(choices=[('tire', 'Tires'), ('wheel', 'Wheels')], max_length=10, verbose_name='product type')),
+                ('product_id', models.PositiveIntegerField(verbose_name='product id')),
+                ('slug', models.SlugField(max_length=200, verbose_name='slug')),
+                ('is_active', models.BooleanField(default=True, verbose_name='is active')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='updated at')),
+            ],
+            options={
+                'verbose_name': 'Catalog Entry',
+                'verbose_name_plural': 'Catalog Entries',
+                'indexes': [models.Index(fields=['product_id'], name='products_ca_product_e56142_idx')],
+                'unique_together': {('product_type', 'product_id')},
+            },
+        ),
+        migrations.RunPython(populate_catalog_entries, migrations.RunPython.noop),
+    ]
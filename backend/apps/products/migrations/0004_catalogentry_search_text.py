@@ -0,0 +1,64 @@
+# Generated by Django 5.2.3 on 2026-10-18 14:05
+
+from django.db import migrations, models
+
+# DDL полнотекстового индекса записан здесь, а не импортируется из
+# apps.products.search: миграция не должна меняться вместе с кодом приложения
+SQLITE_CREATE = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS products_catalogentry_fts USING fts5("
+    "search_text, content='products_catalogentry', content_rowid='id')",
+    "CREATE TRIGGER IF NOT EXISTS products_catalogentry_fts_ai AFTER INSERT ON products_catalogentry BEGIN "
+    "INSERT INTO products_catalogentry_fts(rowid, search_text) VALUES (new.id, new.search_text); END",
+    "CREATE TRIGGER IF NOT EXISTS products_catalogentry_fts_ad AFTER DELETE ON products_catalogentry BEGIN "
+    "INSERT INTO products_catalogentry_fts(products_catalogentry_fts, rowid, search_text) "
+    "VALUES ('delete', old.id, old.search_text); END",
+    "CREATE TRIGGER IF NOT EXISTS products_catalogentry_fts_au AFTER UPDATE ON products_catalogentry BEGIN "
+    "INSERT INTO products_catalogentry_fts(products_catalogentry_fts, rowid, search_text) "
+    "VALUES ('delete', old.id, old.search_text); "
+    "INSERT INTO products_catalogentry_fts(rowid, search_text) VALUES (new.id, new.search_text); END",
+    "INSERT INTO products_catalogentry_fts(products_catalogentry_fts) VALUES ('rebuild')",
+]
+
+SQLITE_DROP = [
+    "DROP TRIGGER IF EXISTS products_catalogentry_fts_ai",
+    "DROP TRIGGER IF EXISTS products_catalogentry_fts_ad",
+    "DROP TRIGGER IF EXISTS products_catalogentry_fts_au",
+    "DROP TABLE IF EXISTS products_catalogentry_fts",
+]
+
+MYSQL_CREATE = [
+    "CREATE FULLTEXT INDEX products_catalogentry_search_text_ft ON products_catalogentry (search_text)",
+]
+
+MYSQL_DROP = [
+    "DROP INDEX products_catalogentry_search_text_ft ON products_catalogentry",
+]
+
+
+def run_statements(schema_editor, statements):
+    for statement in statements.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(statement)
+
+
+def create_index(apps, schema_editor):
+    run_statements(schema_editor, {'sqlite': SQLITE_CREATE, 'mysql': MYSQL_CREATE})
+
+
+def drop_index(apps, schema_editor):
+    run_statements(schema_editor, {'sqlite': SQLITE_DROP, 'mysql': MYSQL_DROP})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0003_catalogentry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='catalogentry',
+            name='search_text',
+            field=models.TextField(blank=True, verbose_name='search text'),
+        ),
+        migrations.RunPython(create_index, drop_index),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.3 on 2026-10-18 14:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0004_catalogentry_search_text'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='tireproduct',
+            index=models.Index(fields=['diameter'], name='products_ti_diamete_a11748_idx'),
+        ),
+    ]
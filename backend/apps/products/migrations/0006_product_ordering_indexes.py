@@ -0,0 +1,29 @@
+# Generated by Django 5.2.3 on 2026-10-18 14:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0005_tireproduct_diameter_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='tireproduct',
+            index=models.Index(fields=['-sales_count'], name='products_ti_sales_c_54a27c_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tireproduct',
+            index=models.Index(fields=['-created_at'], name='products_ti_created_a94851_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='wheelproduct',
+            index=models.Index(fields=['-sales_count'], name='products_wh_sales_c_b89fda_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='wheelproduct',
+            index=models.Index(fields=['-created_at'], name='products_wh_created_6a4e68_idx'),
+        ),
+    ]
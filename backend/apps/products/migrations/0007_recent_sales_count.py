@@ -0,0 +1,31 @@
+# Generated by Django 5.2.3 on 2026-10-18 14:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0006_product_ordering_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tireproduct',
+            name='recent_sales_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='recent sales count'),
+        ),
+        migrations.AddField(
+            model_name='wheelproduct',
+            name='recent_sales_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='recent sales count'),
+        ),
+        migrations.AddIndex(
+            model_name='tireproduct',
+            index=models.Index(fields=['-recent_sales_count'], name='products_ti_recent__a678f6_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='wheelproduct',
+            index=models.Index(fields=['-recent_sales_count'], name='products_wh_recent__588a94_idx'),
+        ),
+    ]
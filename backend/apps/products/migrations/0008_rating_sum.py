@@ -0,0 +1,50 @@
+# Generated by Django 5.2.3 on 2026-10-18 14:31
+
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def populate_rating_sums(apps, schema_editor):
+    """Рейтинги, количество и сумма оценок по одобренным отзывам"""
+    ContentType = apps.get_model('contenttypes', 'ContentType')
+    Review = apps.get_model('reviews', 'Review')
+    for model_name in ('TireProduct', 'WheelProduct'):
+        model = apps.get_model('products', model_name)
+        content_type = ContentType.objects.filter(app_label='products', model=model_name.lower()).first()
+        model.objects.update(rating=0, reviews_count=0, rating_sum=0)
+        if content_type is None:
+            continue
+        rows = (
+            Review.objects.filter(content_type=content_type, status='approved')
+            .values('object_id').annotate(count=Count('pk'), total=Sum('rating')).order_by()
+        )
+        products = []
+        for row in rows:
+            rating = (Decimal(row['total']) / row['count']).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+            products.append(model(pk=row['object_id'], rating=rating, reviews_count=row['count'], rating_sum=row['total']))
+        model.objects.bulk_update(products, ['rating', 'reviews_count', 'rating_sum'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('reviews', '0001_initial'),
+        ('products', '0007_recent_sales_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tireproduct',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0, verbose_name='rating sum'),
+        ),
+        migrations.AddField(
+            model_name='wheelproduct',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0, verbose_name='rating sum'),
+        ),
+        migrations.RunPython(populate_rating_sums, migrations.RunPython.noop),
+    ]
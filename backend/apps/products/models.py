@@ -3,6 +3,7 @@ from django.utils.translation import gettext_lazy as _
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils.text import slugify
 import uuid
+from .stemmer import tokenize
 
 
 class Category(models.Model):
@@ -90,6 +91,8 @@ class Brand(models.Model):
 class TireProduct(models.Model):
     """Модель для шин"""
     
+    PRODUCT_TYPE = 'tire'
+    
     SEASONS = [
         ('summer', _('Summer')),
         ('winter', _('Winter')),
@@ -106,6 +109,10 @@ class TireProduct(models.Model):
     category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='tire_products')
     brand = models.ForeignKey(Brand, on_delete=models.CASCADE, related_name='tire_products')
     
+    # Основное изображение (пересчитывается при изменении изображений товара)
+    main_image = models.ForeignKey('ProductImage', on_delete=models.SET_NULL, null=True, blank=True,
+                                   related_name='+', editable=False, verbose_name=_('main image'))
+    
     # Сезон
     season = models.CharField(_('season'), max_length=20, choices=SEASONS)
     
@@ -166,10 +173,14 @@ class TireProduct(models.Model):
     # Рейтинг и отзывы
     rating = models.DecimalField(_('rating'), max_digits=3, decimal_places=2, default=0)
     reviews_count = models.PositiveIntegerField(_('reviews count'), default=0)
+    # Сумма оценок одобренных отзывов: рейтинг = rating_sum / reviews_count
+    rating_sum = models.PositiveIntegerField(_('rating sum'), default=0)
     
     # Счетчики
     views_count = models.PositiveIntegerField(_('views count'), default=0)
     sales_count = models.PositiveIntegerField(_('sales count'), default=0)
+    # Продажи за последние дни (apps.orders.sales.SALES_WINDOW)
+    recent_sales_count = models.PositiveIntegerField(_('recent sales count'), default=0)
     
     # SEO
     meta_title = models.CharField(_('meta title'), max_length=200, blank=True)
@@ -189,7 +200,11 @@ class TireProduct(models.Model):
             models.Index(fields=['brand', 'category']),
             models.Index(fields=['price']),
             models.Index(fields=['-rating']),
+            models.Index(fields=['-sales_count']),
+            models.Index(fields=['-recent_sales_count']),
+            models.Index(fields=['-created_at']),
             models.Index(fields=['width', 'profile', 'diameter']),
+            models.Index(fields=['diameter']),
         ]
     
     def __str__(self):
@@ -199,6 +214,11 @@ class TireProduct(models.Model):
     def size_string(self):
         return f"{self.width}/{self.profile}R{self.diameter}"
     
+    @property
+    def search_keywords(self):
+        """Варианты записи размера для полнотекстового поиска"""
+        return f"{self.size_string} R{self.diameter} {self.width}{self.profile}R{self.diameter}"
+    
     @property
     def final_price(self):
         """Финальная цена с учетом скидки"""
@@ -232,6 +252,8 @@ class TireProduct(models.Model):
 class WheelProduct(models.Model):
     """Модель для дисков"""
     
+    PRODUCT_TYPE = 'wheel'
+    
     WHEEL_TYPES = [
         ('alloy', _('Alloy')),
         ('steel', _('Steel')),
@@ -249,6 +271,10 @@ class WheelProduct(models.Model):
     category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='wheel_products')
     brand = models.ForeignKey(Brand, on_delete=models.CASCADE, related_name='wheel_products')
     
+    # Основное изображение (пересчитывается при изменении изображений товара)
+    main_image = models.ForeignKey('ProductImage', on_delete=models.SET_NULL, null=True, blank=True,
+                                   related_name='+', editable=False, verbose_name=_('main image'))
+    
     # Описание
     short_description = models.TextField(_('short description'), max_length=500, blank=True)
     description = models.TextField(_('description'), blank=True)
@@ -301,10 +327,14 @@ class WheelProduct(models.Model):
     # Рейтинг и отзывы
     rating = models.DecimalField(_('rating'), max_digits=3, decimal_places=2, default=0)
     reviews_count = models.PositiveIntegerField(_('reviews count'), default=0)
+    # Сумма оценок одобренных отзывов: рейтинг = rating_sum / reviews_count
+    rating_sum = models.PositiveIntegerField(_('rating sum'), default=0)
     
     # Счетчики
     views_count = models.PositiveIntegerField(_('views count'), default=0)
     sales_count = models.PositiveIntegerField(_('sales count'), default=0)
+    # Продажи за последние дни (apps.orders.sales.SALES_WINDOW)
+    recent_sales_count = models.PositiveIntegerField(_('recent sales count'), default=0)
     
     # SEO
     meta_title = models.CharField(_('meta title'), max_length=200, blank=True)
@@ -324,12 +354,22 @@ class WheelProduct(models.Model):
             models.Index(fields=['brand', 'category']),
             models.Index(fields=['price']),
             models.Index(fields=['-rating']),
+            models.Index(fields=['-sales_count']),
+            models.Index(fields=['-recent_sales_count']),
+            models.Index(fields=['-created_at']),
             models.Index(fields=['diameter', 'width']),
         ]
     
     def __str__(self):
         return f"{self.brand.name} {self.name} {self.diameter}x{self.width} {self.bolt_pattern}"
     
+    @property
+    def search_keywords(self):
+        """Варианты записи размера для полнотекстового поиска"""
+        diameter = format(self.diameter.normalize(), 'f')
+        width = format(self.width.normalize(), 'f')
+        return f"R{diameter} {width}x{diameter} {self.bolt_pattern} ET{self.offset}"
+    
     @property
     def final_price(self):
         """Финальная цена с учетом скидки"""
@@ -399,3 +439,107 @@ class ProductImage(models.Model):
         super().save(*args, **kwargs)
 
 
+class CatalogEntry(models.Model):
+    """Единый индекс каталога: поиск товара по slug или по (product_type, product_id)"""
+    
+    PRODUCT_TYPES = [
+        ('tire', _('Tires')),
+        ('wheel', _('Wheels')),
+    ]
+    
+    # Slug и id уникальны только внутри типа: при совпадении выбирается тип,
+    # стоящий раньше в этом списке
+    TYPE_PRIORITY = ['tire', 'wheel']
+    
+    product_type = models.CharField(_('product type'), max_length=10, choices=PRODUCT_TYPES)
+    product_id = models.PositiveIntegerField(_('product id'))
+    slug = models.SlugField(_('slug'), max_length=200)
+    is_active = models.BooleanField(_('is active'), default=True)
+    
+    # Основы слов названия, бренда, размера и описания для полнотекстового поиска
+    search_text = models.TextField(_('search text'), blank=True)
+    
+    updated_at = models.DateTimeField(_('updated at'), auto_now=True)
+    
+    class Meta:
+        verbose_name = _('Catalog Entry')
+        verbose_name_plural = _('Catalog Entries')
+        unique_together = ['product_type', 'product_id']
+        indexes = [
+            models.Index(fields=['product_id']),
+        ]
+    
+    def __str__(self):
+        return f"{self.product_type}:{self.product_id} ({self.slug})"
+    
+    @staticmethod
+    def get_product_model(product_type):
+        """Модель товара по его типу"""
+        return {
+            TireProduct.PRODUCT_TYPE: TireProduct,
+            WheelProduct.PRODUCT_TYPE: WheelProduct,
+        }[product_type]
+    
+    @classmethod
+    def type_priority(cls):
+        """Выражение для order_by: записи типа с большим приоритетом идут первыми"""
+        return models.Case(
+            *[models.When(product_type=product_type, then=models.Value(position))
+              for position, product_type in enumerate(cls.TYPE_PRIORITY)],
+            output_field=models.IntegerField(),
+        )
+    
+    @staticmethod
+    def build_search_text(product):
+        """Текст поискового индекса товара"""
+        # Бренд и название повторяются, чтобы весить больше описания
+        title = f"{product.brand.name} {product.name}"
+        text = ' '.join([title, title, product.search_keywords, product.description])
+        return ' '.join(tokenize(text))
+    
+    @classmethod
+    def sync_product(cls, product):
+        """Обновляет запись индекса для товара"""
+        cls.objects.update_or_create(
+            product_type=product.PRODUCT_TYPE,
+            product_id=product.pk,
+            defaults={
+                'slug': product.slug,
+                'is_active': product.is_active,
+                'search_text': cls.build_search_text(product),
+            },
+        )
+    
+    @classmethod
+    def sync_products(cls, queryset, batch_size=500):
+        """
+        Пакетно обновляет записи индекса для товаров одной модели.
+        Возвращает (количество обновлённых, количество добавленных).
+        """
+        product_type = queryset.model.PRODUCT_TYPE
+        product_ids = queryset.values('pk')
+        entries = {
+            entry.product_id: entry
+            for entry in cls.objects.filter(product_type=product_type, product_id__in=product_ids)
+        }
+        to_update, to_create = [], []
+        
+        for product in queryset.select_related('brand').iterator(chunk_size=batch_size):
+            entry = entries.get(product.pk)
+            if entry is None:
+                entry = cls(product_type=product_type, product_id=product.pk)
+                to_create.append(entry)
+            else:
+                to_update.append(entry)
+            entry.slug = product.slug
+            entry.is_active = product.is_active
+            entry.search_text = cls.build_search_text(product)
+        
+        cls.objects.bulk_update(to_update, ['slug', 'is_active', 'search_text'], batch_size=batch_size)
+        cls.objects.bulk_create(to_create, batch_size=batch_size)
+        return len(to_update), len(to_create)
+    
+    @classmethod
+    def remove_product(cls, product):
+        """Удаляет запись индекса для товара"""
+        cls.objects.filter(product_type=product.PRODUCT_TYPE, product_id=product.pk).delete()
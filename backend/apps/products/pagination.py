@@ -0,0 +1,71 @@
+"""
+Пагинация каталога.
+
+ProductPagination - обычные страницы с общим количеством товаров
+(количество кэшируется по набору фильтров, см. counts.py).
+ProductCursorPagination - keyset-пагинация для бесконечной прокрутки и
+краулеров (apps.core.pagination.KeysetPagination).
+"""
+from django.core.paginator import Paginator as DjangoPaginator
+from django.utils.functional import cached_property
+from rest_framework.pagination import PageNumberPagination
+
+from apps.core.pagination import KeysetPagination
+
+from .counts import get_product_count
+
+
+class CachedCountPaginator(DjangoPaginator):
+    """Paginator, который берёт количество объектов из кэша счётчиков каталога"""
+
+    def __init__(self, object_list, per_page, product_type, params, estimated=False, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.product_type = product_type
+        self.params = params
+        self.estimated = estimated
+        self.count_estimated = False
+
+    @cached_property
+    def count(self):
+        count, self.count_estimated = get_product_count(
+            self.object_list, self.product_type, self.params, estimated=self.estimated
+        )
+        return count
+
+
+class ProductPagination(PageNumberPagination):
+    """
+    Страницы с общим количеством товаров. Количество берётся из кэша
+    по набору фильтров; count=estimated разрешает приблизительное значение
+    для больших выборок (в ответе появляется count_estimated).
+    """
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    count_query_param = 'count'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.estimated = request.query_params.get(self.count_query_param) == 'estimated'
+        return super().paginate_queryset(queryset, request, view)
+
+    def django_paginator_class(self, queryset, page_size):
+        params = self.request.query_params
+        return CachedCountPaginator(
+            queryset, page_size,
+            product_type=params.get('product_type', 'tire'),
+            params=params,
+            estimated=self.estimated,
+        )
+
+    def get_paginated_response(self, data):
+        response = super().get_paginated_response(data)
+        if self.estimated:
+            response.data['count_estimated'] = self.page.paginator.count_estimated
+        return response
+
+
+class ProductCursorPagination(KeysetPagination):
+    """Курсорная пагинация каталога для бесконечной прокрутки и краулеров"""
+    # Сортировки каталога, для которых есть индекс (неявно дополненный id)
+    orderings = ('-sales_count', '-recent_sales_count', 'price', '-rating', '-created_at')
+    default_ordering = '-sales_count'
@@ -0,0 +1,156 @@
+"""
+Полнотекстовый поиск по товарам на основе CatalogEntry.search_text
+и поиск по размерам (см. sizes.py).
+
+MySQL (продакшен) использует FULLTEXT-индекс, SQLite (разработка) -
+виртуальную таблицу FTS5, синхронизируемую триггерами. Для остальных СУБД
+используется поиск по вхождению подстроки.
+"""
+from django.db import connection
+from django.db.models.expressions import RawSQL
+
+from .stemmer import tokenize
+from .sizes import parse_size_query
+
+
+CATALOG_TABLE = 'products_catalogentry'
+FTS_TABLE = 'products_catalogentry_fts'
+FULLTEXT_INDEX = 'products_catalogentry_search_text_ft'
+
+# Минимальная длина слова в FULLTEXT-индексе InnoDB (innodb_ft_min_token_size)
+MYSQL_MIN_TOKEN_SIZE = 3
+# Более короткие слова не ищутся: это предлоги и обрывки ("в", "к", "x"),
+# которые почти ничего не отсекают
+MIN_TERM_LENGTH = 2
+
+SQLITE_CREATE = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    f"search_text, content='{CATALOG_TABLE}', content_rowid='id')",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON {CATALOG_TABLE} BEGIN "
+    f"INSERT INTO {FTS_TABLE}(rowid, search_text) VALUES (new.id, new.search_text); END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON {CATALOG_TABLE} BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, search_text) VALUES ('delete', old.id, old.search_text); END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE ON {CATALOG_TABLE} BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, search_text) VALUES ('delete', old.id, old.search_text); "
+    f"INSERT INTO {FTS_TABLE}(rowid, search_text) VALUES (new.id, new.search_text); END",
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+]
+
+SQLITE_DROP = [
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_ai",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_ad",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_au",
+    f"DROP TABLE IF EXISTS {FTS_TABLE}",
+]
+
+
+def ensure_search_index():
+    """Пересоздаёт FTS5-таблицу и триггеры SQLite (после перестройки таблицы)"""
+    if connection.vendor == 'sqlite':
+        with connection.schema_editor() as schema_editor:
+            for statement in SQLITE_DROP + SQLITE_CREATE:
+                schema_editor.execute(statement)
+
+
+def search_terms(query):
+    """
+    Основы слов запроса, по которым стоит искать: слово короче, чем хранит
+    индекс, не найдётся ни в одном товаре и обнулит весь запрос
+    """
+    min_length = MYSQL_MIN_TOKEN_SIZE if connection.vendor == 'mysql' else MIN_TERM_LENGTH
+    return [term for term in tokenize(query) if len(term) >= min_length]
+
+
+def build_match_query(query):
+    """Запрос для MATCH: все основы слов запроса как префиксы"""
+    terms = search_terms(query)
+    if connection.vendor == 'mysql':
+        return ' '.join(f'+{term}*' for term in terms)
+    if connection.vendor == 'sqlite':
+        return ' '.join(f'"{term}"*' for term in terms)
+    return terms
+
+
+def search_sql(query, product_type):
+    """
+    SQL, возвращающий (product_id, score) найденных активных товаров,
+    где меньший score означает более релевантный результат.
+    """
+    match = build_match_query(query)
+    if not match:
+        return None, None
+
+    if connection.vendor == 'mysql':
+        sql = (
+            f"SELECT product_id, -MATCH(search_text) AGAINST (%s IN BOOLEAN MODE) AS score "
+            f"FROM {CATALOG_TABLE} "
+            f"WHERE product_type = %s AND is_active AND MATCH(search_text) AGAINST (%s IN BOOLEAN MODE)"
+        )
+        return sql, [match, product_type, match]
+
+    if connection.vendor == 'sqlite':
+        sql = (
+            f"SELECT c.product_id, bm25({FTS_TABLE}) AS score "
+            f"FROM {FTS_TABLE} JOIN {CATALOG_TABLE} c ON c.id = {FTS_TABLE}.rowid "
+            f"WHERE {FTS_TABLE} MATCH %s AND c.product_type = %s AND c.is_active"
+        )
+        return sql, [match, product_type]
+
+    conditions = ' AND '.join(['search_text LIKE %s'] * len(match))
+    sql = (
+        f"SELECT product_id, 0 AS score FROM {CATALOG_TABLE} "
+        f"WHERE product_type = %s AND is_active AND {conditions}"
+    )
+    return sql, [product_type] + [f'%{term}%' for term in match]
+
+
+def filter_by_search(queryset, product_type, query):
+    """Оставляет в queryset только товары, найденные полнотекстовым поиском"""
+    sql, params = search_sql(query, product_type)
+    if sql is None:
+        return queryset.none()
+    return queryset.filter(id__in=RawSQL(f"SELECT product_id FROM ({sql}) AS found", params))
+
+
+def search_product_ids(query, product_type, limit=None):
+    """Идентификаторы найденных товаров в порядке релевантности"""
+    sql, params = search_sql(query, product_type)
+    if sql is None:
+        return []
+    sql = f"{sql} ORDER BY score"
+    if limit:
+        sql = f"{sql} LIMIT {int(limit)}"
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [row[0] for row in cursor.fetchall()]
+
+
+def apply_search(queryset, product_type, query):
+    """
+    Поиск для строки поиска: размер шины или диска (если распознан) ищется
+    по составным индексам размеров, остальной текст - полнотекстовым поиском.
+    """
+    size_query = parse_size_query(query)
+    if not size_query:
+        return filter_by_search(queryset, product_type, query)
+
+    filters = size_query.filters_for(product_type)
+    if filters is None:
+        return queryset.none()
+    queryset = queryset.filter(**filters)
+    # Остаток запроса без значимых слов ("R17 к") не сужает поиск по размеру
+    if search_terms(size_query.text):
+        queryset = filter_by_search(queryset, product_type, size_query.text)
+    return queryset
+
+
+def ranked_search(queryset, product_type, query, limit=None):
+    """Список найденных товаров из queryset, отсортированный по релевантности"""
+    if parse_size_query(query):
+        # Поиск по размеру: порядок по умолчанию из queryset
+        queryset = apply_search(queryset, product_type, query)
+        return list(queryset[:limit] if limit else queryset)
+
+    ids = search_product_ids(query, product_type, limit)
+    products = queryset.in_bulk(ids)
+    return [products[product_id] for product_id in ids if product_id in products]
@@ -1,6 +1,7 @@
 from rest_framework import serializers
+from django.db import models
 from .models import Category, Brand, TireProduct, WheelProduct, ProductImage
-from django.contrib.contenttypes.models import ContentType
+from .images import image_key, load_product_images, prioritize_images
 
 
 class CategorySerializer(serializers.ModelSerializer):
@@ -42,7 +43,40 @@ class ProductImageSerializer(serializers.ModelSerializer):
         return None
 
 
-class TireProductSerializer(serializers.ModelSerializer):
+class ProductListSerializer(serializers.ListSerializer):
+    """Список товаров с пакетной загрузкой изображений"""
+    
+    def to_representation(self, data):
+        # Загружаем изображения всей страницы одним запросом
+        products = list(data.all() if isinstance(data, models.manager.BaseManager) else data)
+        images_map = self.context.setdefault('product_images', {})
+        images_map.update(load_product_images(products))
+        return super().to_representation(products)
+
+
+class ProductImagesMixin:
+    """Изображения товара из предзагруженного словаря context['product_images']"""
+    
+    def _get_product_images(self, obj):
+        images_map = self.context.setdefault('product_images', {})
+        key = image_key(obj)
+        if key not in images_map:
+            images_map.update(load_product_images([obj]))
+        return images_map[key]
+    
+    def get_images(self, obj):
+        """Получение всех изображений товара с приоритетом реальных изображений"""
+        sorted_images = prioritize_images(self._get_product_images(obj))
+        return ProductImageSerializer(sorted_images, many=True).data
+    
+    def get_main_image(self, obj):
+        """Основное изображение из денормализованного поля main_image"""
+        if obj.main_image:
+            return ProductImageSerializer(obj.main_image).data
+        return None
+
+
+class TireProductSerializer(ProductImagesMixin, serializers.ModelSerializer):
     """Сериализатор для шин"""
     brand = BrandSerializer(read_only=True)
     category = CategorySerializer(read_only=True)
@@ -54,74 +88,8 @@ class TireProductSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = TireProduct
-        fields = '__all__'
-    
-    def get_images(self, obj):
-        """Получение всех изображений товара с приоритетом реальных изображений"""
-        content_type = ContentType.objects.get_for_model(obj)
-        images = ProductImage.objects.filter(
-            content_type=content_type,
-            object_id=obj.id
-        ).order_by('sort_order', 'created_at')
-        
-        # Сортируем: сначала реальные изображения (не SVG), потом SVG
-        real_images = []
-        svg_images = []
-        
-        for image in images:
-            if image.image.name.endswith('.svg'):
-                svg_images.append(image)
-            else:
-                real_images.append(image)
-        
-        # Объединяем: сначала реальные, потом SVG
-        sorted_images = real_images + svg_images
-        
-        return ProductImageSerializer(sorted_images, many=True).data
-    
-    def get_main_image(self, obj):
-        """Получение основного изображения с приоритетом реальных изображений"""
-        content_type = ContentType.objects.get_for_model(obj)
-        
-        # Сначала ищем основное изображение среди реальных (не SVG)
-        main_real_image = ProductImage.objects.filter(
-            content_type=content_type,
-            object_id=obj.id,
-            is_main=True
-        ).exclude(image__iendswith='.svg').first()
-        
-        if main_real_image:
-            return ProductImageSerializer(main_real_image).data
-        
-        # Если основного реального нет, ищем любое реальное изображение
-        any_real_image = ProductImage.objects.filter(
-            content_type=content_type,
-            object_id=obj.id
-        ).exclude(image__iendswith='.svg').order_by('sort_order', 'created_at').first()
-        
-        if any_real_image:
-            return ProductImageSerializer(any_real_image).data
-        
-        # Если реальных нет, берем основное SVG
-        main_svg_image = ProductImage.objects.filter(
-            content_type=content_type,
-            object_id=obj.id,
-            is_main=True
-        ).filter(image__iendswith='.svg').first()
-        
-        if main_svg_image:
-            return ProductImageSerializer(main_svg_image).data
-        
-        # Если и основного SVG нет, берем первое SVG по порядку
-        first_svg_image = ProductImage.objects.filter(
-            content_type=content_type,
-            object_id=obj.id
-        ).filter(image__iendswith='.svg').order_by('sort_order', 'created_at').first()
-        
-        if first_svg_image:
-            return ProductImageSerializer(first_svg_image).data
-        
-        return None
+        exclude = ['cost_price']
+        list_serializer_class = ProductListSerializer
     
     def get_euLabel(self, obj):
         """Получение данных EU-этикетки"""
@@ -134,7 +102,7 @@ class TireProductSerializer(serializers.ModelSerializer):
         return None
 
 
-class WheelProductSerializer(serializers.ModelSerializer):
+class WheelProductSerializer(ProductImagesMixin, serializers.ModelSerializer):
     """Сериализатор для дисков"""
     brand = BrandSerializer(read_only=True)
     category = CategorySerializer(read_only=True)
@@ -145,71 +113,73 @@ class WheelProductSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = WheelProduct
-        fields = '__all__'
+        exclude = ['cost_price']
+        list_serializer_class = ProductListSerializer
+
+
+class BrandCardSerializer(serializers.ModelSerializer):
+    """Бренд в карточке товара"""
     
-    def get_images(self, obj):
-        """Получение всех изображений товара с приоритетом реальных изображений"""
-        content_type = ContentType.objects.get_for_model(obj)
-        images = ProductImage.objects.filter(
-            content_type=content_type,
-            object_id=obj.id
-        ).order_by('sort_order', 'created_at')
-        
-        # Сортируем: сначала реальные изображения (не SVG), потом SVG
-        real_images = []
-        svg_images = []
-        
-        for image in images:
-            if image.image.name.endswith('.svg'):
-                svg_images.append(image)
-            else:
-                real_images.append(image)
-        
-        # Объединяем: сначала реальные, потом SVG
-        sorted_images = real_images + svg_images
-        
-        return ProductImageSerializer(sorted_images, many=True).data
+    class Meta:
+        model = Brand
+        fields = ['id', 'name', 'slug']
+
+
+class ProductCardImageSerializer(ProductImageSerializer):
+    """Основное изображение в карточке товара"""
     
-    def get_main_image(self, obj):
-        """Получение основного изображения с приоритетом реальных изображений"""
-        content_type = ContentType.objects.get_for_model(obj)
-        
-        # Сначала ищем основное изображение среди реальных (не SVG)
-        main_real_image = ProductImage.objects.filter(
-            content_type=content_type,
-            object_id=obj.id,
-            is_main=True
-        ).exclude(image__iendswith='.svg').first()
-        
-        if main_real_image:
-            return ProductImageSerializer(main_real_image).data
-        
-        # Если основного реального нет, ищем любое реальное изображение
-        any_real_image = ProductImage.objects.filter(
-            content_type=content_type,
-            object_id=obj.id
-        ).exclude(image__iendswith='.svg').order_by('sort_order', 'created_at').first()
-        
-        if any_real_image:
-            return ProductImageSerializer(any_real_image).data
-        
-        # Если реальных нет, берем основное SVG
-        main_svg_image = ProductImage.objects.filter(
-            content_type=content_type,
-            object_id=obj.id,
-            is_main=True
-        ).filter(image__iendswith='.svg').first()
-        
-        if main_svg_image:
-            return ProductImageSerializer(main_svg_image).data
-        
-        # Если и основного SVG нет, берем первое SVG по порядку
-        first_svg_image = ProductImage.objects.filter(
-            content_type=content_type,
-            object_id=obj.id
-        ).filter(image__iendswith='.svg').order_by('sort_order', 'created_at').first()
-        
-        if first_svg_image:
-            return ProductImageSerializer(first_svg_image).data
-        
-        return None
+    class Meta(ProductImageSerializer.Meta):
+        fields = ['id', 'image', 'alt_text']
+
+
+class SparseFieldsMixin:
+    """
+    Выборка полей параметром fields=id,name,price: остальные поля не
+    сериализуются. Неизвестные имена игнорируются.
+    """
+    
+    def get_fields(self):
+        fields = super().get_fields()
+        request = self.context.get('request')
+        requested = request.query_params.get('fields') if request else None
+        if requested:
+            names = {name.strip() for name in requested.split(',')}
+            fields = {name: field for name, field in fields.items() if name in names}
+        return fields
+
+
+# Поля карточки товара в списках (UniversalProductCard)
+PRODUCT_CARD_FIELDS = [
+    'id', 'name', 'slug', 'sku', 'brand', 'main_image',
+    'price', 'old_price', 'final_price', 'is_in_stock',
+    'is_new', 'is_bestseller', 'is_on_sale', 'rating', 'reviews_count',
+]
+
+
+class TireProductCardSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    """Карточка шины для списков товаров"""
+    brand = BrandCardSerializer(read_only=True)
+    main_image = ProductCardImageSerializer(read_only=True)
+    is_in_stock = serializers.ReadOnlyField()
+    final_price = serializers.ReadOnlyField()
+    
+    class Meta:
+        model = TireProduct
+        fields = PRODUCT_CARD_FIELDS + [
+            'season', 'width', 'profile', 'diameter',
+            'fuel_efficiency', 'wet_grip', 'noise_level',
+        ]
+
+
+class WheelProductCardSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    """Карточка диска для списков товаров"""
+    brand = BrandCardSerializer(read_only=True)
+    main_image = ProductCardImageSerializer(read_only=True)
+    is_in_stock = serializers.ReadOnlyField()
+    final_price = serializers.ReadOnlyField()
+    
+    class Meta:
+        model = WheelProduct
+        fields = PRODUCT_CARD_FIELDS + [
+            'diameter', 'width', 'offset', 'bolt_pattern', 'wheel_type',
+        ]
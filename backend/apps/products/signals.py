@@ -0,0 +1,89 @@
+from django.contrib.contenttypes.models import ContentType
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .models import Brand, Category, TireProduct, WheelProduct, ProductImage, CatalogEntry
+from .images import refresh_main_image
+from .facets import invalidate_facets
+from .counts import invalidate_counts
+from .homepage import invalidate_collections
+from .suggestions import record_change
+
+
+PRODUCT_MODELS = (TireProduct, WheelProduct)
+
+
+def get_image_product_model(image):
+    """Модель товара, к которому привязано изображение (или None)"""
+    model = ContentType.objects.get_for_id(image.content_type_id).model_class()
+    return model if model in PRODUCT_MODELS else None
+
+
+@receiver([post_save, post_delete], sender=ProductImage)
+def update_product_main_image(sender, instance, **kwargs):
+    """Пересчёт основного изображения товара при изменении его изображений"""
+    model = get_image_product_model(instance)
+    if model is not None:
+        refresh_main_image(model(pk=instance.object_id))
+
+
+@receiver(post_save, sender=TireProduct)
+@receiver(post_save, sender=WheelProduct)
+def sync_catalog_entry(sender, instance, **kwargs):
+    """Синхронизация единого индекса каталога при сохранении товара"""
+    CatalogEntry.sync_product(instance)
+
+
+@receiver(post_save, sender=Brand)
+def sync_brand_catalog_entries(sender, instance, created, **kwargs):
+    """Обновление поискового текста товаров бренда (название бренда входит в индекс)"""
+    if not created:
+        for model in PRODUCT_MODELS:
+            CatalogEntry.sync_products(model.objects.filter(brand=instance))
+
+
+@receiver(post_delete, sender=TireProduct)
+@receiver(post_delete, sender=WheelProduct)
+def remove_catalog_entry(sender, instance, **kwargs):
+    """Удаление товара из единого индекса каталога"""
+    CatalogEntry.remove_product(instance)
+
+
+@receiver([post_save, post_delete], sender=TireProduct)
+@receiver([post_save, post_delete], sender=WheelProduct)
+@receiver([post_save, post_delete], sender=Brand)
+@receiver([post_save, post_delete], sender=Category)
+def reset_facets_cache(sender, **kwargs):
+    """Сброс кэша фасетов каталога при изменении товаров, брендов и категорий"""
+    invalidate_facets()
+
+
+@receiver([post_save, post_delete], sender=TireProduct)
+@receiver([post_save, post_delete], sender=WheelProduct)
+@receiver([post_save, post_delete], sender=Brand)
+@receiver([post_save, post_delete], sender=Category)
+@receiver([post_save, post_delete], sender=ProductImage)
+def reset_homepage_collections(sender, **kwargs):
+    """Сброс кэша подборок главной страницы"""
+    invalidate_collections()
+
+
+@receiver([post_save, post_delete], sender=TireProduct)
+@receiver([post_save, post_delete], sender=WheelProduct)
+@receiver([post_save, post_delete], sender=Brand)
+def reset_product_counts(sender, **kwargs):
+    """Сброс кэша количества товаров в списке каталога"""
+    invalidate_counts()
+
+
+@receiver([post_save, post_delete], sender=TireProduct)
+@receiver([post_save, post_delete], sender=WheelProduct)
+def record_product_suggestion_change(sender, instance, **kwargs):
+    """Журнал изменений для индекса подсказок поиска"""
+    record_change(('product', instance.PRODUCT_TYPE, instance.pk))
+
+
+@receiver([post_save, post_delete], sender=Brand)
+def record_brand_suggestion_change(sender, instance, **kwargs):
+    """Журнал изменений для индекса подсказок поиска"""
+    record_change(('brand', instance.pk))
@@ -0,0 +1,119 @@
+"""
+Разбор размеров шин и дисков в поисковых запросах.
+
+Шины: "205/55 R16", "205 55 16", "225/45R17 91W", "R16".
+Диски: "7x16 5x112 ET45", "7.5Jx17", "5x114.3 ET40 DIA 67.1".
+Найденный размер направляется в составные индексы
+(width, profile, diameter) у шин и (diameter, width) у дисков.
+"""
+import re
+from decimal import Decimal
+
+
+# Латинская и кириллическая "R" / "x" / "ET"
+R = '[RrРр]'
+X = '[xXхХ*×]'
+
+TIRE_SIZE = re.compile(
+    r'(?<!\d)(?P<width>\d{3})\s*[/\s\\-]\s*(?P<profile>\d{2})\s*(?:Z?' + R + r'|[/\s-])\s*(?P<diameter>\d{2})(?:C\b)?'
+    r'(?:\s*(?P<load_index>\d{2,3}(?:/\d{2,3})?)\s*(?P<speed_index>[A-Za-z])\b)?'
+)
+TIRE_WIDTH_PROFILE = re.compile(r'(?<!\d)(?P<width>\d{3})\s*/\s*(?P<profile>\d{2})(?!\d)')
+DIAMETER = re.compile(r'(?<![\w.])' + R + r'\s*(?P<diameter>\d{2})(?!\d)')
+
+BOLT_PATTERN = re.compile(r'(?<![\d.])(?P<bolts>[3-8])\s*' + X + r'\s*(?P<pcd>\d{2,3}(?:[.,]\d{1,2})?)(?![\d.])')
+WHEEL_SIZE = re.compile(
+    r'(?<![\d.])(?P<width>\d{1,2}(?:[.,]\d)?)\s*[Jj]?\s*' + X + r'\s*(?P<diameter>\d{2}(?:[.,]\d)?)(?![\d.])'
+)
+OFFSET = re.compile(r'(?<!\w)(?:ET|ЕТ|et|ет)\s*(?P<offset>-?\d{1,3})(?!\d)')
+CENTER_BORE = re.compile(r'(?<!\w)(?:DIA|dia|D|d|ЦО|цо)\s*(?P<center_bore>\d{2,3}(?:[.,]\d)?)(?![\d.])')
+
+# Диапазон PCD (мм): отличает "5x112" от размера диска "7x16"
+MIN_PCD = 98
+
+
+def to_decimal(value):
+    return Decimal(value.replace(',', '.'))
+
+
+class SizeQuery:
+    """Результат разбора запроса: фильтры для шин и дисков и оставшийся текст"""
+
+    def __init__(self, tire=None, wheel=None, text=''):
+        self.tire = tire
+        self.wheel = wheel
+        self.text = text
+
+    def __bool__(self):
+        return self.tire is not None or self.wheel is not None
+
+    def filters_for(self, product_type):
+        """Фильтры ORM для типа товара или None, если размер к нему не относится"""
+        return self.wheel if product_type == 'wheel' else self.tire
+
+
+def parse_size_query(query):
+    """Разбирает размеры шин и дисков в запросе"""
+    text = query or ''
+    tire, wheel = None, None
+
+    match = TIRE_SIZE.search(text)
+    if match:
+        tire = {
+            'width': int(match.group('width')),
+            'profile': int(match.group('profile')),
+            'diameter': int(match.group('diameter')),
+        }
+        if match.group('load_index'):
+            tire['load_index'] = match.group('load_index')
+            tire['speed_index'] = match.group('speed_index').upper()
+        return SizeQuery(tire=tire, text=cut(text, match))
+
+    wheel = {}
+    for match in BOLT_PATTERN.finditer(text):
+        pcd = to_decimal(match.group('pcd'))
+        if pcd >= MIN_PCD:
+            wheel['bolt_pattern'] = f"{match.group('bolts')}x{format(pcd.normalize(), 'f')}"
+            text = cut(text, match)
+            break
+
+    match = WHEEL_SIZE.search(text)
+    if match:
+        wheel['width'] = to_decimal(match.group('width'))
+        wheel['diameter'] = to_decimal(match.group('diameter'))
+        text = cut(text, match)
+
+    match = OFFSET.search(text)
+    if match:
+        wheel['offset'] = int(match.group('offset'))
+        text = cut(text, match)
+
+    match = CENTER_BORE.search(text)
+    if match and wheel:
+        wheel['center_bore'] = to_decimal(match.group('center_bore'))
+        text = cut(text, match)
+
+    if wheel:
+        return SizeQuery(wheel=wheel, text=text.strip())
+    wheel = None
+
+    match = TIRE_WIDTH_PROFILE.search(text)
+    if match:
+        tire = {'width': int(match.group('width')), 'profile': int(match.group('profile'))}
+        text = cut(text, match)
+
+    match = DIAMETER.search(text)
+    if match:
+        diameter = int(match.group('diameter'))
+        tire = dict(tire or {}, diameter=diameter)
+        # Одиночный диаметр ("R16") подходит и шинам, и дискам
+        if 'width' not in tire:
+            wheel = {'diameter': diameter}
+        text = cut(text, match)
+
+    return SizeQuery(tire=tire, wheel=wheel, text=text.strip())
+
+
+def cut(text, match):
+    """Удаляет найденный фрагмент из текста запроса"""
+    return ' '.join((text[:match.start()] + ' ' + text[match.end():]).split())
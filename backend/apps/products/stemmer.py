@@ -0,0 +1,85 @@
+"""
+Упрощённый стеммер Портера для русского языка (алгоритм Snowball).
+Латинские слова и числа только приводятся к нижнему регистру.
+"""
+import re
+
+
+VOWELS = 'аеиоуыэюя'
+
+PERFECTIVE_GERUND = re.compile(r'((ив|ивши|ившись|ыв|ывши|ывшись)|((?<=[ая])(в|вши|вшись)))$')
+REFLEXIVE = re.compile(r'(с[яь])$')
+ADJECTIVE = re.compile(r'(ее|ие|ые|ое|ими|ыми|ей|ий|ый|ой|ем|им|ым|ом|его|ого|ему|ому|их|ых|ую|юю|ая|яя|ою|ею)$')
+PARTICIPLE = re.compile(r'((ивш|ывш|ующ)|((?<=[ая])(ем|нн|вш|ющ|щ)))$')
+VERB = re.compile(
+    r'((ила|ыла|ена|ейте|уйте|ите|или|ыли|ей|уй|ил|ыл|им|ым|ен|ило|ыло|ено|ят|ует|уют|ит|ыт|ены|ить|ыть|ишь|ую|ю)'
+    r'|((?<=[ая])(ла|на|ете|йте|ли|й|л|ем|н|ло|но|ет|ют|ны|ть|ешь|нно)))$'
+)
+NOUN = re.compile(r'(а|ев|ов|ие|ье|е|иями|ями|ами|еи|ии|и|ией|ей|ой|ий|й|иям|ям|ием|ем|ам|ом|о|у|ах|иях|ях|ы|ь|ию|ью|ю|ия|ья|я)$')
+DERIVATIONAL = re.compile(r'(ость|ост)$')
+SUPERLATIVE = re.compile(r'(ейше|ейш)$')
+
+CYRILLIC_WORD = re.compile(r'^[а-я]+$')
+TOKEN = re.compile(r'\w+')
+
+
+def region_start(word, start=0):
+    """Начало региона R1 (или R2 при повторном вызове): после первой пары гласная-согласная"""
+    for index in range(start + 1, len(word)):
+        if word[index] not in VOWELS and word[index - 1] in VOWELS:
+            return index + 1
+    return len(word)
+
+
+def stem(word):
+    """Возвращает основу слова"""
+    word = word.lower().replace('ё', 'е')
+    if not CYRILLIC_WORD.match(word):
+        return word
+
+    # RV - часть слова после первой гласной
+    for index, char in enumerate(word):
+        if char in VOWELS:
+            start, rv = word[:index + 1], word[index + 1:]
+            break
+    else:
+        return word
+
+    # Шаг 1
+    stripped = PERFECTIVE_GERUND.sub('', rv, count=1)
+    if stripped == rv:
+        rv = REFLEXIVE.sub('', rv, count=1)
+        stripped = ADJECTIVE.sub('', rv, count=1)
+        if stripped != rv:
+            rv = PARTICIPLE.sub('', stripped, count=1)
+        else:
+            stripped = VERB.sub('', rv, count=1)
+            rv = NOUN.sub('', rv, count=1) if stripped == rv else stripped
+    else:
+        rv = stripped
+
+    # Шаг 2
+    if rv.endswith('и'):
+        rv = rv[:-1]
+
+    # Шаг 3: словообразовательный суффикс удаляется, только если он целиком в R2
+    match = DERIVATIONAL.search(rv)
+    if match:
+        r2 = region_start(word, region_start(word))
+        if len(start) + match.start() >= r2:
+            rv = rv[:match.start()]
+
+    # Шаг 4
+    if rv.endswith('ь'):
+        rv = rv[:-1]
+    else:
+        rv = SUPERLATIVE.sub('', rv, count=1)
+        if rv.endswith('нн'):
+            rv = rv[:-1]
+
+    return start + rv
+
+
+def tokenize(text):
+    """Разбивает текст на слова и возвращает их основы"""
+    return [stem(token) for token in TOKEN.findall(text or '')]
@@ -0,0 +1,286 @@
+"""
+Подсказки для строки поиска из индекса префиксов в памяти процесса.
+
+Каждый воркер держит отсортированный список ключей (бренды, модели, размеры)
+и ищет префикс через bisect, не обращаясь к базе данных. Изменения товаров и
+брендов записываются в кэш как журнал с номером версии; воркер, заметив новую
+версию, применяет недостающие изменения точечно, а при разрыве журнала
+перестраивает индекс целиком.
+"""
+import bisect
+import re
+import threading
+import time
+
+from django.core.cache import cache
+
+from .models import Brand, TireProduct, WheelProduct
+
+
+VERSION_KEY = 'products:suggestions:version'
+CHANGE_KEY = 'products:suggestions:change:{version}'
+CHANGE_TIMEOUT = 60 * 60
+
+# Как часто воркер сверяет версию индекса с кэшем (секунды)
+CHECK_INTERVAL = 10
+# Сколько изменений можно применить точечно, прежде чем перестроить индекс
+MAX_REPLAY = 500
+# Сколько совпадений просматривается до сортировки результата
+MAX_MATCHES = 200
+
+TYPE_PRIORITY = {'brand': 0, 'size': 1, 'product': 2}
+
+PRODUCT_FIELDS = {
+    TireProduct.PRODUCT_TYPE: ('width', 'profile', 'diameter'),
+    WheelProduct.PRODUCT_TYPE: ('width', 'diameter'),
+}
+
+WORD = re.compile(r'\w+')
+
+
+def normalize(text):
+    """Нижний регистр, ё -> е, слова через один пробел"""
+    return ' '.join(WORD.findall(text.lower().replace('ё', 'е')))
+
+
+def word_suffixes(text):
+    """Ключи для поиска с начала любого слова: "a b c" -> "a b c", "b c", "c" """
+    words = normalize(text).split()
+    return [' '.join(words[index:]) for index in range(len(words))]
+
+
+def format_decimal(value):
+    return format(value.normalize(), 'f')
+
+
+def final_price(price, discount_percent):
+    """Цена с учётом скидки (как TireProduct.final_price)"""
+    if discount_percent > 0:
+        return price * (100 - discount_percent) / 100
+    return price
+
+
+def get_version():
+    return cache.get(VERSION_KEY, 0)
+
+
+def record_change(change):
+    """Записывает изменение в журнал и увеличивает версию индекса"""
+    cache.add(VERSION_KEY, 0, None)
+    try:
+        version = cache.incr(VERSION_KEY)
+    except ValueError:
+        version = 1
+        cache.set(VERSION_KEY, version, None)
+    cache.set(CHANGE_KEY.format(version=version), change, CHANGE_TIMEOUT)
+    # Этот воркер применит изменение при следующем запросе подсказок
+    suggestion_index.expire()
+
+
+class SuggestionIndex:
+    """Индекс префиксов подсказок в памяти процесса"""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._keys = []            # отсортированный список (ключ, id записи)
+        self._entries = {}         # id записи -> (подсказка, ключи)
+        self._size_counts = {}     # id записи размера -> количество товаров
+        self._product_sizes = {}   # id записи товара -> id записи размера
+        self._version = None
+        self._checked_at = 0
+        self._building = False
+
+    # Поиск
+
+    def search(self, query, limit=10):
+        """Подсказки для начала слова в запросе"""
+        prefix = normalize(query or '')
+        if not prefix:
+            return []
+
+        self.sync()
+        with self._lock:
+            found = []
+            seen = set()
+            index = bisect.bisect_left(self._keys, (prefix,))
+            while index < len(self._keys) and len(found) < MAX_MATCHES:
+                key, entry_id = self._keys[index]
+                if not key.startswith(prefix):
+                    break
+                if entry_id not in seen:
+                    seen.add(entry_id)
+                    found.append(self._entries[entry_id][0])
+                index += 1
+
+        found.sort(key=lambda item: (TYPE_PRIORITY[item['type']], item['title']))
+        return found[:limit]
+
+    # Синхронизация с журналом изменений
+
+    def expire(self):
+        """Принудительная сверка версии при следующем запросе"""
+        self._checked_at = 0
+
+    def sync(self):
+        now = time.monotonic()
+        if self._version is not None and now - self._checked_at < CHECK_INTERVAL:
+            return
+
+        with self._lock:
+            self._checked_at = now
+            version = get_version()
+            if self._version is None:
+                self.build(version)
+                return
+            if version == self._version:
+                return
+
+            missing = version - self._version
+            changes = {}
+            if 0 < missing <= MAX_REPLAY:
+                keys = [CHANGE_KEY.format(version=number) for number in range(self._version + 1, version + 1)]
+                changes = cache.get_many(keys)
+            if missing <= 0 or len(changes) != missing:
+                self.build(version)
+                return
+
+            for number in range(self._version + 1, version + 1):
+                self.apply_change(changes[CHANGE_KEY.format(version=number)])
+            self._version = version
+
+    def build(self, version):
+        """Полное построение индекса"""
+        with self._lock:
+            self._keys = []
+            self._entries = {}
+            self._size_counts = {}
+            self._product_sizes = {}
+            self._building = True
+
+            for brand in Brand.objects.filter(is_active=True).values('id', 'name', 'slug', 'product_types'):
+                self.set_brand(brand['id'], brand)
+            for model in (TireProduct, WheelProduct):
+                for row in self.product_rows(model, model.objects.filter(is_active=True)):
+                    self.set_product(model.PRODUCT_TYPE, row['id'], row)
+
+            self._keys.sort()
+            self._building = False
+            self._version = version
+
+    def apply_change(self, change):
+        """Точечное применение изменения из журнала"""
+        kind, object_id = change[0], change[-1]
+        if kind == 'brand':
+            brand = Brand.objects.filter(pk=object_id, is_active=True).values(
+                'id', 'name', 'slug', 'product_types'
+            ).first()
+            self.set_brand(object_id, brand)
+            # Название бренда входит в подсказки товаров
+            for model in (TireProduct, WheelProduct):
+                for row in self.product_rows(model, model.objects.filter(brand_id=object_id), with_status=True):
+                    self.set_product(model.PRODUCT_TYPE, row['id'], row if row['is_active'] else None)
+        else:
+            product_type = change[1]
+            model = TireProduct if product_type == TireProduct.PRODUCT_TYPE else WheelProduct
+            rows = self.product_rows(model, model.objects.filter(pk=object_id, is_active=True))
+            self.set_product(product_type, object_id, rows[0] if rows else None)
+
+    # Записи индекса
+
+    @staticmethod
+    def product_rows(model, queryset, with_status=False):
+        fields = ['id', 'name', 'slug', 'price', 'discount_percent', 'brand__name']
+        fields += PRODUCT_FIELDS[model.PRODUCT_TYPE]
+        if with_status:
+            fields.append('is_active')
+        return list(queryset.values(*fields))
+
+    def set_brand(self, brand_id, brand):
+        entry_id = ('brand', brand_id)
+        if brand is None:
+            self.remove(entry_id)
+            return
+        product_type = 'wheel' if brand['product_types'] == 'wheel' else 'tire'
+        suggestion = {
+            'type': 'brand',
+            'id': brand_id,
+            'title': brand['name'],
+            'url': f"/catalog?product_type={product_type}&brand={brand['slug']}",
+        }
+        self.add(entry_id, suggestion, word_suffixes(brand['name']))
+
+    def set_product(self, product_type, product_id, row):
+        entry_id = ('product', product_type, product_id)
+        old_size_id = self._product_sizes.pop(entry_id, None)
+        if old_size_id is not None:
+            self._size_counts[old_size_id] -= 1
+            if self._size_counts[old_size_id] == 0:
+                del self._size_counts[old_size_id]
+                self.remove(old_size_id)
+
+        if row is None:
+            self.remove(entry_id)
+            return
+
+        if product_type == TireProduct.PRODUCT_TYPE:
+            size = f"{row['width']}/{row['profile']} R{row['diameter']}"
+            size_url = (
+                f"/catalog?product_type=tire&search_type=params"
+                f"&width={row['width']}&profile={row['profile']}&diameter={row['diameter']}"
+            )
+            size_keys = [
+                normalize(size),
+                normalize(f"{row['width']}/{row['profile']}R{row['diameter']}"),
+                normalize(f"R{row['diameter']} {row['width']}/{row['profile']}"),
+            ]
+        else:
+            width, diameter = format_decimal(row['width']), format_decimal(row['diameter'])
+            size = f"{width}x{diameter}"
+            size_url = (
+                f"/catalog?product_type=wheel&search_type=params"
+                f"&wheel_width={width}&wheel_diameter={diameter}"
+            )
+            size_keys = [normalize(size), normalize(f"R{diameter} {size}")]
+
+        title = f"{row['brand__name']} {row['name']}"
+        suggestion = {
+            'type': 'product',
+            'id': product_id,
+            'product_type': product_type,
+            'title': f"{title} {size}",
+            'url': f"/product/{row['slug']}",
+            'price': str(final_price(row['price'], row['discount_percent'])),
+        }
+        self.add(entry_id, suggestion, word_suffixes(title))
+
+        size_id = ('size', product_type, size)
+        self._product_sizes[entry_id] = size_id
+        self._size_counts[size_id] = self._size_counts.get(size_id, 0) + 1
+        if size_id not in self._entries:
+            suggestion = {'type': 'size', 'id': None, 'product_type': product_type, 'title': size, 'url': size_url}
+            self.add(size_id, suggestion, size_keys)
+
+    def add(self, entry_id, suggestion, keys):
+        with self._lock:
+            self.remove(entry_id)
+            keys = sorted(set(keys))
+            self._entries[entry_id] = (suggestion, keys)
+            if self._building:
+                # Во время полного построения список сортируется один раз в конце
+                self._keys.extend((key, entry_id) for key in keys)
+            else:
+                for key in keys:
+                    bisect.insort(self._keys, (key, entry_id))
+
+    def remove(self, entry_id):
+        with self._lock:
+            entry = self._entries.pop(entry_id, None)
+            if entry is None:
+                return
+            for key in entry[1]:
+                index = bisect.bisect_left(self._keys, (key, entry_id))
+                if index < len(self._keys) and self._keys[index] == (key, entry_id):
+                    del self._keys[index]
+
+
+suggestion_index = SuggestionIndex()
@@ -0,0 +1,93 @@
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from apps.core.testing import DiscardAnalyticsMixin, make_tire, make_wheel
+from .models import CatalogEntry, TireProduct
+from .search import apply_search, search_terms
+
+
+class ProductDetailLookupTests(DiscardAnalyticsMixin, TestCase):
+    """Поиск товара для детальной страницы через CatalogEntry"""
+    
+    def test_slug_collision_prefers_tire(self):
+        # Диск создан первым: порядок вставки и алфавит не должны влиять
+        make_wheel(slug='shared-slug')
+        tire = make_tire(slug='shared-slug')
+        
+        response = self.client.get('/api/products/shared-slug/')
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['id'], tire.pk)
+        self.assertIn('season', response.data)
+    
+    def test_slug_collision_falls_back_to_active_type(self):
+        make_tire(slug='shared-slug', is_active=False)
+        wheel = make_wheel(slug='shared-slug')
+        
+        response = self.client.get('/api/products/shared-slug/')
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['id'], wheel.pk)
+        self.assertEqual(response.data['bolt_pattern'], wheel.bolt_pattern)
+    
+    def test_priority_follows_type_priority_not_alphabet(self):
+        make_tire(slug='shared-slug')
+        make_wheel(slug='shared-slug')
+        
+        with mock.patch.object(CatalogEntry, 'TYPE_PRIORITY', ['wheel', 'tire']):
+            response = self.client.get('/api/products/shared-slug/')
+        
+        self.assertIn('bolt_pattern', response.data)
+    
+    def test_wheel_detail_is_one_lookup_and_one_fetch(self):
+        wheel = make_wheel()
+        
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(f'/api/products/{wheel.slug}/')
+        
+        tables = [query['sql'].split(' FROM ')[1].split()[0].strip('"`') for query in queries.captured_queries
+                  if query['sql'].startswith('SELECT') and ' FROM ' in query['sql']]
+        self.assertEqual(tables[:2], ['products_catalogentry', 'products_wheelproduct'])
+        self.assertNotIn('products_tireproduct', tables)
+    
+    def test_missing_slug_is_404(self):
+        self.assertEqual(self.client.get('/api/products/no-such-product/').status_code, 404)
+    
+    def test_by_id_collision_prefers_tire_without_type(self):
+        tire = make_tire()
+        wheel = make_wheel()
+        CatalogEntry.objects.filter(product_type='wheel').update(product_id=tire.pk)
+        type(wheel).objects.filter(pk=wheel.pk).update(id=tire.pk)
+        
+        response = self.client.get(f'/api/products/by-id/{tire.pk}/')
+        self.assertEqual(response.data['product_type'], 'tire')
+        
+        response = self.client.get(f'/api/products/by-id/{tire.pk}/', {'product_type': 'wheel'})
+        self.assertEqual(response.data['product_type'], 'wheel')
+
+
+class SizeSearchTests(DiscardAnalyticsMixin, TestCase):
+    """Поиск по размеру с остатком текста"""
+    
+    def setUp(self):
+        self.tire = make_tire('Pilot Sport', width=205, profile=55, diameter=16)
+        make_tire('Other', width=195, profile=65, diameter=15)
+    
+    def search(self, query):
+        return list(apply_search(TireProduct.objects.all(), 'tire', query))
+    
+    def test_short_leftover_does_not_zero_size_search(self):
+        self.assertEqual(self.search('205/55 R16 к'), [self.tire])
+    
+    def test_meaningful_leftover_narrows_size_search(self):
+        self.assertEqual(self.search('205/55 R16 pilot'), [self.tire])
+        self.assertEqual(self.search('205/55 R16 nokian'), [])
+    
+    def test_mysql_drops_tokens_below_min_token_size(self):
+        with mock.patch('apps.products.search.connection') as mysql:
+            mysql.vendor = 'mysql'
+            self.assertEqual(search_terms('r17 к ок'), ['r17'])
+        self.assertEqual(search_terms('r17 к ок'), ['r17', 'ок'])
@@ -9,9 +9,12 @@ urlpatterns = [
     path('products/featured/', api_views.featured_products, name='featured_products'),
     path('products/bestsellers/', api_views.bestseller_products, name='bestseller_products'),
     path('products/new/', api_views.new_products, name='new_products'),
+    path('products/batch/', api_views.product_batch, name='product_batch'),
     path('products/by-id/<int:pk>/', api_views.ProductByIdAPIView.as_view(), name='product_by_id'),
     path('products/<slug:slug>/', api_views.ProductDetailAPIView.as_view(), name='product_detail'),
     path('search/smart/', api_views.smart_search, name='smart_search'),
+    path('search/suggestions/', api_views.search_suggestions, name='search_suggestions'),
+    path('filters/', api_views.product_filters, name='product_filters'),
     
     # Категории
     path('categories/', views.CategoryListView.as_view(), name='categories'),
@@ -6,10 +6,12 @@ from django.http import HttpResponse
 from django.views.generic import TemplateView
 from django.middleware.csrf import get_token
 import os
+from apps.analytics.tracking import track_search
 from .models import Category, Brand, TireProduct, WheelProduct
+from .search import ranked_search
 from .serializers import (
     CategorySerializer, BrandSerializer, 
-    TireProductSerializer, WheelProductSerializer
+    TireProductCardSerializer, WheelProductCardSerializer
 )
 
 
@@ -56,8 +58,8 @@ class BrandListView(generics.ListAPIView):
 
 class TireProductListView(generics.ListAPIView):
     """API для получения списка шин"""
-    queryset = TireProduct.objects.filter(is_active=True).select_related('brand', 'category')
-    serializer_class = TireProductSerializer
+    queryset = TireProduct.objects.filter(is_active=True).select_related('brand', 'category', 'main_image')
+    serializer_class = TireProductCardSerializer
 
     def get_queryset(self):
         queryset = super().get_queryset()
@@ -95,8 +97,8 @@ class TireProductListView(generics.ListAPIView):
 
 class WheelProductListView(generics.ListAPIView):
     """API для получения списка дисков"""
-    queryset = WheelProduct.objects.filter(is_active=True).select_related('brand', 'category')
-    serializer_class = WheelProductSerializer
+    queryset = WheelProduct.objects.filter(is_active=True).select_related('brand', 'category', 'main_image')
+    serializer_class = WheelProductCardSerializer
 
     def get_queryset(self):
         queryset = super().get_queryset()
@@ -135,25 +137,23 @@ def search_products(request):
     if not query:
         return Response({'results': []})
     
-    # Поиск в шинах
-    tire_results = TireProduct.objects.filter(
-        Q(name__icontains=query) | 
-        Q(brand__name__icontains=query) |
-        Q(description__icontains=query),
-        is_active=True
-    ).select_related('brand', 'category')[:10]
+    # Поиск в шинах (по релевантности)
+    tire_results = ranked_search(
+        TireProduct.objects.filter(is_active=True).select_related('brand', 'category', 'main_image'),
+        TireProduct.PRODUCT_TYPE, query, limit=10
+    )
     
-    # Поиск в дисках
-    wheel_results = WheelProduct.objects.filter(
-        Q(name__icontains=query) | 
-        Q(brand__name__icontains=query) |
-        Q(description__icontains=query),
-        is_active=True
-    ).select_related('brand', 'category')[:10]
+    # Поиск в дисках (по релевантности)
+    wheel_results = ranked_search(
+        WheelProduct.objects.filter(is_active=True).select_related('brand', 'category', 'main_image'),
+        WheelProduct.PRODUCT_TYPE, query, limit=10
+    )
     
     # Сериализация результатов
-    tire_data = TireProductSerializer(tire_results, many=True).data
-    wheel_data = WheelProductSerializer(wheel_results, many=True).data
+    tire_data = TireProductCardSerializer(tire_results, many=True, context={'request': request}).data
+    wheel_data = WheelProductCardSerializer(wheel_results, many=True, context={'request': request}).data
+    
+    track_search(request, query, len(tire_data) + len(wheel_data))
     
     return Response({
         'results': {
@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class ReviewsConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'apps.reviews'
+    verbose_name = 'Отзывы'
+    
+    def ready(self):
+        import apps.reviews.signals  # Подключаем обработчики сигналов
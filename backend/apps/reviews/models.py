@@ -62,3 +62,18 @@ class Review(models.Model):
         if total == 0:
             return 0
         return (self.helpful_count / total) * 100
+
+
+class RatingChange(models.Model):
+    """Товар, отзывы которого менялись после последнего пересчёта рейтингов"""
+    
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.PositiveIntegerField()
+    created_at = models.DateTimeField(_('created at'), auto_now_add=True)
+    
+    class Meta:
+        verbose_name = _('Rating Change')
+        verbose_name_plural = _('Rating Changes')
+    
+    def __str__(self):
+        return f"{self.content_type_id}:{self.object_id} {self.created_at:%d.%m.%Y %H:%M}"
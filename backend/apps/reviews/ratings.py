@@ -0,0 +1,173 @@
+"""
+Рейтинги товаров по одобренным отзывам.
+
+Товар хранит количество одобренных отзывов (reviews_count), сумму их оценок
+(rating_sum) и рейтинг rating_sum / reviews_count. Сохранение, удаление и
+смена статуса отзыва меняют количество и сумму через F() и пересчитывают
+рейтинг из новых значений строки (apply_rating_change) - без пересчёта всех
+отзывов товара.
+
+Пересчёт (команда update_ratings) считает количество и сумму одним
+запросом GROUP BY (content_type, object_id) по Review и записывает пачками
+bulk_update только изменившиеся товары. Сохранение и удаление отзыва
+отмечают товар в журнале RatingChange; инкрементальный режим пересчитывает
+только отмеченные товары и очищает журнал, поэтому пропущенный или
+задержавшийся запуск ничего не теряет, а удалённые отзывы тоже учитываются.
+"""
+from collections import defaultdict
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.db.models import Count, Sum
+
+from apps.analytics.counters import counter_increment
+
+from apps.products.models import TireProduct, WheelProduct
+from .models import RatingChange, Review
+
+
+RATING_BATCH_SIZE = 1000
+RATING_PRECISION = Decimal('0.01')
+
+PRODUCT_MODELS = (TireProduct, WheelProduct)
+
+
+def round_rating(value):
+    if value is None:
+        return Decimal('0.00')
+    return Decimal(str(value)).quantize(RATING_PRECISION, rounding=ROUND_HALF_UP)
+
+
+def average_rating(reviews_count, rating_sum):
+    if not reviews_count:
+        return round_rating(None)
+    return round_rating(Decimal(rating_sum) / reviews_count)
+
+
+def compute_ratings(content_type, object_ids=None):
+    """
+    Рейтинги товаров модели одним GROUP BY по одобренным отзывам:
+    {object_id: (rating, reviews_count, rating_sum)}
+    """
+    reviews = Review.objects.filter(content_type=content_type, status='approved')
+    if object_ids is not None:
+        reviews = reviews.filter(object_id__in=object_ids)
+    rows = reviews.values('object_id').annotate(count=Count('pk'), total=Sum('rating')).order_by()
+    return {
+        row['object_id']: (average_rating(row['count'], row['total']), row['count'], row['total'])
+        for row in rows
+    }
+
+
+def write_ratings(model, ratings, products, batch_size=RATING_BATCH_SIZE):
+    """
+    Записывает рейтинги товаров queryset products пачками bulk_update;
+    товары без одобренных отзывов получают нулевой рейтинг.
+    Возвращает количество изменённых товаров.
+    """
+    fields = ['rating', 'reviews_count', 'rating_sum']
+    changed = []
+    updated = 0
+    for product in products.only('id', *fields).iterator(chunk_size=batch_size):
+        values = ratings.get(product.pk, (round_rating(None), 0, 0))
+        if (product.rating, product.reviews_count, product.rating_sum) == values:
+            continue
+        product.rating, product.reviews_count, product.rating_sum = values
+        changed.append(product)
+        if len(changed) >= batch_size:
+            updated += model.objects.bulk_update(changed, fields)
+            changed = []
+    if changed:
+        updated += model.objects.bulk_update(changed, fields)
+    return updated
+
+
+def record_rating_changes(products):
+    """Отмечает товары [(content_type_id, object_id), ...] для пересчёта рейтинга"""
+    RatingChange.objects.bulk_create([
+        RatingChange(content_type_id=content_type_id, object_id=object_id)
+        for content_type_id, object_id in set(products)
+    ])
+
+
+def update_ratings(batch_size=RATING_BATCH_SIZE):
+    """Пересчитывает рейтинги всех товаров, возвращает {модель: изменено}"""
+    # Журнал до начала пересчёта им покрыт; более поздние отметки остаются
+    last_change_id = RatingChange.objects.order_by('-pk').values_list('pk', flat=True).first()
+    result = {}
+    for model in PRODUCT_MODELS:
+        content_type = ContentType.objects.get_for_model(model)
+        ratings = compute_ratings(content_type)
+        result[model] = write_ratings(model, ratings, model.objects.all(), batch_size)
+    if last_change_id is not None:
+        RatingChange.objects.filter(pk__lte=last_change_id).delete()
+    return result
+
+
+def update_changed_ratings_batch(batch_size=RATING_BATCH_SIZE):
+    """
+    Пересчитывает товары следующей пачки журнала и удаляет её.
+    Возвращает (размер пачки, {модель: изменено}).
+    """
+    with transaction.atomic():
+        # Строки пачки блокируются: параллельный запуск не возьмёт их повторно
+        rows = list(
+            RatingChange.objects.select_for_update().order_by('pk')
+            .values_list('pk', 'content_type_id', 'object_id')[:batch_size]
+        )
+        result = {}
+        object_ids = defaultdict(set)
+        for _, content_type_id, object_id in rows:
+            object_ids[content_type_id].add(object_id)
+        for content_type_id, ids in object_ids.items():
+            model = ContentType.objects.get_for_id(content_type_id).model_class()
+            if model not in PRODUCT_MODELS:
+                continue
+            ratings = compute_ratings(content_type_id, ids)
+            result[model] = write_ratings(model, ratings, model.objects.filter(pk__in=ids), batch_size)
+        RatingChange.objects.filter(pk__in=[row[0] for row in rows]).delete()
+    return len(rows), result
+
+
+def update_changed_ratings(batch_size=RATING_BATCH_SIZE):
+    """
+    Пересчитывает рейтинги товаров, отзывы которых менялись с прошлого
+    запуска (журнал RatingChange). Возвращает {модель: изменено}.
+    """
+    result = defaultdict(int)
+    while True:
+        processed, changed = update_changed_ratings_batch(batch_size)
+        if not processed:
+            return dict(result)
+        for model, updated in changed.items():
+            result[model] += updated
+
+
+def rating_contribution(status, rating):
+    """Вклад отзыва в (reviews_count, rating_sum) товара"""
+    return (1, rating) if status == 'approved' else (0, 0)
+
+
+def apply_rating_change(content_type_id, object_id, count_delta, sum_delta):
+    """
+    Меняет количество и сумму оценок товара на приращения и пересчитывает
+    рейтинг: запросы к одной строке товара независимо от числа отзывов
+    """
+    if not count_delta and not sum_delta:
+        return 0
+    model = ContentType.objects.get_for_id(content_type_id).model_class()
+    if model not in PRODUCT_MODELS:
+        return 0
+    
+    products = model.objects.filter(pk=object_id)
+    with transaction.atomic():
+        updated = products.update(
+            reviews_count=counter_increment(model, 'reviews_count', count_delta),
+            rating_sum=counter_increment(model, 'rating_sum', sum_delta),
+        )
+        # Строка уже заблокирована UPDATE: рейтинг считается из её новых значений
+        values = products.values_list('reviews_count', 'rating_sum').first()
+        if values is not None:
+            products.update(rating=average_rating(*values))
+    return updated
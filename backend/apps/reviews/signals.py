@@ -0,0 +1,51 @@
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from apps.products.homepage import invalidate_collections
+from .models import Review
+from .ratings import apply_rating_change, rating_contribution, record_rating_changes
+
+
+@receiver(pre_save, sender=Review)
+def remember_review_state(sender, instance, **kwargs):
+    """Прежние товар, статус и оценка отзыва для пересчёта рейтинга"""
+    instance._previous_state = (
+        Review.objects.filter(pk=instance.pk).values_list('content_type_id', 'object_id', 'status', 'rating').first()
+        if instance.pk else None
+    )
+
+
+@receiver(post_save, sender=Review)
+def update_rating_on_save(sender, instance, **kwargs):
+    """Одобрение, снятие одобрения или изменение оценки меняет рейтинг товара"""
+    count, total = rating_contribution(instance.status, instance.rating)
+    product = (instance.content_type_id, instance.object_id)
+    
+    previous = getattr(instance, '_previous_state', None)
+    if previous is None:
+        previous_product, previous_count, previous_total = product, 0, 0
+    else:
+        previous_product = previous[:2]
+        previous_count, previous_total = rating_contribution(*previous[2:])
+    
+    with transaction.atomic():
+        if previous is None or previous != (*product, instance.status, instance.rating):
+            record_rating_changes([previous_product, product])
+        if previous_product == product:
+            changed = apply_rating_change(*product, count - previous_count, total - previous_total)
+        else:
+            changed = apply_rating_change(*previous_product, -previous_count, -previous_total)
+            changed += apply_rating_change(*product, count, total)
+    if changed:
+        invalidate_collections()
+
+
+@receiver(post_delete, sender=Review)
+def update_rating_on_delete(sender, instance, **kwargs):
+    count, total = rating_contribution(instance.status, instance.rating)
+    with transaction.atomic():
+        record_rating_changes([(instance.content_type_id, instance.object_id)])
+        changed = apply_rating_change(instance.content_type_id, instance.object_id, -count, -total)
+    if changed:
+        invalidate_collections()
@@ -0,0 +1,107 @@
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from apps.accounts.models import User
+from apps.core.testing import make_tire, make_wheel
+from apps.products.models import TireProduct
+from .models import RatingChange, Review
+from .ratings import update_changed_ratings
+
+
+class IncrementalRatingsTests(TestCase):
+    """Инкрементальный пересчёт рейтингов по журналу RatingChange"""
+    
+    def setUp(self):
+        self.tire = make_tire()
+        self.other_tire = make_tire(name='Other tire')
+        self.wheel = make_wheel()
+        self.users = [
+            User.objects.create_user(username=f'user{index}', email=f'user{index}@example.com')
+            for index in range(3)
+        ]
+    
+    def review(self, product, user, rating, status='approved'):
+        return Review.objects.create(
+            product=product, user=user, rating=rating, title='Title', text='Text', status=status,
+        )
+    
+    def corrupt(self, *products):
+        """Сбивает сохранённые рейтинги в обход сигналов"""
+        for product in products:
+            type(product).objects.filter(pk=product.pk).update(rating=Decimal('1.00'), reviews_count=99, rating_sum=99)
+    
+    def rating(self, product):
+        product.refresh_from_db()
+        return product.rating, product.reviews_count, product.rating_sum
+    
+    def test_recomputes_only_changed_products(self):
+        self.review(self.tire, self.users[0], 5)
+        self.review(self.tire, self.users[1], 4)
+        update_changed_ratings()
+        self.corrupt(self.tire, self.other_tire)
+        
+        self.review(self.other_tire, self.users[0], 3)
+        update_changed_ratings()
+        
+        self.assertEqual(self.rating(self.other_tire), (Decimal('3.00'), 1, 3))
+        # Отзывы шины после прошлого запуска не менялись: её не пересчитывали
+        self.assertEqual(self.rating(self.tire), (Decimal('1.00'), 99, 99))
+        self.assertFalse(RatingChange.objects.exists())
+    
+    def test_deleted_review_is_recomputed(self):
+        review = self.review(self.tire, self.users[0], 5)
+        self.review(self.tire, self.users[1], 2)
+        update_changed_ratings()
+        
+        review.delete()
+        self.corrupt(self.tire)
+        update_changed_ratings()
+        
+        self.assertEqual(self.rating(self.tire), (Decimal('2.00'), 1, 2))
+    
+    def test_skipped_runs_are_not_lost(self):
+        self.review(self.tire, self.users[0], 4)
+        self.review(self.wheel, self.users[0], 2)
+        self.corrupt(self.tire, self.wheel)
+        # Несколько запусков пропущено: журнал копится до следующего
+        self.review(self.tire, self.users[1], 5, status='pending')
+        
+        update_changed_ratings()
+        
+        self.assertEqual(self.rating(self.tire), (Decimal('4.00'), 1, 4))
+        self.assertEqual(self.rating(self.wheel), (Decimal('2.00'), 1, 2))
+    
+    def test_moved_review_recomputes_both_products(self):
+        review = self.review(self.tire, self.users[0], 4)
+        update_changed_ratings()
+        
+        review.object_id = self.other_tire.pk
+        review.save()
+        self.corrupt(self.tire, self.other_tire)
+        update_changed_ratings()
+        
+        self.assertEqual(self.rating(self.tire), (Decimal('0.00'), 0, 0))
+        self.assertEqual(self.rating(self.other_tire), (Decimal('4.00'), 1, 4))
+    
+    def test_unrelated_edit_is_not_journaled(self):
+        review = self.review(self.tire, self.users[0], 4)
+        update_changed_ratings()
+        
+        review.helpful_count += 1
+        review.save()
+        
+        self.assertFalse(RatingChange.objects.exists())
+    
+    def test_full_run_clears_journal(self):
+        self.review(self.tire, self.users[0], 4)
+        self.corrupt(self.tire, self.other_tire)
+        
+        call_command('update_ratings', stdout=StringIO())
+        
+        self.assertEqual(self.rating(self.tire), (Decimal('4.00'), 1, 4))
+        self.assertEqual(self.rating(self.other_tire), (Decimal('0.00'), 0, 0))
+        self.assertFalse(RatingChange.objects.exists())
+        self.assertEqual(TireProduct.objects.filter(reviews_count=99).count(), 0)
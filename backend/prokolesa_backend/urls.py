@@ -27,6 +27,7 @@ admin_site.index_title = 'Добро пожаловать в панель упр
 
 urlpatterns = [
     path('admin/', admin_site.urls),
+    path('api/cart/', include('apps.cart.urls')),
     path('api/', include('apps.products.urls')),
 ]
 
@@ -77,6 +77,8 @@ EOF
 echo "🗄️ Running Django migrations..."
 cd /var/www/prokolesa/backend
 sudo -u www-data venv/bin/python manage.py migrate --settings=prokolesa_backend.settings_production
+sudo -u www-data venv/bin/python manage.py backfill_main_images --settings=prokolesa_backend.settings_production
+sudo -u www-data venv/bin/python manage.py rebuild_search_index --settings=prokolesa_backend.settings_production
 sudo -u www-data venv/bin/python manage.py collectstatic --noinput --settings=prokolesa_backend.settings_production
 
 # Create Django superuser (optional)
@@ -164,6 +166,23 @@ systemctl restart nginx
 echo "🔄 Setting up automatic SSL renewal..."
 crontab -l | { cat; echo "0 12 * * * /usr/bin/certbot renew --quiet"; } | crontab -
 
+# Cleanup of expired stock reservations
+echo "🧹 Setting up stock reservation sweeper..."
+crontab -u www-data -l 2>/dev/null | { cat; echo "* * * * * cd /var/www/prokolesa/backend && venv/bin/python manage.py sweep_stock_reservations --settings=prokolesa_backend.settings_production > /dev/null"; } | crontab -u www-data -
+
+# Product sales counters from orders (existing orders are counted once by
+# migration orders 0006, the cron then applies the SalesDelta journal)
+echo "📈 Setting up sales counters..."
+crontab -u www-data -l 2>/dev/null | { cat; echo "*/5 * * * * cd /var/www/prokolesa/backend && venv/bin/python manage.py update_sales_counts --settings=prokolesa_backend.settings_production > /dev/null"; } | crontab -u www-data -
+
+# Nightly ratings recompute for products whose reviews changed since the last run
+echo "⭐ Setting up ratings update..."
+crontab -u www-data -l 2>/dev/null | { cat; echo "15 3 * * * cd /var/www/prokolesa/backend && venv/bin/python manage.py update_ratings --incremental --settings=prokolesa_backend.settings_production > /dev/null"; } | crontab -u www-data -
+
+# Purge of old analytics events
+echo "📊 Setting up analytics events purge..."
+crontab -u www-data -l 2>/dev/null | { cat; echo "30 4 * * * cd /var/www/prokolesa/backend && venv/bin/python manage.py purge_analytics_events --settings=prokolesa_backend.settings_production > /dev/null"; } | crontab -u www-data -
+
 # Final permissions check
 chown -R www-data:www-data /var/www/prokolesa
 chmod -R 755 /var/www/prokolesa
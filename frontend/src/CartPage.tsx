@@ -26,7 +26,7 @@ import {
   Receipt
 } from '@mui/icons-material';
 import { useCart } from './hooks/useCart';
-import { productAPI } from './api';
+import { cartAPI } from './api';
 import { mapProductToCard } from './utils/productMapper';
 import { ProductCardData } from './types/product';
 import { orderStorage, StoredOrder, formatOrderDate, getStatusText, getStatusColor } from './utils/orderStorage';
@@ -49,18 +49,16 @@ const CartPage: React.FC = () => {
 
       try {
         setLoading(true);
-        const productPromises = items.map(item => 
-          productAPI.getProductById(item.id, item.productType).catch(() => null)
-        );
-        
-        const loadedProducts = await Promise.all(productPromises);
+        // Цены и данные всех товаров корзины одним запросом
+        const pricing = await cartAPI.priceItems(items.map(item => ({
+          product_id: item.id,
+          product_type: item.productType || 'tire',
+          quantity: item.quantity,
+        })));
         const productsMap: { [key: number]: ProductCardData } = {};
         
-        loadedProducts.forEach((product, index) => {
-          if (product) {
-            const mappedProduct = mapProductToCard(product);
-            productsMap[items[index].id] = mappedProduct;
-          }
+        pricing.items.forEach(line => {
+          productsMap[line.product_id] = mapProductToCard(line.product);
         });
         
         setProducts(productsMap);
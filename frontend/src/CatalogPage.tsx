@@ -36,7 +36,7 @@ import {
   Tune
 } from '@mui/icons-material';
 
-import { productAPI, brandAPI, Product, Brand } from './api';
+import { productAPI, brandAPI, ProductCard, Brand } from './api';
 import UniversalProductCard from './components/UniversalProductCard';
 import { mapProductsToCards } from './utils/productMapper';
 import { useCart } from './hooks/useCart';
@@ -59,7 +59,7 @@ const CatalogPage = (): React.ReactElement => {
 
   
   // Состояния для данных
-  const [products, setProducts] = useState<Product[]>([]);
+  const [products, setProducts] = useState<ProductCard[]>([]);
   const [brands, setBrands] = useState<Brand[]>([]);
   const [loading, setLoading] = useState(true);
   const [filtersLoading, setFiltersLoading] = useState(false);
@@ -16,7 +16,7 @@ import {
 import { useFavorites } from './hooks/useFavorites';
 import { useCart } from './hooks/useCart';
 
-import { productAPI, Product } from './api';
+import { productAPI, ProductCard } from './api';
 import UniversalProductCard from './components/UniversalProductCard';
 import { mapProductsToCards } from './utils/productMapper';
 
@@ -25,7 +25,7 @@ const FavoritesPage: React.FC = () => {
   const { items: favoriteItems, clearFavorites, toggleFavorite, isFavorite } = useFavorites();
   const { addToCart } = useCart();
 
-  const [products, setProducts] = useState<Product[]>([]);
+  const [products, setProducts] = useState<ProductCard[]>([]);
   const [loading, setLoading] = useState(true);
 
   // Загружаем данные о товарах из избранного
@@ -38,15 +38,12 @@ const FavoritesPage: React.FC = () => {
 
       try {
         setLoading(true);
-        // Загружаем товары по ID из избранного
-        const productPromises = favoriteItems.map(item => 
-          productAPI.getProductById(item.id).catch(() => null)
-        );
+        // Загружаем товары из избранного одним запросом
+        const { results } = await productAPI.getProductsBatch({
+          ids: favoriteItems.map(item => item.id),
+        });
         
-        const loadedProducts = await Promise.all(productPromises);
-        const validProducts = loadedProducts.filter(Boolean) as Product[];
-        
-        setProducts(validProducts);
+        setProducts(results);
       } catch (error) {
         console.error('Ошибка загрузки избранных товаров:', error);
       } finally {
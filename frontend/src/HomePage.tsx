@@ -21,7 +21,7 @@ import {
   Album,
 } from '@mui/icons-material';
 
-import { productAPI, brandAPI, Product, Brand } from './api';
+import { productAPI, brandAPI, ProductCard, Brand } from './api';
 import UniversalProductCard from './components/UniversalProductCard';
 import { mapProductsToCards } from './utils/productMapper';
 import ProductSearchSelector from './components/ProductSearchSelector';
@@ -36,7 +36,7 @@ const HomePage: React.FC = () => {
 
   
   // Состояния для данных из API
-  const [products, setProducts] = useState<Product[]>([]);
+  const [products, setProducts] = useState<ProductCard[]>([]);
   const [brands, setBrands] = useState<Brand[]>([]);
   const [loading, setLoading] = useState(true);
 
@@ -14,7 +14,7 @@ import {
 } from '@mui/material';
 import { ArrowBack } from '@mui/icons-material';
 
-import { productAPI, Product } from './api';
+import { productAPI, ProductCard } from './api';
 import UniversalProductCard from './components/UniversalProductCard';
 import { mapProductsToCards } from './utils/productMapper';
 import { useCart } from './hooks/useCart';
@@ -31,7 +31,7 @@ const SearchResultsPage = (): React.ReactElement => {
   const { toggleFavorite, isFavorite } = useFavorites();
 
   
-  const [products, setProducts] = useState<Product[]>([]);
+  const [products, setProducts] = useState<ProductCard[]>([]);
   const [loading, setLoading] = useState(true);
   const [totalCount, setTotalCount] = useState(0);
   const [page, setPage] = useState(1);
@@ -132,27 +132,86 @@ export interface Product {
   };
 }
 
+// Карточка товара в списках (каталог, поиск, главная, избранное, корзина)
+export interface ProductCard {
+  id: number;
+  name: string;
+  slug: string;
+  sku: string;
+  brand: Pick<Brand, 'id' | 'name' | 'slug'>;
+  main_image: Pick<ProductImage, 'id' | 'image' | 'alt_text'> | null;
+  product_type: 'tire' | 'wheel';
+  price: string;
+  old_price: string | null;
+  final_price: number;
+  is_in_stock: boolean;
+  is_new: boolean;
+  is_bestseller: boolean;
+  is_on_sale: boolean;
+  rating: string;
+  reviews_count: number;
+  season?: 'summer' | 'winter' | 'all_season' | '';
+  width?: number;
+  profile?: number;
+  diameter?: number;
+  fuel_efficiency?: string;
+  wet_grip?: string;
+  noise_level?: number | null;
+  offset?: number;
+  bolt_pattern?: string;
+  wheel_type?: string;
+}
+
 export interface ProductListResponse {
   count: number;
+  count_estimated?: boolean;
   next: string | null;
   previous: string | null;
-  results: Product[];
+  results: ProductCard[];
+}
+
+export interface CursorProductListResponse {
+  next: string | null;
+  results: ProductCard[];
+}
+
+export interface ProductBatchResponse {
+  results: ProductCard[];
+  missing: string[];
 }
 
 export interface SearchSuggestion {
-  type: 'product' | 'brand' | 'category';
-  id: number;
+  type: 'product' | 'brand' | 'category' | 'size';
+  id: number | null;
   title: string;
   url: string;
   price?: string;
+  product_type?: 'tire' | 'wheel';
+}
+
+export interface FacetValue<T = string | number> {
+  value: T;
+  count: number;
+  label?: string;
 }
 
 export interface ProductFilters {
-  brands: Array<{ id: number; name: string; slug: string }>;
-  categories: Array<{ id: number; name: string; slug: string }>;
+  product_type: 'tire' | 'wheel';
+  brands: Array<{ id: number; name: string; slug: string; count: number }>;
+  categories: Array<{ id: number; name: string; slug: string; count: number }>;
   price_range: { min_price: number; max_price: number };
-  seasons: Array<{ value: string; label: string }>;
   product_types: Array<{ value: string; label: string }>;
+  total: number;
+  // Шины
+  seasons?: FacetValue<string>[];
+  widths?: FacetValue<number>[];
+  profiles?: FacetValue<number>[];
+  diameters?: FacetValue<number>[];
+  // Диски
+  pcds?: FacetValue<string>[];
+  wheel_types?: FacetValue<string>[];
+  offsets?: FacetValue<number>[];
+  et_range?: { min: number | null; max: number | null };
 }
 
 // Типы для автомобилей
@@ -288,15 +347,35 @@ export interface CreateOrderData {
 // API для заказов
 export const orderAPI = {
   // Создание заказа
+  // Повторы при сетевых ошибках идут с тем же Idempotency-Key: заказ не создаётся дважды
   createOrder: async (orderData: CreateOrderData): Promise<{ success: boolean; message: string; order: Order }> => {
-    const response = await fetch(`${API_BASE_URL}/api/orders/create/`, {
+    const idempotencyKey = typeof crypto !== 'undefined' && crypto.randomUUID
+      ? crypto.randomUUID()
+      : `${Date.now()}-${Math.random().toString(36).slice(2)}`;
+    const send = () => fetch(`${API_BASE_URL}/api/orders/create/`, {
       method: 'POST',
       headers: {
         'Content-Type': 'application/json',
+        'Idempotency-Key': idempotencyKey,
       },
       body: JSON.stringify(orderData),
     });
 
+    let response: Response | undefined;
+    for (let attempt = 0; attempt < 3 && !response; attempt++) {
+      try {
+        response = await send();
+      } catch (error) {
+        if (attempt === 2) {
+          throw error;
+        }
+        await new Promise(resolve => setTimeout(resolve, 1000 * (attempt + 1)));
+      }
+    }
+    if (!response) {
+      throw new Error('Ошибка при создании заказа');
+    }
+
     if (!response.ok) {
       const errorData = await response.json();
       throw new Error(errorData.error || 'Ошибка при создании заказа');
@@ -336,11 +415,24 @@ export const productAPI = {
     ordering?: string;
     page?: number;
     page_size?: number;
+    count?: 'estimated';
   }): Promise<ProductListResponse> => {
     const response = await api.get('/products/', { params });
     return response.data;
   },
 
+  // Получить товары курсорной пагинацией (бесконечная прокрутка)
+  getProductsByCursor: async (params?: {
+    product_type?: string;
+    ordering?: '-sales_count' | '-recent_sales_count' | 'price' | '-rating' | '-created_at';
+    cursor?: string;
+    page_size?: number;
+    [key: string]: string | number | boolean | undefined;
+  }): Promise<CursorProductListResponse> => {
+    const response = await api.get('/products/', { params: { ...params, pagination: 'cursor' } });
+    return response.data;
+  },
+
   // Получить товар по slug
   getProduct: async (slug: string): Promise<Product> => {
     const response = await api.get(`/products/${slug}/`);
@@ -354,6 +446,20 @@ export const productAPI = {
     return response.data;
   },
 
+  // Получить несколько товаров одним запросом (ids: "tire:1", "wheel:2" или просто id)
+  getProductsBatch: async (params: {
+    ids?: Array<string | number>;
+    slugs?: string[];
+  }): Promise<ProductBatchResponse> => {
+    const response = await api.get('/products/batch/', {
+      params: {
+        ids: params.ids?.join(',') || undefined,
+        slugs: params.slugs?.join(',') || undefined,
+      },
+    });
+    return response.data;
+  },
+
   // Получить рекомендуемые товары
   getFeaturedProducts: async (): Promise<ProductListResponse> => {
     const response = await api.get('/products/featured/');
@@ -385,8 +491,8 @@ export const productAPI = {
   },
 
   // Получить доступные фильтры
-  getFilters: async (): Promise<ProductFilters> => {
-    const response = await api.get('/filters/');
+  getFilters: async (params?: Record<string, string | number | boolean>): Promise<ProductFilters> => {
+    const response = await api.get('/filters/', { params });
     return response.data;
   },
 
@@ -405,7 +511,7 @@ export const productAPI = {
     offset?: string;
   }): Promise<{
     count: number;
-    results: Product[];
+    results: ProductCard[];
     search_params: any;
     message: string;
   }> => {
@@ -414,6 +520,86 @@ export const productAPI = {
   },
 };
 
+export interface CartItemRequest {
+  product_id: number;
+  product_type: 'tire' | 'wheel';
+  quantity: number;
+}
+
+export interface CartLine {
+  product_id: number;
+  product_type: 'tire' | 'wheel';
+  quantity: number;
+  price: string;
+  unit_price: string;
+  total_price: string;
+  available: number;
+  product: ProductCard;
+}
+
+export interface CartSummary {
+  total_items: number;
+  subtotal: string;
+  discount: string;
+  total_price: string;
+}
+
+export interface CartPricing {
+  items: CartLine[];
+  unavailable: { product_id: number; product_type: 'tire' | 'wheel' }[];
+  total_items: number;
+  subtotal: string;
+  discount: string;
+  total_price: string;
+}
+
+// Корзина на сервере привязана к сессии, поэтому запросы идут с cookie
+const cartRequestConfig = { withCredentials: true };
+
+export const cartAPI = {
+  // Получить корзину текущей сессии
+  getCart: async (): Promise<CartPricing> => {
+    const response = await api.get('/cart/', cartRequestConfig);
+    return response.data;
+  },
+
+  // Сводка корзины (количество и суммы) для значка и мини-корзины
+  getSummary: async (): Promise<CartSummary> => {
+    const response = await api.get('/cart/summary/', cartRequestConfig);
+    return response.data;
+  },
+
+  // Добавить товар (количество прибавляется к имеющемуся)
+  addItem: async (item: CartItemRequest): Promise<CartPricing> => {
+    const response = await api.post('/cart/items/', item, cartRequestConfig);
+    return response.data;
+  },
+
+  // Изменить количество товара (0 - удалить)
+  updateItem: async (productType: 'tire' | 'wheel', productId: number, quantity: number): Promise<CartPricing> => {
+    const response = await api.patch(`/cart/items/${productType}/${productId}/`, { quantity }, cartRequestConfig);
+    return response.data;
+  },
+
+  // Удалить товар
+  removeItem: async (productType: 'tire' | 'wheel', productId: number): Promise<CartPricing> => {
+    const response = await api.delete(`/cart/items/${productType}/${productId}/`, cartRequestConfig);
+    return response.data;
+  },
+
+  // Очистить корзину
+  clear: async (): Promise<CartPricing> => {
+    const response = await api.delete('/cart/', cartRequestConfig);
+    return response.data;
+  },
+
+  // Текущие цены и остатки для списка товаров одним запросом
+  priceItems: async (items: CartItemRequest[]): Promise<CartPricing> => {
+    const response = await api.post('/cart/price/', { items }, cartRequestConfig);
+    return response.data;
+  },
+};
+
 export const categoryAPI = {
   // Получить список категорий
   getCategories: async (): Promise<Category[]> => {
@@ -1,4 +1,4 @@
-import { Product } from '../api';
+import { Product, ProductCard } from '../api';
 import { ProductCardData, ProductPageData } from '../types/product';
 
 // Базовый URL для API
@@ -175,7 +175,7 @@ export const mapProductToPage = (product: Product): ProductPageData => {
 };
 
 // Функция для массового преобразования продуктов в карточки
-export const mapProductsToCards = (products: Product[]): ProductCardData[] => {
+export const mapProductsToCards = (products: ProductCard[]): ProductCardData[] => {
   return products.map(mapProductToCard);
 };
 